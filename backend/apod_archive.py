@@ -0,0 +1,349 @@
+"""Local, date-indexed archive of Astronomy Pictures of the Day.
+
+Past APODs never change, so every entry only needs to be fetched once. The
+archive is a SQLite file with one row per date (the primary key is the date
+index) plus the dates known to have no APOD, so gaps aren't re-requested.
+
+- `get_entry` and `get_range` answer from the archive and only go upstream
+  (one date-range request) for dates it doesn't have yet; `random` picks from
+  what is stored;
+- `backfill` walks history newest-first in BACKFILL_CHUNK_DAYS date-range
+  requests, stopping after `max_requests`, on a 429, or when the API reports
+  fewer than RATE_LIMIT_RESERVE requests left for live traffic.
+
+Backfill from the command line:
+
+    python apod_archive.py --max-requests 20
+
+app.py also runs it in the background (see backfill_job_enabled), starting
+APOD_BACKFILL_DELAY_S after boot so it doesn't compete with cold start.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any
+
+import nasa_apod
+import requests
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PATH = os.path.join(
+    os.path.dirname(__file__), "apod_archive.db"
+)  # should be cached in /backend
+
+FIRST_APOD = datetime.date(1995, 6, 16)
+
+# Days per upstream range request (the API has no documented cap; this keeps
+# responses around 200 KB).
+BACKFILL_CHUNK_DAYS = 90
+# Requests per backfill run; DEMO_KEY allows 30/hour and 50/day.
+BACKFILL_MAX_REQUESTS = int(os.getenv("APOD_BACKFILL_MAX_REQUESTS", "10"))
+# Leave this many requests of the hourly quota for /api/apod traffic.
+RATE_LIMIT_RESERVE = 10
+# Background job: "1"/"0" force it on/off; "auto" runs it only with a real
+# NASA_API_KEY. First run this long after boot, then daily.
+BACKFILL_JOB = os.getenv("APOD_BACKFILL_JOB", "auto")
+BACKFILL_DELAY_S = float(os.getenv("APOD_BACKFILL_DELAY_S", "600"))
+# Longest range /api/apod?start=&end= will return.
+MAX_RANGE_DAYS = 366
+# After today's APOD was found unpublished, don't ask again for this long.
+TODAY_RETRY_S = 10 * 60
+
+_FIELDS = (
+    "date",
+    "title",
+    "explanation",
+    "media_type",
+    "url",
+    "hdurl",
+    "copyright",
+    "raw_url",
+)
+
+
+class UpstreamError(RuntimeError):
+    """The APOD API failed. Only the status is kept: request URLs hold the key."""
+
+    def __init__(self, status: int | None = None):
+        self.status = status
+        detail = f" (HTTP {status})" if status is not None else ""
+        super().__init__(f"APOD API request failed{detail}")
+
+
+def _fetch_range(start: datetime.date, end: datetime.date) -> list[dict[str, Any]]:
+    """`nasa_apod.fetch_APOD_range`, with failures mapped to UpstreamError."""
+    try:
+        return nasa_apod.fetch_APOD_range(start, end)
+    except requests.HTTPError as e:
+        raise UpstreamError(e.response.status_code if e.response is not None else None)
+    except (requests.RequestException, ValueError):
+        raise UpstreamError()
+
+
+def parse_date(value: str) -> datetime.date:
+    """YYYY-MM-DD within the APOD era; raises ValueError otherwise."""
+    day = datetime.date.fromisoformat(value)
+    today = nasa_apod.apod_today()
+    if not FIRST_APOD <= day <= today:
+        raise ValueError(
+            f"Date must be between {FIRST_APOD.isoformat()} and {today.isoformat()}"
+        )
+    return day
+
+
+class APODArchive:
+    """APOD entries keyed by date in a SQLite file; safe to share across threads."""
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # (date, monotonic time) of the last upstream miss for today's APOD
+        self._today_miss: tuple | None = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS apod (date TEXT PRIMARY KEY, "
+                + ", ".join(_FIELDS[1:])
+                + ", fetched_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS missing (date TEXT PRIMARY KEY)"
+            )
+            self._conn.commit()
+
+    # -- storage ------------------------------------------------------------
+
+    def _rows(self, sql: str, args: tuple = ()) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [dict(zip(_FIELDS, row)) for row in rows]
+
+    def get(self, day: datetime.date) -> dict[str, Any] | None:
+        rows = self._rows(
+            f"SELECT {', '.join(_FIELDS)} FROM apod WHERE date = ?", (day.isoformat(),)
+        )
+        return rows[0] if rows else None
+
+    def range(self, start: datetime.date, end: datetime.date) -> list[dict[str, Any]]:
+        """Stored entries from `start` to `end` inclusive, oldest first."""
+        return self._rows(
+            f"SELECT {', '.join(_FIELDS)} FROM apod WHERE date BETWEEN ? AND ? "
+            "ORDER BY date",
+            (start.isoformat(), end.isoformat()),
+        )
+
+    def random(self) -> dict[str, Any] | None:
+        """A uniformly random stored entry (an offset into the date index)."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM apod").fetchone()[0]
+            if not count:
+                return None
+            row = self._conn.execute(
+                f"SELECT {', '.join(_FIELDS)} FROM apod ORDER BY date "
+                "LIMIT 1 OFFSET ?",
+                (random.randrange(count),),
+            ).fetchone()
+        return dict(zip(_FIELDS, row))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM apod").fetchone()[0]
+
+    def missing_dates(
+        self, start: datetime.date, end: datetime.date
+    ) -> list[datetime.date]:
+        """Dates in [start, end] that are neither stored nor known to be empty."""
+        with self._lock:
+            known = {
+                row[0]
+                for table in ("apod", "missing")
+                for row in self._conn.execute(
+                    f"SELECT date FROM {table} WHERE date BETWEEN ? AND ?",
+                    (start.isoformat(), end.isoformat()),
+                )
+            }
+        days = (end - start).days + 1
+        return [
+            day
+            for day in (start + datetime.timedelta(days=i) for i in range(days))
+            if day.isoformat() not in known
+        ]
+
+    def store(
+        self, entries: list[dict[str, Any]], start: datetime.date, end: datetime.date
+    ) -> int:
+        """Save an upstream range response and remember the empty days in it.
+
+        Today's date is never marked empty, since it may not be published yet.
+        """
+        items = [nasa_apod._to_item(e).__dict__ for e in entries]
+        got = {item["date"] for item in items}
+        today = nasa_apod.apod_today()
+        empty = [
+            day.isoformat()
+            for day in (
+                start + datetime.timedelta(days=i)
+                for i in range((end - start).days + 1)
+            )
+            if day < today and day.isoformat() not in got
+        ]
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO apod VALUES "
+                f"({', '.join('?' * (len(_FIELDS) + 1))})",
+                [tuple(item[f] for f in _FIELDS) + (now,) for item in items],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO missing VALUES (?)", [(d,) for d in empty]
+            )
+            self._conn.commit()
+        return len(items)
+
+    # -- reads that fill gaps -----------------------------------------------
+
+    def _fill(self, start: datetime.date, end: datetime.date) -> None:
+        """Fetch [start, end] upstream in one request if anything is missing.
+
+        Today can't be marked empty, so a miss for it is remembered for
+        TODAY_RETRY_S instead of going upstream on every request.
+        """
+        missing = self.missing_dates(start, end)
+        today = nasa_apod.apod_today()
+        if missing and missing[-1] == today and self._today_miss is not None:
+            day, at = self._today_miss
+            if day == today and time.monotonic() - at < TODAY_RETRY_S:
+                missing.pop()
+        if missing:
+            entries = _fetch_range(missing[0], missing[-1])
+            self.store(entries, missing[0], missing[-1])
+            if missing[-1] == today and self.get(today) is None:
+                self._today_miss = (today, time.monotonic())
+
+    def get_entry(self, day: datetime.date) -> dict[str, Any] | None:
+        """The APOD for `day`, fetched and archived on first request."""
+        entry = self.get(day)
+        if entry is None:
+            self._fill(day, day)
+            entry = self.get(day)
+        return entry
+
+    def get_range(
+        self, start: datetime.date, end: datetime.date
+    ) -> list[dict[str, Any]]:
+        """Entries from `start` to `end`, fetching whatever isn't archived yet."""
+        if start > end:
+            raise ValueError("start must not be after end")
+        if (end - start).days >= MAX_RANGE_DAYS:
+            raise ValueError(f"Ranges are limited to {MAX_RANGE_DAYS} days")
+        self._fill(start, end)
+        return self.range(start, end)
+
+    # -- bulk backfill ------------------------------------------------------
+
+    def backfill(
+        self,
+        since: datetime.date = FIRST_APOD,
+        max_requests: int | None = None,
+    ) -> dict[str, Any]:
+        """Fetch missing history newest-first; returns what it did."""
+        if max_requests is None:
+            max_requests = BACKFILL_MAX_REQUESTS
+        result = {"requests": 0, "stored": 0, "stopped": None}
+        end = nasa_apod.apod_today()
+        while end >= since:
+            start = max(since, end - datetime.timedelta(days=BACKFILL_CHUNK_DAYS - 1))
+            missing = self.missing_dates(start, end)
+            if missing:
+                if result["requests"] >= max_requests:
+                    result["stopped"] = "max_requests"
+                    break
+                remaining = nasa_apod.rate_limit_remaining
+                if remaining is not None and remaining <= RATE_LIMIT_RESERVE:
+                    result["stopped"] = "rate_limit_reserve"
+                    break
+                try:
+                    entries = _fetch_range(missing[0], missing[-1])
+                except UpstreamError as e:
+                    # str(e), not the requests error: its URL holds the API key
+                    result["stopped"] = "rate_limited" if e.status == 429 else str(e)
+                    break
+                finally:
+                    result["requests"] += 1
+                result["stored"] += self.store(entries, missing[0], missing[-1])
+            end = start - datetime.timedelta(days=1)
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_archive: APODArchive | None = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> APODArchive:
+    """Process-wide archive shared by all requests."""
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = APODArchive()
+    return _archive
+
+
+_job_thread: threading.Thread | None = None
+
+
+def backfill_job_enabled() -> bool:
+    """Whether app.py should start the backfill job (see BACKFILL_JOB).
+
+    Each run spends up to BACKFILL_MAX_REQUESTS requests, and DEMO_KEY's
+    30 an hour are shared with /api/apod, so "auto" skips it on DEMO_KEY.
+    """
+    if BACKFILL_JOB == "auto":
+        return nasa_apod.getNASA_APIKey() != "DEMO_KEY"
+    return BACKFILL_JOB == "1"
+
+
+def start_backfill_job(
+    interval_s: float = 24 * 3600, delay_s: float = BACKFILL_DELAY_S
+) -> None:
+    """Run `backfill` after `delay_s`, then every `interval_s`, in a daemon thread."""
+    global _job_thread
+    if _job_thread is not None:
+        return
+
+    def loop() -> None:
+        time.sleep(delay_s)
+        while True:
+            try:
+                result = get_archive().backfill()
+                logger.info("APOD backfill: %s", result)
+            except Exception:
+                logger.exception("APOD backfill failed")
+            time.sleep(interval_s)
+
+    _job_thread = threading.Thread(target=loop, name="apod-backfill", daemon=True)
+    _job_thread.start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the APOD archive")
+    parser.add_argument("--since", type=datetime.date.fromisoformat, default=FIRST_APOD)
+    parser.add_argument("--max-requests", type=int, default=BACKFILL_MAX_REQUESTS)
+    args = parser.parse_args()
+
+    result = get_archive().backfill(args.since, args.max_requests)
+    print(f"{result} ({get_archive().count()} entries in {ARCHIVE_PATH})")
@@ -0,0 +1,292 @@
+"""Proxy and on-disk cache for APOD images.
+
+The frontend used to load `url`/`hdurl` straight from apod.nasa.gov, where
+HD images are often several MB. Each image is now downloaded once (streamed
+to disk in chunks) into MEDIA_DIR and served from there, in three variants:
+
+- `thumb` / `medium`: the standard image resized to a longest edge of
+  VARIANTS[variant] px and re-encoded as progressive JPEG. Both are
+  generated together from one download. Needs Pillow (`pip install
+  ".[media]"`); without it, or with APOD_MEDIA_VARIANTS=0, both serve the
+  standard image unchanged;
+- `hd`: `hdurl` as published (falling back to `url`).
+
+Variants are generated when a date's image is first requested rather than
+for every archived date up front: thumb and medium together, hd on its own
+since it is the multi-MB download most clients never ask for. To have them
+ready before anyone asks, pre-generate all three for recent dates:
+
+    python apod_media.py --recent 7      # or a single YYYY-MM-DD
+
+The APOD routes add these as `media` (see media_urls) to every image entry
+they return, and the frontend loads its <img> from there.
+
+The directory is an LRU bounded by MEDIA_CACHE_MAX_BYTES. Hits update a
+file's access time (its mtime, and so its ETag, never changes), and the
+least recently used files are deleted after each download.
+
+Only ALLOWED_HOSTS are fetched, redirects included (each hop is checked),
+so the proxy can't be pointed at anything else.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import mimetypes
+import os
+import threading
+import time
+import warnings
+from urllib.parse import urljoin, urlparse
+
+import apod_archive
+import requests
+
+try:
+    from PIL import Image
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+MEDIA_DIR = os.path.join(os.path.dirname(__file__), "apod_media")
+
+MEDIA_CACHE_MAX_BYTES = int(os.getenv("APOD_MEDIA_CACHE_MB", "512")) * 1024 * 1024
+GENERATE_VARIANTS = PIL_AVAILABLE and os.getenv("APOD_MEDIA_VARIANTS", "1") == "1"
+
+# Longest edge in px; None means the published HD image as-is.
+VARIANTS: dict[str, int | None] = {"thumb": 320, "medium": 1280, "hd": None}
+JPEG_QUALITY = 82
+
+# Image hosts APOD entries point at (video entries carry a thumbnail URL).
+ALLOWED_HOSTS = frozenset({"apod.nasa.gov", "img.youtube.com", "i.vimeocdn.com"})
+
+DOWNLOAD_TIMEOUT_S = 30
+MAX_DOWNLOAD_BYTES = 64 * 1024 * 1024
+MAX_REDIRECTS = 5
+_CHUNK_BYTES = 64 * 1024
+
+# Striped per-date locks: a fixed pool, so memory doesn't grow with dates.
+_date_locks = [threading.Lock() for _ in range(64)]
+_evict_lock = threading.Lock()
+
+
+class MediaError(RuntimeError):
+    """The image could not be served; `status` is the HTTP code."""
+
+    status = 502
+
+
+class MediaNotFound(MediaError):
+    status = 404
+
+
+def _date_lock(day: datetime.date) -> threading.Lock:
+    """One download per date at a time, so concurrent misses fetch once."""
+    return _date_locks[day.toordinal() % len(_date_locks)]
+
+
+def _allowed(url: str) -> bool:
+    parsed = urlparse(url or "")
+    return parsed.scheme in ("http", "https") and parsed.hostname in ALLOWED_HOSTS
+
+
+def _source_url(entry: dict, variant: str) -> str:
+    url = (entry.get("hdurl") if variant == "hd" else None) or entry.get("url")
+    if not _allowed(url):
+        raise MediaNotFound(f"No image for {entry['date']}")
+    return url
+
+
+def _get(url: str) -> requests.Response:
+    """Streamed GET following redirects only to ALLOWED_HOSTS."""
+    for _ in range(MAX_REDIRECTS + 1):
+        resp = requests.get(
+            url, stream=True, timeout=DOWNLOAD_TIMEOUT_S, allow_redirects=False
+        )
+        if not resp.is_redirect:
+            return resp
+        resp.close()
+        url = urljoin(url, resp.headers["Location"])
+        if not _allowed(url):
+            raise MediaNotFound(f"Redirected to a host that isn't proxied: {url}")
+    raise MediaError(f"Too many redirects fetching {url}")
+
+
+def _extension(url: str) -> str:
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    return ext if mimetypes.types_map.get(ext, "").startswith("image/") else ".jpg"
+
+
+def _download(url: str, path: str) -> None:
+    """Stream `url` to `path` (atomically) without holding it in memory."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with _get(url) as resp:
+            resp.raise_for_status()
+            if not resp.headers.get("Content-Type", "").startswith("image/"):
+                raise MediaNotFound(f"{url} is not an image")
+            size = 0
+            with open(tmp, "wb") as f:
+                for chunk in resp.iter_content(_CHUNK_BYTES):
+                    size += len(chunk)
+                    if size > MAX_DOWNLOAD_BYTES:
+                        raise MediaError(f"{url} is larger than {MAX_DOWNLOAD_BYTES} B")
+                    f.write(chunk)
+        os.replace(tmp, path)
+    except requests.RequestException as e:
+        raise MediaError(f"Fetching {url} failed: {e}") from e
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _resize(source: str, path: str, edge: int) -> None:
+    """Write `source` scaled to a longest edge of `edge` px as JPEG."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    # past Image.MAX_IMAGE_PIXELS Pillow only warns; refuse those too rather
+    # than decode a (possibly hostile) huge image
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", Image.DecompressionBombWarning)
+        with Image.open(source) as im:
+            im.draft("RGB", (edge, edge))  # JPEG: decode at a reduced scale
+            im.thumbnail((edge, edge))
+            if im.mode not in ("RGB", "L"):
+                im = im.convert("RGB")
+            im.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(tmp, path)
+
+
+def media_path(entry: dict, variant: str) -> str:
+    """Where `variant` of the image for `entry` is stored."""
+    day = entry["date"]
+    if variant == "hd":
+        return os.path.join(
+            MEDIA_DIR, f"{day}.hd{_extension(_source_url(entry, 'hd'))}"
+        )
+    if GENERATE_VARIANTS:
+        return os.path.join(MEDIA_DIR, f"{day}.{variant}.jpg")
+    return os.path.join(
+        MEDIA_DIR, f"{day}.image{_extension(_source_url(entry, variant))}"
+    )
+
+
+def _touch(path: str) -> None:
+    """Mark `path` as recently used (access time only; mtime feeds the ETag)."""
+    try:
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+    except OSError:
+        pass
+
+
+def _fetch(entry: dict, variant: str, path: str) -> None:
+    url = _source_url(entry, variant)
+    if variant == "hd" or not GENERATE_VARIANTS:
+        _download(url, path)
+        return
+    # one download of the standard image makes every resized variant
+    source = os.path.join(
+        MEDIA_DIR, f"{entry['date']}.{os.getpid()}.source{_extension(url)}"
+    )
+    _download(url, source)
+    try:
+        for name, edge in VARIANTS.items():
+            if edge is not None:
+                _resize(source, media_path(entry, name), edge)
+    except (
+        OSError,
+        Image.DecompressionBombError,
+        Image.DecompressionBombWarning,
+    ) as e:  # Pillow couldn't (or wouldn't) decode it
+        raise MediaError(f"Could not resize {url}: {e}") from e
+    finally:
+        os.remove(source)
+
+
+def media_urls(entry: dict) -> dict[str, str] | None:
+    """Proxy URL of each variant for `entry`, or None if it has no image."""
+    if entry.get("media_type") != "image":
+        return None  # videos are embedded from their own host
+    try:
+        _source_url(entry, "medium")
+    except MediaNotFound:
+        return None
+    return {v: f"/api/apod/media/{entry['date']}/{v}" for v in VARIANTS}
+
+
+def get_media(day: datetime.date, variant: str) -> str:
+    """Path of the cached image for `day`, downloading it on first request."""
+    if variant not in VARIANTS:
+        raise ValueError(
+            f"Invalid variant '{variant}'. Use one of: {', '.join(VARIANTS)}"
+        )
+    entry = apod_archive.get_archive().get_entry(day)
+    if entry is None:
+        raise MediaNotFound(f"No APOD for {day.isoformat()}")
+    path = media_path(entry, variant)
+    if os.path.exists(path):
+        _touch(path)
+        return path
+    with _date_lock(day):
+        if not os.path.exists(path):
+            os.makedirs(MEDIA_DIR, exist_ok=True)
+            _fetch(entry, variant, path)
+            evict(keep=path)
+    return path
+
+
+def evict(keep: str | None = None) -> int:
+    """Delete least recently used files until MEDIA_DIR fits its budget."""
+    with _evict_lock:
+        files = []
+        for name in os.listdir(MEDIA_DIR):
+            path = os.path.join(MEDIA_DIR, name)
+            if name.endswith(".tmp") or path == keep:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # removed by another worker
+            files.append((st.st_atime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        if keep is not None and os.path.exists(keep):
+            total += os.path.getsize(keep)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= MEDIA_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+def prefetch(day: datetime.date) -> dict[str, str]:
+    """Make sure every variant for `day` is cached; returns their paths."""
+    return {variant: get_media(day, variant) for variant in VARIANTS}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate APOD image variants")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("date", nargs="?", type=apod_archive.parse_date)
+    group.add_argument("--recent", type=int, metavar="DAYS", help="the last DAYS")
+    args = parser.parse_args()
+
+    if args.date:
+        days = [args.date]
+    else:
+        today = apod_archive.nasa_apod.apod_today()
+        days = [today - datetime.timedelta(days=i) for i in range(args.recent)]
+    for day in days:
+        try:
+            paths = prefetch(day)
+        except MediaNotFound as e:
+            print(f"{day}: skipped ({e})")
+            continue
+        for variant, path in paths.items():
+            print(f"{day} {variant}: {path} ({os.path.getsize(path)} B)")
@@ -1,18 +1,57 @@
 # backend/app.py
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, send_file
 from flask_cors import CORS
-import nasa_timer
-import nasa_apod
-import nasa_insight
-import llspacedevs
-import nasa_neos
-import moon_phase
+from werkzeug.exceptions import HTTPException
 import datetime
+import importlib
+import os
+
+
+class _LazyModule:
+    """Stand-in for a feature module that imports it on first attribute access.
+
+    The feature modules pull in requests, dotenv, NumPy and skyfield, so
+    importing them eagerly made every restart and worker fork pay for all of
+    them before /health could answer. `importlib.import_module` holds the
+    per-module import lock, so concurrent first requests import it only once.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr: str):
+        return getattr(importlib.import_module(self._name), attr)
+
+
+nasa_timer = _LazyModule("nasa_timer")
+nasa_apod = _LazyModule("nasa_apod")
+apod_archive = _LazyModule("apod_archive")
+apod_media = _LazyModule("apod_media")
+nasa_insight = _LazyModule("nasa_insight")
+llspacedevs = _LazyModule("llspacedevs")
+nasa_neos = _LazyModule("nasa_neos")
+neo_rollups = _LazyModule("neo_rollups")
+moon_phase = _LazyModule("moon_phase")
+moon_tiles = _LazyModule("moon_tiles")
+compute_executor = _LazyModule("compute_executor")
 
 app = Flask(__name__)
 CORS(app)
 
 
+@app.errorhandler(Exception)
+def unexpected_error(e: Exception):
+    """JSON 500 for anything a route doesn't handle itself.
+
+    requests errors embed the request URL, api_key included, so the error is
+    logged instead of echoed.
+    """
+    if isinstance(e, HTTPException):
+        return e
+    app.logger.exception("Unhandled error in %s", request.path)
+    return jsonify({"error": "Internal server error"}), 500
+
+
 @app.get("/health")
 def health():
     return jsonify(status="ok")
@@ -38,10 +77,96 @@ def get_countdown_api():
     return jsonify(countdown_data.__dict__)
 
 
+def _apod_upstream_error(e):
+    """502 for a failed NASA API call made by the archive routes."""
+    return jsonify({"error": str(e), "upstream_status": e.status}), 502
+
+
+def _with_media(entry: dict) -> dict:
+    """`entry` plus the proxy URLs of its image (None if it has none)."""
+    return {**entry, "media": apod_media.media_urls(entry)}
+
+
 @app.get("/api/apod")
 def get_apod_api():
-    apod = nasa_apod.get_APOD_lookback()
-    return jsonify(apod.__dict__)
+    """
+    Latest APOD, or with ?start=YYYY-MM-DD&end=YYYY-MM-DD every entry in that
+    range (oldest first) from the local archive.
+    """
+    start = request.args.get("start")
+    end = request.args.get("end")
+    if start is None and end is None:
+        apod = nasa_apod.get_APOD_lookback()
+        if not apod.date:
+            resp = jsonify(apod.__dict__)
+            # nothing found (upstream down or rate limited): don't let a CDN
+            # keep serving the empty answer after the next refresh succeeds
+            resp.cache_control.no_store = True
+            return resp
+        resp = jsonify(_with_media(apod.__dict__))
+        # same entry until the next publication, so let caches in front hold it
+        resp.cache_control.public = True
+        resp.cache_control.max_age = nasa_apod.latest_max_age()
+        return resp
+
+    try:
+        if start is None or end is None:
+            raise ValueError("Both start and end are required")
+        entries = apod_archive.get_archive().get_range(
+            apod_archive.parse_date(start), apod_archive.parse_date(end)
+        )
+        return jsonify([_with_media(e) for e in entries])
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except apod_archive.UpstreamError as ue:
+        return _apod_upstream_error(ue)
+
+
+@app.get("/api/apod/random")
+def get_apod_random_api():
+    """A random APOD from the local archive."""
+    try:
+        entry = apod_archive.get_archive().random()
+        if entry is None:
+            return jsonify({"error": "APOD archive is empty"}), 404
+        return jsonify(_with_media(entry))
+    except apod_archive.UpstreamError as ue:
+        return _apod_upstream_error(ue)
+
+
+@app.get("/api/apod/media/<date>/<variant>")
+def get_apod_media_api(date, variant):
+    """APOD image for a date through the local media cache.
+
+    Variants: thumb (320 px), medium (1280 px), hd (as published). Served
+    with ETag/Last-Modified and Range support and a year-long max-age, since
+    an APOD image never changes once published.
+    """
+    try:
+        path = apod_media.get_media(apod_archive.parse_date(date), variant)
+        return send_file(path, conditional=True, etag=True, max_age=365 * 86400)
+    except ValueError as ve:
+        # bad date or variant
+        return jsonify({"error": str(ve)}), 400
+    except apod_media.MediaError as me:
+        # no image for that date (404) or upstream failure (502)
+        return jsonify({"error": str(me)}), me.status
+    except apod_archive.UpstreamError as ue:
+        return _apod_upstream_error(ue)
+
+
+@app.get("/api/apod/<date>")
+def get_apod_date_api(date):
+    """The APOD for one date (YYYY-MM-DD), served from the local archive."""
+    try:
+        entry = apod_archive.get_archive().get_entry(apod_archive.parse_date(date))
+        if entry is None:
+            return jsonify({"error": f"No APOD for {date}"}), 404
+        return jsonify(_with_media(entry))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except apod_archive.UpstreamError as ue:
+        return _apod_upstream_error(ue)
 
 
 @app.get("/api/mars-insight")
@@ -80,7 +205,7 @@ def get_mars_insight_api():
 def get_llspacedevs_api():
     """Return a compact summary (top countries) from the LLSpaceDevs data."""
     try:
-        ad = llspacedevs.AstronautData()
+        ad = llspacedevs.get_dataset()
         top = ad.get_top_countries(10)
         # convert (country, count, [names]) tuples into serializable dicts
         result = [{"country": t[0], "count": t[1], "names": t[2]} for t in top]
@@ -98,31 +223,8 @@ def search_astronauts_api():
     if not country or not country.strip():
         return jsonify({"error": "Missing 'country' query parameter"}), 400
     try:
-        ad = llspacedevs.AstronautData()
-        astronauts = ad.get_astronauts_by_country(country)
-
-        # also return active/inactive breakdown like top_countries() does
-        all_data = ad.get_astronauts()
-        active = []
-        inactive = []
-
-        for a in all_data:
-            nat = a.get("nationality", "")
-            if nat and country.lower() in nat.lower():
-                status = (a.get("status") or {}).get("name", "")
-                if status.lower() == "active":
-                    active.append(a.get("name"))
-                else:
-                    inactive.append(a.get("name"))
-
-        return jsonify(
-            {
-                "country": country,
-                "count": len(astronauts),
-                "active": active,
-                "inactive": inactive,
-            }
-        )
+        breakdown = llspacedevs.get_dataset().get_country_breakdown(country)
+        return jsonify({"country": country, **breakdown})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -131,28 +233,125 @@ def search_astronauts_api():
 @app.get("/api/llspacedevs/search-advanced")
 def search_astronauts_advanced_api():
     """
-    Advanced search for astronauts by optional country and status
+    Advanced astronaut search with filters, sorting and cursor pagination.
+
+    Query params (all optional):
+      - country, status (default "all"), type, agency
+      - in_space (true/false)
+      - min_age, max_age (int), born_after, born_before (YYYY-MM-DD)
+      - sort (name, time_in_space, eva_time), order (asc/desc)
+      - limit (1-200, default 50), cursor (next_cursor of the previous page)
+      - fields (comma-separated, e.g. "name,agency,time_in_space")
     """
-    country = request.args.get("country")
-    status = request.args.get("status", "all")
+    args = request.args
+    filters = {
+        "country": args.get("country"),
+        "status": args.get("status", "all"),
+        "type": args.get("type"),
+        "agency": args.get("agency"),
+        "born_after": args.get("born_after"),
+        "born_before": args.get("born_before"),
+    }
 
     try:
-        ad = llspacedevs.AstronautData()
-        results = ad.search_astronauts(country=country, status=status)
+        in_space = args.get("in_space")
+        if in_space is not None:
+            if in_space.lower() not in ("true", "false"):
+                raise ValueError("in_space must be true or false")
+            filters["in_space"] = in_space.lower() == "true"
+        for key in ("min_age", "max_age"):
+            if args.get(key) is not None:
+                filters[key] = int(args[key])
+        fields = args.get("fields")
+
+        page = llspacedevs.get_dataset().search_astronauts(
+            **filters,
+            sort=args.get("sort", "name"),
+            order=args.get("order", "asc"),
+            limit=int(args.get("limit", "50")),
+            cursor=args.get("cursor"),
+            fields=(
+                [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+            ),
+        )
         return jsonify(
             {
-                "filters": {"country": country, "status": status},
-                "count": len(results),
-                "results": results,
+                "filters": {k: v for k, v in filters.items() if v is not None},
+                **page,
             }
         )
     except ValueError as ve:
-        # invalid status, etc
+        # invalid status, type, sort, cursor, numbers or dates
         return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.get("/api/llspacedevs/fulltext")
+def fulltext_astronauts_api():
+    """
+    Ranked full-text search over astronaut names and bios.
+
+    Query params:
+      - q (required), e.g. "soyuz commander" or "geolog"
+      - limit (1-200, default 10)
+      - fields (comma-separated, as for /search-advanced)
+    """
+    args = request.args
+    try:
+        fields = args.get("fields")
+        result = llspacedevs.get_dataset().fulltext_search(
+            args.get("q", ""),
+            limit=int(args.get("limit", "10")),
+            fields=(
+                [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+            ),
+        )
+        return jsonify({"query": args.get("q"), **result})
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+
+@app.get("/api/llspacedevs/leaderboard/<metric>")
+def astronaut_leaderboard_api(metric):
+    """
+    Top astronauts by time_in_space, eva_time, flights_count or
+    spacewalks_count (durations in seconds, plus a readable "display").
+    Query params: limit (1-200, default 10).
+    """
+    try:
+        limit = int(request.args.get("limit", "10"))
+        entries = llspacedevs.get_dataset().get_leaderboard(metric, limit)
+        return jsonify({"metric": metric, "results": entries})
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+
+@app.get("/api/llspacedevs/stats/countries")
+def astronaut_country_stats_api():
+    """
+    Per-country totals and medians of time in space / EVA time (seconds).
+    Query params: sort (count, total_time_in_space_s, median_time_in_space_s,
+    total_eva_time_s, median_eva_time_s, flights; default count), limit
+    (1-200, default all).
+    """
+    args = request.args
+    try:
+        limit = args.get("limit")
+        rows = llspacedevs.get_dataset().get_country_stats(
+            args.get("sort", "count"), None if limit is None else int(limit)
+        )
+        return jsonify(rows)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+
+@app.get("/api/llspacedevs/stats/ages")
+def astronaut_age_stats_api():
+    """Astronaut age distribution (10-year buckets), overall and per status."""
+    return jsonify(llspacedevs.get_dataset().get_stats().ages())
+
+
 @app.get("/api/neos")
 def get_neos_api():
     """Query NASA NEO feed and return compact summary.
@@ -182,11 +381,54 @@ def get_neos_api():
 
         feed = nasa_neos.fetch_feed(start_dt.isoformat(), end_dt.isoformat())
         summary = nasa_neos.summarize_feed(feed)
+
+        # fold every feed we pay for into the trend rollups
+        try:
+            neo_rollups.get_store().ingest_feed(feed)
+        except Exception:
+            # never fail the feed response, but don't hide a broken rollup store
+            app.logger.exception("NEO rollup ingest failed")
+
         return jsonify(summary)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.get("/api/neos/trend")
+def get_neo_trend_api():
+    """Per-bucket NEO counts, hazardous counts, min miss distance, max diameter
+    and mean velocity from the pre-aggregated rollups.
+
+    Query params:
+      - from   (YYYY-MM-DD) optional (defaults to one year before `to`)
+      - to     (YYYY-MM-DD) optional (defaults to today)
+      - bucket (day|week|month|year) optional (defaults to month)
+    """
+    try:
+        to_str = request.args.get("to")
+        from_str = request.args.get("from")
+        bucket = request.args.get("bucket", "month")
+
+        to_dt = datetime.date.fromisoformat(to_str) if to_str else datetime.date.today()
+        if from_str:
+            from_dt = datetime.date.fromisoformat(from_str)
+        else:
+            from_dt = to_dt - datetime.timedelta(days=365)
+
+        rows = neo_rollups.get_store().trend(from_dt, to_dt, bucket)
+        return jsonify(
+            {
+                "from": from_dt.isoformat(),
+                "to": to_dt.isoformat(),
+                "bucket": bucket,
+                "buckets": rows,
+            }
+        )
+    except ValueError as ve:
+        # bad date or bucket
+        return jsonify({"error": str(ve)}), 400
+
+
 @app.get("/api/neo/<string:neo_id>")
 def get_neo_lookup_api(neo_id: str):
     """Return details for a specific NEO id."""
@@ -216,10 +458,126 @@ def get_moon_phase_api():
         lon = request.args.get("lon", type=float)
         data = moon_phase.get_current_moon_phase(lat, lon)
         return jsonify(data)
+    except compute_executor.ComputeError as ce:
+        # compute pool busy (503) or past its deadline (504)
+        return jsonify({"error": str(ce)}), ce.status
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.get("/api/moon-position")
+def get_moon_position_api():
+    """Moon altitude/azimuth/distance track for an observer.
+
+    Query params:
+      - lat, lon (float) required
+      - start (ISO datetime, UTC if no offset) optional, defaults to now
+      - hours (float) optional, defaults to 12 (max 48)
+      - step (int minutes, 1-60) optional, defaults to 5
+    """
+    lat = request.args.get("lat", type=float)
+    lon = request.args.get("lon", type=float)
+    if lat is None or lon is None:
+        return jsonify({"error": "lat and lon are required"}), 400
+
+    try:
+        start_str = request.args.get("start")
+        if start_str:
+            start = datetime.datetime.fromisoformat(start_str)
+        else:
+            start = datetime.datetime.now(datetime.UTC)
+        hours = float(request.args.get("hours", "12"))
+        step = int(request.args.get("step", "5"))
+
+        data = moon_phase.calculate_moon_sky_track(lat, lon, start, hours, step)
+        return jsonify(data)
+    except ValueError as ve:
+        # bad start, hours, step or location
+        return jsonify({"error": str(ve)}), 400
+    except compute_executor.ComputeError as ce:
+        # compute pool busy (503) or past its deadline (504)
+        return jsonify({"error": str(ce)}), ce.status
+
+
+@app.get("/api/moon-tiles/<date_str>.npz")
+def get_moon_tile_api(date_str):
+    """Global moonrise/moonset raster for a UTC date, as a compressed .npz.
+
+    Arrays: rise, set (uint16 minutes after 00:00 UTC, 65535 = no event),
+    lat/lon ([first, step] in degrees). Served with ETag/Last-Modified and
+    Range support, so clients can revalidate or resume cheaply.
+
+    Query params:
+      - res (float degrees) optional, one of 0.25, 0.5, 1, 2 (default 1)
+    """
+    try:
+        date = datetime.date.fromisoformat(date_str)
+        res = float(request.args.get("res", moon_tiles.DEFAULT_RES))
+        path = moon_tiles.get_tile(date, res)
+        return send_file(
+            path,
+            mimetype="application/octet-stream",
+            conditional=True,
+            etag=True,
+            max_age=86400,  # a day's raster never changes once written
+        )
+    except ValueError as ve:
+        # bad date or resolution
+        return jsonify({"error": str(ve)}), 400
+    except compute_executor.ComputeError as ce:
+        # compute pool busy (503) or past its deadline (504)
+        return jsonify({"error": str(ce)}), ce.status
+
+
+@app.post("/api/moon-phase/rise-set/batch")
+def post_moon_rise_set_batch_api():
+    """Moon rise/set for many locations at once.
+
+    JSON body:
+      - locations: [{"lat": float, "lon": float, "id": optional}, ...] required
+      - start (YYYY-MM-DD) optional, defaults to today
+      - days (int) optional, defaults to 1
+      - tz (IANA name) optional, local day used for bucketing (defaults to UTC)
+    """
+    body = request.get_json(silent=True) or {}
+    locations = body.get("locations")
+    if not isinstance(locations, list) or not locations:
+        return jsonify({"error": "'locations' must be a non-empty list"}), 400
+
+    try:
+        start = body.get("start") or datetime.date.today().isoformat()
+        days = int(body.get("days", 1))
+        tz = body.get("tz")
+        results = moon_phase.calculate_moon_rise_set_batch(locations, start, days, tz)
+        return jsonify(
+            {
+                "start": start,
+                "days": days,
+                "tz": tz or "UTC",
+                "count": len(results),
+                "results": results,
+            }
+        )
+    except ValueError as ve:
+        # bad date, tz, location or request too large
+        return jsonify({"error": str(ve)}), 400
+    except compute_executor.ComputeError as ce:
+        # compute pool busy (503) or past its deadline (504)
+        return jsonify({"error": str(ce)}), ce.status
+
+
+@app.get("/api/moon-phase/rise-set/cache")
+def get_moon_rise_set_cache_api():
+    """Hit/miss metrics for the memoized moon rise/set results."""
+    return jsonify(moon_phase.rise_set_cache_info())
+
+
+@app.get("/api/compute/status")
+def get_compute_status_api():
+    """Worker count, queue depth and rejection/timeout counters of the compute pool."""
+    return jsonify(compute_executor.executor_info())
+
+
 @app.get("/api/moon-phase/<string:date>")
 def get_moon_phase_date_api(date: str):
     """Get moon phase for a specific date (YYYY-MM-DD)."""
@@ -228,6 +586,9 @@ def get_moon_phase_date_api(date: str):
         lon = request.args.get("lon", type=float)
         data = moon_phase.get_moon_phase_for_date(date, lat, lon)
         return jsonify(data)
+    except compute_executor.ComputeError as ce:
+        # compute pool busy (503) or past its deadline (504)
+        return jsonify({"error": str(ce)}), ce.status
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -239,19 +600,52 @@ def get_moon_phase_range_api():
     Query params:
       - start (YYYY-MM-DD) required
       - days (int) optional, defaults to 7
+      - resolution (daily|hourly) optional, defaults to daily
+      - format (rows|columns) optional, defaults to rows; `columns` returns
+        one list per field, which is much smaller for long ranges
+      - lat, lon (float) optional; adds each day's moon rise/set, computed in
+        a single search over the whole window
+      - tz (IANA name) optional, local day used for rise/set (defaults to UTC)
     """
     try:
         start_date = request.args.get("start")
         days = int(request.args.get("days", "7"))
+        resolution = request.args.get("resolution", "daily")
+        columnar = request.args.get("format", "rows") == "columns"
+        lat = request.args.get("lat", type=float)
+        lon = request.args.get("lon", type=float)
+        tz = request.args.get("tz")
 
         if not start_date:
             return jsonify({"error": "start date is required"}), 400
 
-        data = moon_phase.get_moon_phase_range(start_date, days)
+        data = moon_phase.get_moon_phase_range(
+            start_date,
+            days,
+            resolution=resolution,
+            columnar=columnar,
+            latitude=lat,
+            longitude=lon,
+            tz=tz,
+        )
         return jsonify(data)
+    except ValueError as ve:
+        # bad date, days or resolution
+        return jsonify({"error": str(ve)}), 400
+    except compute_executor.ComputeError as ce:
+        # compute pool busy (503) or past its deadline (504)
+        return jsonify({"error": str(ce)}), ce.status
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 if __name__ == "__main__":
+    # Background jobs stay out of the way of a cold start: the astronaut sync
+    # is opt-in, the APOD backfill waits APOD_BACKFILL_DELAY_S and only runs
+    # by default with a real NASA_API_KEY. Moon tiles are generated by their
+    # own process (python moon_tiles.py --every).
+    if os.getenv("ASTRONAUT_SYNC_JOB", "0") == "1":
+        llspacedevs.start_sync_job()
+    if apod_archive.backfill_job_enabled():
+        apod_archive.start_backfill_job()
     app.run(host="0.0.0.0", port=8000)
@@ -0,0 +1,312 @@
+"""Concurrent, resumable crawl of the TheSpaceDevs astronaut list.
+
+Following `next` links one page at a time takes a request round-trip per 100
+astronauts, and a single 429 used to throw the whole crawl away. This
+crawler reads `count` from the first page, then fetches the remaining
+`offset` pages on a small thread pool:
+
+- every request goes through a shared rate budget (requests per minute), and
+  a 429 pauses all workers for the server's Retry-After (or a backoff);
+- requests have a timeout and are retried on 429/5xx/connection errors;
+- each completed page is checkpointed to disk, so a crawl that still fails
+  can simply be re-run and only fetches the missing pages.
+
+If the API doesn't report a `count`, it falls back to following `next`.
+
+For keeping an existing cache fresh, `fetch_changed` asks only for records
+changed since a watermark (see `AstronautData.sync`). The API can't filter on
+when a record was last edited, so that only catches astronauts who flew or
+are in space: status changes (retired, deceased) and bio edits for anyone
+else wait for the next full crawl, which `sync` runs every
+ASTRONAUT_FULL_SYNC_INTERVAL_S (a week by default).
+
+Refresh the backend cache from the command line:
+
+    python astronaut_crawler.py          # changes since the last sync
+    python astronaut_crawler.py --full   # re-crawl everything
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import urlencode
+
+import requests
+
+DEFAULT_BASE_URL = "https://lldev.thespacedevs.com/2.2.0/astronaut/"
+PAGE_SIZE = 100
+CRAWL_WORKERS = int(os.getenv("ASTRONAUT_CRAWL_WORKERS", "4"))
+# lldev is lenient; the production API only allows 15 requests per hour.
+CRAWL_RATE_PER_MIN = float(os.getenv("ASTRONAUT_CRAWL_RATE_PER_MIN", "60"))
+REQUEST_TIMEOUT_S = 15
+MAX_RETRIES = 4
+# The 2.2.0 astronaut payload has no last-updated timestamp to filter on.
+# Most changes (flights, time in space) come with a flight, so delta syncs
+# ask for everyone whose last flight is at/after the watermark, plus everyone
+# currently in space (their time in space keeps growing). Anything else is
+# left to the periodic full crawl (see AstronautData.sync).
+DELTA_FIELD = "last_flight"
+# Checkpoints older than this are from an abandoned crawl; start over.
+CHECKPOINT_MAX_AGE_S = 24 * 3600
+
+
+class CrawlError(Exception):
+    """The crawl could not finish; completed pages stay checkpointed."""
+
+
+class RateBudget:
+    """Token bucket shared by all crawl workers, with a global pause for 429s."""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.interval:
+                    elapsed = now - self._updated
+                    self._tokens = min(
+                        self.burst, self._tokens + elapsed / self.interval
+                    )
+                self._updated = now
+                wait = self._paused_until - now
+                if wait <= 0 and (not self.interval or self._tokens >= 1):
+                    if self.interval:
+                        self._tokens -= 1
+                    return
+                if wait <= 0:
+                    wait = (1 - self._tokens) * self.interval
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every worker back for `seconds` (after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _retry_after(response) -> float | None:
+    value = (getattr(response, "headers", None) or {}).get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class AstronautCrawler:
+    """Fetch every astronaut page, checkpointing pages under `checkpoint_dir`."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        checkpoint_dir: str | None = None,
+        page_size: int = PAGE_SIZE,
+        workers: int | None = None,
+        rate_per_min: float | None = None,
+        timeout: float = REQUEST_TIMEOUT_S,
+        max_retries: int | None = None,
+    ):
+        self.base_url = base_url
+        self.checkpoint_dir = checkpoint_dir
+        self.page_size = page_size
+        self.workers = max(1, CRAWL_WORKERS if workers is None else workers)
+        self.timeout = timeout
+        self.max_retries = MAX_RETRIES if max_retries is None else max_retries
+        if rate_per_min is None:
+            rate_per_min = CRAWL_RATE_PER_MIN
+        self.budget = RateBudget(rate_per_min, burst=self.workers)
+
+    # -- HTTP ----------------------------------------------------------------
+
+    def page_url(self, offset: int) -> str:
+        url = f"{self.base_url}?limit={self.page_size}"
+        return url if offset == 0 else f"{url}&offset={offset}"
+
+    def _get(self, url: str) -> dict[str, Any]:
+        """GET a page, retrying rate limits, server errors and timeouts."""
+        for attempt in range(self.max_retries + 1):
+            backoff = 2.0**attempt
+            self.budget.acquire()
+            print(f"Fetching: {url}")
+            try:
+                r = requests.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise CrawlError(f"Request failed: {url}: {e}") from e
+                time.sleep(backoff)
+                continue
+
+            if r.status_code == 429:
+                if attempt == self.max_retries:
+                    raise CrawlError(
+                        "Rate limit hit — try again later; completed pages are "
+                        "checkpointed and will not be fetched again."
+                    )
+                retry_after = _retry_after(r)
+                self.budget.pause(backoff * 5 if retry_after is None else retry_after)
+                continue
+            if r.status_code >= 500 and attempt < self.max_retries:
+                time.sleep(backoff)
+                continue
+            r.raise_for_status()
+            return r.json()
+        raise CrawlError(f"Giving up on {url}")  # not reached
+
+    # -- checkpoints ---------------------------------------------------------
+
+    def _page_path(self, offset: int) -> str:
+        return os.path.join(self.checkpoint_dir, f"page_{offset:07d}.json")
+
+    def _load_page(self, offset: int) -> dict[str, Any] | None:
+        if not self.checkpoint_dir:
+            return None
+        try:
+            with open(self._page_path(offset), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_page(self, offset: int, page: dict[str, Any]) -> None:
+        if not self.checkpoint_dir:
+            return
+        path = self._page_path(offset)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(page, f)
+        os.replace(tmp, path)
+
+    def _prepare_checkpoints(self) -> None:
+        """Reuse checkpoints only if they come from the same, recent crawl."""
+        if not self.checkpoint_dir:
+            return
+        manifest_path = os.path.join(self.checkpoint_dir, "manifest.json")
+        manifest = {"base_url": self.base_url, "page_size": self.page_size}
+        try:
+            with open(manifest_path, "r") as f:
+                old = json.load(f)
+            fresh = time.time() - old.get("started", 0) < CHECKPOINT_MAX_AGE_S
+            if fresh and all(old.get(k) == v for k, v in manifest.items()):
+                return
+        except (OSError, ValueError):
+            pass
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        with open(manifest_path, "w") as f:
+            json.dump({**manifest, "started": time.time()}, f)
+
+    def clear_checkpoints(self) -> None:
+        if self.checkpoint_dir:
+            shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+
+    # -- crawl ---------------------------------------------------------------
+
+    def _fetch_page(self, offset: int) -> dict[str, Any]:
+        page = self._load_page(offset)
+        if page is None:
+            page = self._get(self.page_url(offset))
+            self._save_page(offset, page)
+        return page
+
+    def _follow_next(self, first: dict[str, Any]) -> list[dict[str, Any]]:
+        """Fallback for responses without `count`: walk `next` links in order."""
+        astronauts = list(first.get("results", []))
+        url = first.get("next")
+        while url:
+            data = self._get(url)
+            astronauts.extend(data.get("results", []))
+            url = data.get("next")
+        return astronauts
+
+    def fetch_changed(self, since: str) -> list[dict[str, Any]]:
+        """Astronauts changed since `since` (ISO 8601), newest first, by id.
+
+        Only sees changes that come with a flight (see DELTA_FIELD); status
+        or bio edits without one need a full `crawl`. Usually a single page
+        per query, so this stays sequential.
+        """
+        queries = [
+            {f"{DELTA_FIELD}__gte": since, "ordering": f"-{DELTA_FIELD}"},
+            {"in_space": "true"},
+        ]
+        changed: dict[Any, dict[str, Any]] = {}
+        for params in queries:
+            url = f"{self.base_url}?{urlencode({'limit': self.page_size, **params})}"
+            while url:
+                data = self._get(url)
+                for a in data.get("results", []):
+                    changed.setdefault(a.get("id"), a)
+                url = data.get("next")
+        return list(changed.values())
+
+    def crawl(self) -> list[dict[str, Any]]:
+        """Return every astronaut, fetching only pages not checkpointed yet.
+
+        Raises CrawlError if some pages still fail after retries; run it
+        again to resume.
+        """
+        self._prepare_checkpoints()
+        first = self._fetch_page(0)
+        count = first.get("count")
+        if count is None:
+            return self._follow_next(first)
+
+        offsets = list(range(self.page_size, count, self.page_size))
+        pages = {0: first}
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                offset: pool.submit(self._fetch_page, offset) for offset in offsets
+            }
+            for offset, future in futures.items():
+                try:
+                    pages[offset] = future.result()
+                except (
+                    CrawlError,
+                    requests.RequestException,
+                    OSError,
+                    ValueError,
+                ) as e:
+                    errors.append(e)
+        if errors:
+            raise CrawlError(
+                f"{len(errors)} of {len(offsets) + 1} pages failed "
+                f"({errors[0]}); re-run to resume"
+            ) from errors[0]
+
+        # records can shift between pages while we crawl; keep each id once
+        astronauts = []
+        seen = set()
+        for offset in sorted(pages):
+            for a in pages[offset].get("results", []):
+                key = a.get("id")
+                if key is None or key not in seen:
+                    seen.add(key)
+                    astronauts.append(a)
+        return astronauts
+
+
+if __name__ == "__main__":
+    import llspacedevs
+
+    parser = argparse.ArgumentParser(description="Refresh the astronaut cache")
+    parser.add_argument("--full", action="store_true", help="re-crawl every page")
+    args = parser.parse_args()
+
+    data = llspacedevs.AstronautData()
+    if args.full:
+        print(f"Wrote {data.refresh()} astronauts to {data.cache_file}")
+    else:
+        print(f"Merged {data.sync()} changed astronauts into {data.cache_file}")
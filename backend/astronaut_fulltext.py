@@ -0,0 +1,244 @@
+"""BM25 full-text search over astronaut names and bios.
+
+Scanning ~2 MB of bio text per query doesn't scale, so each snapshot gets an
+inverted index: term -> (record positions, term frequency in the name, term
+frequency in the bio). Queries are scored with BM25F (per-field length
+normalisation, names weighted above bios), and the best `limit` records are
+picked with a bounded heap rather than a full sort.
+
+Text is lowercased, accent-folded and split on anything that isn't a letter
+or digit; a few very common English words are dropped. A query term ending
+in `*`, and the last query term (search-as-you-type), also match every
+vocabulary term they prefix ("geolog" finds "geologist"; numbers only match
+exactly); the best expansion counts for each document.
+
+Indexes are saved as JSON next to the cache along with a checksum of the
+text they were built from, so a restart loads the postings instead of
+re-tokenizing every bio.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import unicodedata
+import zlib
+from collections.abc import Iterable
+
+FORMAT_VERSION = 1
+
+K1 = 1.2
+B = 0.75
+NAME_WEIGHT = 3.0
+BIO_WEIGHT = 1.0
+
+# Prefixes shorter than this only match exactly.
+MIN_PREFIX = 2
+# At most this many vocabulary terms per prefix (most frequent first).
+MAX_EXPANSIONS = 50
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+
+STOPWORDS = frozenset(
+    [
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "for",
+        "from",
+        "had",
+        "has",
+        "he",
+        "her",
+        "his",
+        "in",
+        "is",
+        "it",
+        "its",
+        "of",
+        "on",
+        "or",
+        "she",
+        "that",
+        "the",
+        "their",
+        "they",
+        "this",
+        "to",
+        "was",
+        "were",
+        "which",
+        "who",
+        "with",
+    ]
+)
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercased, accent-folded word tokens without stopwords."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore")
+    return [t for t in _TOKEN.findall(folded.decode().lower()) if t not in STOPWORDS]
+
+
+def checksum(docs: Iterable[tuple[str | None, str | None]]) -> int:
+    """crc32 of the (name, bio) texts, to tell whether a saved index is current."""
+    crc = 0
+    for name, bio in docs:
+        crc = zlib.crc32(f"{name or ''}\x00{bio or ''}\x01".encode(), crc)
+    return crc
+
+
+class FullTextIndex:
+    """Inverted index over (name, bio) documents addressed by position."""
+
+    def __init__(
+        self,
+        postings: dict[str, tuple[list[int], list[int], list[int]]],
+        name_lengths: list[int],
+        bio_lengths: list[int],
+        checksum: int,
+    ):
+        self._postings = postings
+        self._name_lengths = name_lengths
+        self._bio_lengths = bio_lengths
+        self.checksum = checksum
+        self.size = len(name_lengths)
+        self._avg_name = sum(name_lengths) / self.size if self.size else 0.0
+        self._avg_bio = sum(bio_lengths) / self.size if self.size else 0.0
+        self._vocabulary = sorted(postings)
+
+    @classmethod
+    def build(cls, docs: list[tuple[str | None, str | None]]) -> FullTextIndex:
+        """Index (name, bio) pairs; document ids are list positions."""
+        postings: dict[str, tuple[list[int], list[int], list[int]]] = {}
+        name_lengths = []
+        bio_lengths = []
+        for position, (name, bio) in enumerate(docs):
+            name_terms = tokenize(name)
+            bio_terms = tokenize(bio)
+            name_lengths.append(len(name_terms))
+            bio_lengths.append(len(bio_terms))
+            counts: dict[str, list[int]] = {}
+            for term in name_terms:
+                counts.setdefault(term, [0, 0])[0] += 1
+            for term in bio_terms:
+                counts.setdefault(term, [0, 0])[1] += 1
+            for term, (in_name, in_bio) in counts.items():
+                positions, name_tf, bio_tf = postings.setdefault(term, ([], [], []))
+                positions.append(position)
+                name_tf.append(in_name)
+                bio_tf.append(in_bio)
+        return cls(postings, name_lengths, bio_lengths, checksum(docs))
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "version": FORMAT_VERSION,
+                    "checksum": self.checksum,
+                    "name_lengths": self._name_lengths,
+                    "bio_lengths": self._bio_lengths,
+                    "postings": self._postings,
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, expected_checksum: int) -> FullTextIndex | None:
+        """The saved index, or None if missing, outdated or unreadable."""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if (
+                data.get("version") != FORMAT_VERSION
+                or data.get("checksum") != expected_checksum
+            ):
+                return None
+            return cls(
+                {term: tuple(p) for term, p in data["postings"].items()},
+                data["name_lengths"],
+                data["bio_lengths"],
+                expected_checksum,
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    # -- queries ------------------------------------------------------------
+
+    def _expand(self, term: str, prefix: bool) -> list[str]:
+        if not prefix or len(term) < MIN_PREFIX or term.isdigit():
+            return [term] if term in self._postings else []
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + "\x7f")
+        matches = self._vocabulary[start:end]
+        if len(matches) > MAX_EXPANSIONS:
+            matches = heapq.nlargest(
+                MAX_EXPANSIONS, matches, key=lambda t: len(self._postings[t][0])
+            )
+            if term in self._postings and term not in matches:
+                matches.append(term)
+        return matches
+
+    def _term_scores(self, term: str) -> dict[int, float]:
+        positions, name_tf, bio_tf = self._postings[term]
+        df = len(positions)
+        idf = math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+        scores = {}
+        for position, tf_name, tf_bio in zip(positions, name_tf, bio_tf):
+            tf = 0.0
+            if tf_name:
+                norm = 1 - B + B * self._name_lengths[position] / self._avg_name
+                tf += NAME_WEIGHT * tf_name / norm
+            if tf_bio:
+                norm = 1 - B + B * self._bio_lengths[position] / self._avg_bio
+                tf += BIO_WEIGHT * tf_bio / norm
+            scores[position] = idf * tf * (K1 + 1) / (tf + K1)
+        return scores
+
+    def search(
+        self, query: str, limit: int = 10, prefix_last: bool = True
+    ) -> tuple[int, list[tuple[int, float]]]:
+        """(number of matching documents, top `limit` (position, score) pairs).
+
+        Scores add up over query terms; documents need not match every term.
+        """
+        raw = [t.strip() for t in query.lower().split() if t.strip()]
+        terms = []
+        for i, word in enumerate(raw):
+            prefix = word.endswith("*") or (prefix_last and i == len(raw) - 1)
+            tokens = tokenize(word)
+            # in a word like "apollo-1*" only the final token is a prefix
+            terms.extend(
+                (t, prefix and j == len(tokens) - 1) for j, t in enumerate(tokens)
+            )
+
+        totals: dict[int, float] = {}
+        for term, prefix in dict.fromkeys(terms):
+            best: dict[int, float] = {}
+            for expansion in self._expand(term, prefix):
+                for position, score in self._term_scores(expansion).items():
+                    if score > best.get(position, 0.0):
+                        best[position] = score
+            for position, score in best.items():
+                totals[position] = totals.get(position, 0.0) + score
+
+        top = heapq.nlargest(
+            limit, totals.items(), key=lambda item: (item[1], -item[0])
+        )
+        return len(totals), top
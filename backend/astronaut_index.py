@@ -0,0 +1,283 @@
+"""Inverted indexes over the astronaut dataset.
+
+`llspacedevs` used to answer every country/status question with a linear scan
+doing `country.lower() in nationality.lower()` per record. An AstronautIndex
+is built once per loaded snapshot instead, and holds:
+
+- nationality tokens -> the distinct nationality strings containing them, and
+  each distinct string -> record positions, so substring country matches
+  are resolved against a few dozen tokens rather than every record;
+- status, type and agency (abbreviation and full name) posting sets;
+- precomputed per-nationality counts and active/inactive name lists;
+- sorted age / birth-date columns for range filters, and a precomputed
+  rank per record for every sort key (durations parsed once at build).
+
+Records are identified by their position in the snapshot list, and posting
+lists are frozensets of positions, so filter combinations are set
+intersections. Lookups are case-insensitive.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+import zlib
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+from astronaut_records import AstronautRecord
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+_EMPTY: frozenset[int] = frozenset()
+
+# Distinct country queries remembered per index (there are only a few dozen
+# nationalities, so hit rates are high).
+_COUNTRY_CACHE_SIZE = 1024
+
+_DURATION = re.compile(
+    r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$"
+)
+
+# Sort keys accepted by `AstronautIndex.order`.
+SORT_KEYS = ("name", "time_in_space", "eva_time")
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Seconds in an ISO 8601 duration like "P396DT11H33M45S" (None if unset/bad)."""
+    if not value:
+        return None
+    m = _DURATION.match(value)
+    if not m:
+        return None
+    days, hours, minutes, seconds = (float(g) if g else 0.0 for g in m.groups())
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+
+def _norm(value: Any) -> str:
+    return str(value).strip().lower() if value is not None else ""
+
+
+def _tokens(text: str) -> list[str]:
+    return [t for t in _TOKEN_SPLIT.split(text) if t]
+
+
+class AstronautIndex:
+    """Posting sets and precomputed aggregates for one astronaut snapshot."""
+
+    def __init__(self, records: list[AstronautRecord]):
+        self.size = len(records)
+        self._names = [r.name for r in records]
+        self._positions = {r.id: i for i, r in enumerate(records) if r.id is not None}
+
+        by_nationality: dict[str, list[int]] = {}
+        by_status: dict[str, list[int]] = {}
+        by_type: dict[str, list[int]] = {}
+        by_agency: dict[str, list[int]] = {}
+        in_space: list[int] = []
+
+        # raw nationality strings, in first-seen order (the aggregates below
+        # key on the raw string, as the scans they replace did)
+        self.nationality_counts: Counter = Counter()
+        self._nationality_people: dict[str, dict[str, list[str]]] = {}
+
+        for i, r in enumerate(records):
+            nationality = r.nationality
+            status = _norm(r.status)
+            if nationality:
+                by_nationality.setdefault(nationality.lower(), []).append(i)
+                self.nationality_counts[nationality] += 1
+                people = self._nationality_people.setdefault(
+                    nationality, {"active": [], "inactive": []}
+                )
+                people["active" if status == "active" else "inactive"].append(r.name)
+            if status:
+                by_status.setdefault(status, []).append(i)
+            kind = _norm(r.type)
+            if kind:
+                by_type.setdefault(kind, []).append(i)
+            for key in {_norm(r.agency), _norm(r.agency_name)}:
+                if key:
+                    by_agency.setdefault(key, []).append(i)
+            if r.in_space:
+                in_space.append(i)
+
+        self._by_nationality = {k: frozenset(v) for k, v in by_nationality.items()}
+        self._by_status = {k: frozenset(v) for k, v in by_status.items()}
+        self._by_type = {k: frozenset(v) for k, v in by_type.items()}
+        self._by_agency = {k: frozenset(v) for k, v in by_agency.items()}
+        self._in_space = frozenset(in_space)
+        self.all_ids = frozenset(range(self.size))
+
+        # token -> distinct lowercased nationality strings containing it
+        self._token_nationalities: dict[str, list[str]] = {}
+        for nationality in self._by_nationality:
+            for token in dict.fromkeys(_tokens(nationality)):
+                self._token_nationalities.setdefault(token, []).append(nationality)
+
+        self._country_cache: dict[str, frozenset[int]] = {}
+        self._country_lock = threading.Lock()
+
+        # range columns: (value, id) pairs sorted by value, unknowns left out
+        self._ages = sorted(
+            (r.age, i) for i, r in enumerate(records) if r.age is not None
+        )
+        self._births = sorted(
+            (r.date_of_birth, i) for i, r in enumerate(records) if r.date_of_birth
+        )
+
+        # sort ranks: _ranks[key][descending][id] is the record's position in
+        # that ordering; records without a value sort last either way
+        self.time_in_space = [parse_duration(r.time_in_space) for r in records]
+        self.eva_time = [parse_duration(r.eva_time) for r in records]
+        sort_values = {
+            "name": [_norm(n) or None for n in self._names],
+            "time_in_space": self.time_in_space,
+            "eva_time": self.eva_time,
+        }
+        self._ranks: dict[str, tuple[list[int], list[int]]] = {}
+        for key, values in sort_values.items():
+            known = [i for i, v in enumerate(values) if v is not None]
+            unknown = [i for i, v in enumerate(values) if v is None]
+            asc = sorted(known, key=values.__getitem__)
+            desc = sorted(known, key=values.__getitem__, reverse=True)
+            self._ranks[key] = (
+                self._rank_of(asc + unknown),
+                self._rank_of(desc + unknown),
+            )
+
+        # changes whenever any ordering does, so pagination cursors from an
+        # older snapshot can be detected after a reload
+        self.version = zlib.crc32(repr(list(self._ranks.values())).encode())
+
+    # -- posting lookups --------------------------------------------------
+
+    def country(self, query: str) -> frozenset[int]:
+        """Ids whose nationality contains `query` (case-insensitive substring).
+
+        A query made only of letters/digits can only occur inside a single
+        token, so it is matched against the token vocabulary; anything with
+        spaces or punctuation is matched against the distinct nationality
+        strings. Either way the result equals the old per-record scan.
+        """
+        q = query.lower()
+        cached = self._country_cache.get(q)
+        if cached is not None:
+            return cached
+
+        if q and not _TOKEN_SPLIT.search(q):
+            matched = {
+                nationality
+                for token, nationalities in self._token_nationalities.items()
+                if q in token
+                for nationality in nationalities
+            }
+        else:
+            matched = {n for n in self._by_nationality if q in n}
+        ids = (
+            frozenset().union(*(self._by_nationality[n] for n in matched))
+            if matched
+            else _EMPTY
+        )
+
+        with self._country_lock:
+            if len(self._country_cache) >= _COUNTRY_CACHE_SIZE:
+                self._country_cache.clear()
+            self._country_cache[q] = ids
+        return ids
+
+    def status(self, name: str) -> frozenset[int]:
+        return self._by_status.get(_norm(name), _EMPTY)
+
+    def type(self, name: str) -> frozenset[int]:
+        return self._by_type.get(_norm(name), _EMPTY)
+
+    def agency(self, name: str) -> frozenset[int]:
+        """Ids for an agency abbreviation ("NASA") or full name."""
+        return self._by_agency.get(_norm(name), _EMPTY)
+
+    def position(self, astronaut_id: Any) -> int | None:
+        """Snapshot position of the record with API id `astronaut_id`."""
+        return self._positions.get(astronaut_id)
+
+    def in_space(self) -> frozenset[int]:
+        return self._in_space
+
+    def age_range(
+        self, min_age: int | None = None, max_age: int | None = None
+    ) -> frozenset[int]:
+        """Ids with min_age <= age <= max_age (records without an age excluded)."""
+        return self._range(self._ages, min_age, max_age)
+
+    def birth_range(
+        self, born_after: str | None = None, born_before: str | None = None
+    ) -> frozenset[int]:
+        """Ids born on/after `born_after` and on/before `born_before` (YYYY-MM-DD)."""
+        return self._range(self._births, born_after, born_before)
+
+    @staticmethod
+    def _range(column: list, low: Any, high: Any) -> frozenset[int]:
+        start = 0 if low is None else bisect.bisect_left(column, (low, -1))
+        end = (
+            len(column)
+            if high is None
+            else bisect.bisect_right(column, (high, float("inf")))
+        )
+        return frozenset(i for _, i in column[start:end])
+
+    def rank(self, key: str, descending: bool = False) -> list[int]:
+        """Position of every record in the `key` ordering (indexed by id)."""
+        if key not in self._ranks:
+            raise ValueError(
+                f"Invalid sort '{key}'. Use one of: {', '.join(SORT_KEYS)}"
+            )
+        return self._ranks[key][1 if descending else 0]
+
+    def order(
+        self, ids: Iterable[int], key: str, descending: bool = False
+    ) -> list[int]:
+        """`ids` sorted by a sort key, using the precomputed ranks."""
+        return sorted(ids, key=self.rank(key, descending).__getitem__)
+
+    @staticmethod
+    def _rank_of(ordered: list[int]) -> list[int]:
+        ranks = [0] * len(ordered)
+        for position, i in enumerate(ordered):
+            ranks[i] = position
+        return ranks
+
+    @property
+    def statuses(self) -> list[str]:
+        return sorted(self._by_status)
+
+    @property
+    def types(self) -> list[str]:
+        return sorted(self._by_type)
+
+    # -- helpers ------------------------------------------------------------
+
+    @staticmethod
+    def intersect(*postings: Iterable[int] | None) -> frozenset[int]:
+        """Intersect posting sets, smallest first; None means "no filter"."""
+        sets = sorted((frozenset(p) for p in postings if p is not None), key=len)
+        if not sets:
+            raise ValueError("intersect() needs at least one posting set")
+        result = sets[0]
+        for other in sets[1:]:
+            if not result:
+                break
+            result = result & other
+        return result
+
+    def names(self, ids: Iterable[int]) -> list[str]:
+        """Names for `ids`, in dataset order."""
+        return [self._names[i] for i in sorted(ids)]
+
+    def top_countries(self, top_n: int = 10) -> list:
+        """(country, count, {"active": [...], "inactive": [...]}) tuples."""
+        return [
+            (country, count, self._nationality_people[country])
+            for country, count in self.nationality_counts.most_common(top_n)
+        ]
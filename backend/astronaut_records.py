@@ -0,0 +1,176 @@
+"""Compact in-memory astronaut records and an on-disk details store.
+
+A TheSpaceDevs astronaut payload is mostly text the API routes never touch
+(bio, URLs, social links, the full agency object, first/last flight). Holding
+846 of those dicts in every worker costs several MB, and scans walk all of it.
+
+`AstronautRecord` keeps only the hot fields in `__slots__`, with repeated
+strings (nationality, status, type, agency) interned. Full payloads go to a
+JSON-lines sidecar next to the cache file; `DetailsStore` remembers each
+record's byte span and reads one on demand with `os.pread`, so lookups are
+thread-safe and keep working on the file they were built from even if a newer
+snapshot replaces it. Changes are written as a whole new (compact) file that
+is renamed into place, with payloads streamed from the old one.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import sys
+import threading
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+
+def _interned(value: str | None) -> str | None:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class AstronautRecord:
+    """Hot fields of one astronaut; nested objects flattened to their name."""
+
+    __slots__ = (
+        "age",
+        "agency",
+        "agency_name",
+        "date_of_birth",
+        "date_of_death",
+        "eva_time",
+        "flights_count",
+        "id",
+        "in_space",
+        "name",
+        "nationality",
+        "profile_image_thumbnail",
+        "spacewalks_count",
+        "status",
+        "time_in_space",
+        "type",
+    )
+
+    def __init__(self, **fields: Any):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_dict(cls, a: dict[str, Any]) -> AstronautRecord:
+        agency = a.get("agency") or {}
+        return cls(
+            id=a.get("id"),
+            name=a.get("name"),
+            nationality=_interned(a.get("nationality")),
+            status=_interned((a.get("status") or {}).get("name")),
+            type=_interned((a.get("type") or {}).get("name")),
+            agency=_interned(agency.get("abbrev")),
+            agency_name=_interned(agency.get("name")),
+            in_space=a.get("in_space"),
+            age=a.get("age"),
+            date_of_birth=a.get("date_of_birth"),
+            date_of_death=a.get("date_of_death"),
+            time_in_space=a.get("time_in_space"),
+            eva_time=a.get("eva_time"),
+            flights_count=a.get("flights_count"),
+            spacewalks_count=a.get("spacewalks_count"),
+            profile_image_thumbnail=a.get("profile_image_thumbnail"),
+        )
+
+    @classmethod
+    def from_row(cls, row: tuple[Any, ...]) -> AstronautRecord:
+        """Record from a tuple of values in `__slots__` order (binary cache)."""
+        fields = dict(zip(cls.__slots__, row))
+        for name in ("nationality", "status", "type", "agency", "agency_name"):
+            fields[name] = _interned(fields[name])
+        if fields["in_space"] is not None:
+            fields["in_space"] = bool(fields["in_space"])
+        return cls(**fields)
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return getattr(self, field, default)
+
+    def __repr__(self) -> str:
+        return f"AstronautRecord(id={self.id!r}, name={self.name!r})"
+
+
+class DetailsStore:
+    """Full astronaut payloads in a JSON-lines file, read one record at a time.
+
+    Records are addressed by their position in the snapshot.
+    """
+
+    def __init__(self, path: str, spans: list[tuple[int, int]]):
+        self.path = path
+        self._spans = spans
+        self._fd = os.open(path, os.O_RDONLY)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, path: str, astronauts: Iterable[dict[str, Any]]) -> DetailsStore:
+        """Write `astronauts` to `path` (atomically) and open it."""
+        spans = []
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        offset = 0
+        try:
+            with open(tmp, "wb") as f:
+                for a in astronauts:
+                    line = json.dumps(a, separators=(",", ":")).encode() + b"\n"
+                    f.write(line)
+                    spans.append((offset, len(line)))
+                    offset += len(line)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return cls(path, spans)
+
+    def with_changes(
+        self, changes: dict[int, dict[str, Any]], added: list[dict[str, Any]]
+    ) -> DetailsStore:
+        """A store where `changes` (position -> payload) replace records and
+        `added` are appended after them.
+
+        The file is rewritten from this store one payload at a time, so it
+        never holds superseded payloads; readers still holding this store
+        keep reading the file it opened.
+        """
+
+        def payloads() -> Iterator[dict[str, Any]]:
+            for position in range(len(self._spans)):
+                yield changes[position] if position in changes else self.get(position)
+            yield from added
+
+        return DetailsStore.build(self.path, payloads())
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def get(self, position: int) -> dict[str, Any]:
+        """The full payload of the record at `position`."""
+        offset, length = self._spans[position]
+        return json.loads(os.pread(self._fd, length, offset))
+
+    def all(self) -> list[dict[str, Any]]:
+        """Every payload, in order (one sequential read)."""
+        if not self._spans:
+            return []
+        end = max(offset + length for offset, length in self._spans)
+        data = os.pread(self._fd, end, 0)
+        return [
+            json.loads(data[offset : offset + length]) for offset, length in self._spans
+        ]
+
+    def iter_all(self) -> Iterator[dict[str, Any]]:
+        """Every payload, in order, read one at a time."""
+        for position in range(len(self._spans)):
+            yield self.get(position)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __del__(self):
+        with contextlib.suppress(OSError, AttributeError):
+            self.close()
@@ -0,0 +1,190 @@
+"""Materialized astronaut leaderboards and aggregates.
+
+Built once per loaded snapshot from the compact records and the durations
+`AstronautIndex` already parsed to seconds, so the stats routes never parse
+an ISO 8601 duration or sort the dataset per request:
+
+- leaderboards: record positions ordered by time in space, EVA time, flights
+  and spacewalks (records without a value left out), served by slicing;
+- per-nationality count, totals and medians of time in space and EVA time,
+  and total flights, pre-sorted by each of those;
+- age distributions (10-year buckets and summary numbers), overall and per
+  status.
+
+Records of type "Non-Human" (mannequins, plush toys) are left out; Starman
+would otherwise top the time-in-space board.
+"""
+
+from __future__ import annotations
+
+import statistics
+from typing import Any
+
+from astronaut_index import AstronautIndex
+from astronaut_records import AstronautRecord
+
+# Leaderboard metrics, all "higher is better".
+METRICS = ("time_in_space", "eva_time", "flights_count", "spacewalks_count")
+
+# Sort keys accepted by `AstronautStats.countries`.
+COUNTRY_SORTS = (
+    "count",
+    "total_time_in_space_s",
+    "median_time_in_space_s",
+    "total_eva_time_s",
+    "median_eva_time_s",
+    "flights",
+)
+
+AGE_BUCKET = 10
+
+EXCLUDED_TYPES = frozenset({"non-human"})
+
+
+def format_duration(seconds: float | None) -> str | None:
+    """Compact human form of a duration, e.g. "396d 11h 33m"."""
+    if seconds is None:
+        return None
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    return f"{hours}h {minutes}m"
+
+
+def _summary(values: list[float]) -> dict[str, Any]:
+    if not values:
+        return {"count": 0, "total": 0, "median": None}
+    return {
+        "count": len(values),
+        "total": sum(values),
+        "median": statistics.median(values),
+    }
+
+
+def _age_distribution(ages: list[int]) -> dict[str, Any]:
+    if not ages:
+        return {
+            "count": 0,
+            "min": None,
+            "max": None,
+            "mean": None,
+            "median": None,
+            "buckets": {},
+        }
+    buckets: dict[str, int] = {}
+    for age in sorted(ages):
+        low = age // AGE_BUCKET * AGE_BUCKET
+        label = f"{low}-{low + AGE_BUCKET - 1}"
+        buckets[label] = buckets.get(label, 0) + 1
+    return {
+        "count": len(ages),
+        "min": min(ages),
+        "max": max(ages),
+        "mean": round(statistics.fmean(ages), 1),
+        "median": statistics.median(ages),
+        "buckets": buckets,
+    }
+
+
+class AstronautStats:
+    """Leaderboards and aggregates for one astronaut snapshot."""
+
+    def __init__(self, records: list[AstronautRecord], index: AstronautIndex):
+        self._records = records
+        people = [
+            i
+            for i, r in enumerate(records)
+            if (r.type or "").lower() not in EXCLUDED_TYPES
+        ]
+        self._values: dict[str, list[float | None]] = {
+            "time_in_space": index.time_in_space,
+            "eva_time": index.eva_time,
+            "flights_count": [r.flights_count for r in records],
+            "spacewalks_count": [r.spacewalks_count for r in records],
+        }
+
+        # positions best-first; ties broken by name so output is stable
+        self._leaderboards: dict[str, list[int]] = {}
+        for metric, values in self._values.items():
+            known = [i for i in people if values[i]]
+            known.sort(key=lambda i: (-values[i], (records[i].name or "").lower()))
+            self._leaderboards[metric] = known
+
+        by_country: dict[str, list[int]] = {}
+        for i in people:
+            if records[i].nationality:
+                by_country.setdefault(records[i].nationality, []).append(i)
+        countries: list[dict[str, Any]] = []
+        for country, positions in by_country.items():
+            tis = _summary(
+                [index.time_in_space[i] for i in positions if index.time_in_space[i]]
+            )
+            eva = _summary([index.eva_time[i] for i in positions if index.eva_time[i]])
+            countries.append(
+                {
+                    "country": country,
+                    "count": len(positions),
+                    "total_time_in_space_s": tis["total"],
+                    "median_time_in_space_s": tis["median"],
+                    "total_eva_time_s": eva["total"],
+                    "median_eva_time_s": eva["median"],
+                    "flights": sum(records[i].flights_count or 0 for i in positions),
+                }
+            )
+
+        self._countries = {
+            sort: sorted(countries, key=lambda row: (-(row[sort] or 0), row["country"]))
+            for sort in COUNTRY_SORTS
+        }
+
+        by_status: dict[str, list[int]] = {}
+        for r in (records[i] for i in people):
+            if r.age is not None:
+                by_status.setdefault(r.status or "Unknown", []).append(r.age)
+        self._ages = {
+            "all": _age_distribution([a for ages in by_status.values() for a in ages]),
+            "by_status": {
+                status: _age_distribution(ages)
+                for status, ages in sorted(by_status.items())
+            },
+        }
+
+    def leaderboard(self, metric: str, limit: int = 10) -> list[dict[str, Any]]:
+        """Top `limit` astronauts by `metric`, best first."""
+        if metric not in self._leaderboards:
+            raise ValueError(
+                f"Invalid metric '{metric}'. Use one of: {', '.join(METRICS)}"
+            )
+        values = self._values[metric]
+        entries = []
+        for rank, i in enumerate(self._leaderboards[metric][:limit], 1):
+            r = self._records[i]
+            entry = {
+                "rank": rank,
+                "id": r.id,
+                "name": r.name,
+                "nationality": r.nationality,
+                "agency": r.agency,
+                "value": values[i],
+            }
+            if metric in ("time_in_space", "eva_time"):
+                entry["display"] = format_duration(values[i])
+            entries.append(entry)
+        return entries
+
+    def countries(
+        self, sort: str = "count", limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Per-nationality aggregates, largest `sort` value first."""
+        if sort not in COUNTRY_SORTS:
+            raise ValueError(
+                f"Invalid sort '{sort}'. Use one of: {', '.join(COUNTRY_SORTS)}"
+            )
+        rows = self._countries[sort]
+        return rows[:limit] if limit is not None else list(rows)
+
+    def ages(self) -> dict[str, Any]:
+        """Age distribution overall and per status."""
+        return self._ages
@@ -0,0 +1,237 @@
+"""SQLite binary cache for the astronaut dataset.
+
+`astronauts.json` is ~2 MB of indented JSON, and every cold load used to
+parse all of it (bios included) before a single route could answer. The
+binary cache is one SQLite file with:
+
+- `meta`: schema version, record count and when it was written;
+- `records`: one row per astronaut with only the hot `AstronautRecord`
+  columns, read in a single query at load;
+- `details`: the full JSON payload per astronaut (zlib-compressed), read one
+  row at a time when a route needs bios, URLs or flights.
+
+Files are written to a temporary path and renamed into place, and readers
+open them read-only, so a snapshot keeps reading the file it was loaded from
+even after a newer cache replaces it. The JSON format stays the interchange
+format:
+
+    python astronaut_store.py import astronauts.json astronauts.db
+    python astronaut_store.py export astronauts.db astronauts.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from astronaut_records import AstronautRecord
+
+SCHEMA_VERSION = 1
+
+_COMPRESSION_LEVEL = 6
+
+_COLUMNS = AstronautRecord.__slots__
+
+
+class StoreError(Exception):
+    """The binary cache is missing, unreadable or from another schema version."""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Read-only connection; raises StoreError if the file isn't a current cache."""
+    if not os.path.exists(path):
+        raise StoreError(f"{path} does not exist")
+    try:
+        conn = sqlite3.connect(
+            f"file:{path}?mode=ro", uri=True, check_same_thread=False
+        )
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key = 'schema_version'"
+        ).fetchone()
+    except sqlite3.Error as e:
+        raise StoreError(f"{path} is not an astronaut cache: {e}") from e
+    if row is None or int(row[0]) != SCHEMA_VERSION:
+        conn.close()
+        raise StoreError(
+            f"{path} has schema version {row and row[0]}, expected {SCHEMA_VERSION}"
+        )
+    return conn
+
+
+def _pack(payload: dict[str, Any]) -> bytes:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return zlib.compress(raw, _COMPRESSION_LEVEL)
+
+
+def _unpack(blob: bytes) -> dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
+
+
+def write(path: str, astronauts: Iterable[dict[str, Any]]) -> None:
+    """Write `astronauts` (full payloads, in order) to `path` atomically.
+
+    `astronauts` is consumed once, so it can stream from another store.
+    """
+    # unique per writer, so processes syncing at once never share a temp file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        _write_tables(sqlite3.connect(tmp), astronauts)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _write_tables(
+    conn: sqlite3.Connection, astronauts: Iterable[dict[str, Any]]
+) -> None:
+    """Create and fill the cache tables on `conn`, then close it."""
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(
+            "CREATE TABLE records (position INTEGER PRIMARY KEY, "
+            + ", ".join(_COLUMNS)
+            + ")"
+        )
+        conn.execute(
+            "CREATE TABLE details (position INTEGER PRIMARY KEY, payload BLOB NOT NULL)"
+        )
+        insert_record = (
+            f"INSERT INTO records VALUES (?, {', '.join('?' * len(_COLUMNS))})"
+        )
+        count = 0
+        for i, a in enumerate(astronauts):
+            r = AstronautRecord.from_dict(a)
+            conn.execute(insert_record, (i, *(getattr(r, c) for c in _COLUMNS)))
+            conn.execute("INSERT INTO details VALUES (?, ?)", (i, _pack(a)))
+            count += 1
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("schema_version", str(SCHEMA_VERSION)),
+                ("count", str(count)),
+                ("written_at", str(time.time())),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def read_records(path: str) -> list[AstronautRecord]:
+    """The hot records, in order, without touching the payloads."""
+    conn = _connect(path)
+    try:
+        rows = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM records ORDER BY position"
+        ).fetchall()
+    finally:
+        conn.close()
+    return [AstronautRecord.from_row(row) for row in rows]
+
+
+class SqliteDetails:
+    """Full payloads from the `details` table; same interface as DetailsStore."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = _connect(path)
+        self._lock = threading.Lock()
+        (self._size,) = self._conn.execute("SELECT COUNT(*) FROM details").fetchone()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, position: int) -> dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM details WHERE position = ?", (position,)
+            ).fetchone()
+        if row is None:
+            raise IndexError(position)
+        return _unpack(row[0])
+
+    def all(self) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM details ORDER BY position"
+            ).fetchall()
+        return [_unpack(payload) for (payload,) in rows]
+
+    _BATCH = 100
+
+    def iter_all(self) -> Iterator[dict[str, Any]]:
+        """Every payload, in order, read a batch of rows at a time."""
+        for start in range(0, self._size, self._BATCH):
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT payload FROM details WHERE position >= ? "
+                    "ORDER BY position LIMIT ?",
+                    (start, self._BATCH),
+                ).fetchall()
+            for (payload,) in rows:
+                yield _unpack(payload)
+
+    def with_changes(self, changes, added) -> None:
+        """Binary caches are rewritten whole; callers rebuild."""
+        return
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __del__(self):
+        with contextlib.suppress(sqlite3.Error, AttributeError):
+            self.close()
+
+
+def read_payloads(path: str) -> list[dict[str, Any]]:
+    """Every full payload, in order."""
+    details = SqliteDetails(path)
+    try:
+        return details.all()
+    finally:
+        details.close()
+
+
+def import_json(json_path: str, path: str) -> int:
+    with open(json_path, "r") as f:
+        astronauts = json.load(f)
+    write(path, astronauts)
+    return len(astronauts)
+
+
+def export_json(path: str, json_path: str) -> int:
+    """Write the cache back out in the JSON cache format."""
+    astronauts = read_payloads(path)
+    tmp = f"{json_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(astronauts, f, indent=2)
+    os.replace(tmp, json_path)
+    return len(astronauts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert astronaut caches")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args()
+
+    convert = import_json if args.command == "import" else export_json
+    n = convert(args.source, args.target)
+    print(f"Wrote {n} astronauts to {args.target}")
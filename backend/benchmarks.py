@@ -0,0 +1,295 @@
+"""Micro-benchmarks for backend hot paths.
+
+Run from /backend so the data files resolve:
+
+    python benchmarks.py              # run everything
+    python benchmarks.py moon_rise_set
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+
+def _timeit(fn: Callable[[], object], repeat: int) -> float:
+    """Return mean wall time per call in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def bench_moon_rise_set(repeat: int = 20) -> None:
+    """Rise/set latency with per-call skyfield setup vs the shared ephemeris."""
+    import moon_phase
+    from skyfield.almanac import find_discrete, risings_and_settings
+    from skyfield.api import Topos, load, load_file
+
+    lat, lon = 40.11, -88.24
+    dates = [datetime(2025, 1, 1) + timedelta(days=i) for i in range(repeat)]
+
+    # Open the same local file the shared ephemeris uses, so the "before" path
+    # pays the per-call open and never a download inside the timed region.
+    eph_path = moon_phase._get_ephemeris().path
+
+    def setup_before():
+        eph = load_file(eph_path)
+        location = Topos(latitude_degrees=lat, longitude_degrees=lon)
+        return eph, location, load.timescale()
+
+    def setup_after():
+        return (
+            moon_phase._get_ephemeris(),
+            moon_phase._get_topos(lat, lon),
+            moon_phase._get_timescale(),
+        )
+
+    def before(date: datetime) -> None:
+        # the pre-caching implementation: open the SPK and build everything per call
+        eph, location, ts = setup_before()
+        start_time = ts.utc(date.year, date.month, date.day, 0, 0, 0)
+        end_time = ts.utc(date.year, date.month, date.day, 23, 59, 59)
+        f = risings_and_settings(eph, eph["moon"], location)
+        find_discrete(start_time, end_time, f)
+
+    print(
+        f"moon_rise_set setup: before {_timeit(setup_before, repeat):.3f} ms/call, "
+        f"after {_timeit(setup_after, repeat):.3f} ms/call"
+    )
+
+    it = iter(dates)
+    before_ms = _timeit(lambda: before(next(it)), repeat)
+    it = iter(dates)
+    after_ms = _timeit(
+        lambda: moon_phase.calculate_moon_rise_set(next(it), lat, lon), repeat
+    )
+    print(
+        f"moon_rise_set: before {before_ms:.2f} ms/call, "
+        f"after {after_ms:.2f} ms/call ({before_ms / after_ms:.1f}x)"
+    )
+
+
+def bench_moon_phase_range(repeat: int = 5) -> None:
+    """Ten-year daily calendar: scalar loop vs the vectorized engine."""
+    import moon_phase
+
+    start = datetime(2000, 1, 1)
+    days = 3650
+
+    def scalar() -> None:
+        for i in range(days):
+            moon_phase.calculate_moon_phase(start + timedelta(days=i))
+
+    scalar_ms = _timeit(scalar, repeat)
+    rows_ms = _timeit(
+        lambda: moon_phase.get_moon_phase_range("2000-01-01", days), repeat
+    )
+    cols_ms = _timeit(
+        lambda: moon_phase.get_moon_phase_range("2000-01-01", days, columnar=True),
+        repeat,
+    )
+    print(
+        f"moon_phase_range (10y daily): scalar {scalar_ms:.2f} ms, "
+        f"vectorized rows {rows_ms:.2f} ms, columns {cols_ms:.2f} ms"
+    )
+
+
+def bench_moon_rise_set_range(repeat: int = 3) -> None:
+    """A month of rise/set: 30 single-day searches vs one windowed search."""
+    import moon_phase
+
+    lat, lon = 40.11, -88.24
+    start = datetime(2025, 3, 1)
+    moon_phase._get_ephemeris()
+
+    def per_day() -> None:
+        for i in range(30):
+            moon_phase.calculate_moon_rise_set(start + timedelta(days=i), lat, lon)
+
+    def per_day_cold() -> None:
+        # the same 30 dates every repeat would otherwise be pure memo hits
+        moon_phase._rise_set_cache.clear()
+        per_day()
+
+    per_day_ms = _timeit(per_day_cold, repeat)
+    warm_ms = _timeit(per_day, repeat)
+    window_ms = _timeit(
+        lambda: moon_phase.calculate_moon_rise_set_range(start, 30, lat, lon), repeat
+    )
+    print(
+        f"moon_rise_set_range (30 days): per-day {per_day_ms:.1f} ms cold, "
+        f"{warm_ms:.2f} ms memoized; single search {window_ms:.1f} ms "
+        f"({per_day_ms / window_ms:.1f}x vs cold)"
+    )
+
+
+def bench_compute_isolation(seconds: float = 3.0) -> None:
+    """Latency of a light route while rise/set searches run inline vs pooled."""
+    import threading
+
+    import app
+    import moon_phase
+
+    lat, lon = 40.11, -88.24
+    start = datetime(2025, 3, 1)
+    client = app.app.test_client()
+    moon_phase.calculate_moon_rise_set_range(start, 1, lat, lon)  # warm the pool
+    moon_phase._get_ephemeris()
+
+    def light_latency(search: Callable[[float], object]) -> tuple[float, float]:
+        stop = threading.Event()
+
+        def load(worker: int) -> None:
+            i = 0
+            while not stop.is_set():
+                search(lat + worker + i * 0.01)  # fresh location, no cache hits
+                i += 1
+
+        threads = [threading.Thread(target=load, args=(w,)) for w in range(4)]
+        for t in threads:
+            t.start()
+        samples = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            client.get("/health")
+            samples.append((time.perf_counter() - t0) * 1000.0)
+            time.sleep(0.01)
+        stop.set()
+        for t in threads:
+            t.join()
+        samples.sort()
+        return samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+    inline = light_latency(lambda la: moon_phase._rise_set_range(start, 30, la, lon))
+    pooled = light_latency(
+        lambda la: moon_phase.calculate_moon_rise_set_range(start, 30, la, lon)
+    )
+    print(
+        f"compute_isolation (/health p50/p95 under rise/set load): "
+        f"inline {inline[0]:.2f}/{inline[1]:.2f} ms, "
+        f"pooled {pooled[0]:.2f}/{pooled[1]:.2f} ms"
+    )
+
+
+def bench_astronaut_search(repeat: int = 200) -> None:
+    """Multi-filter astronaut query: linear scan + sort vs the indexed engine."""
+    import llspacedevs
+    from astronaut_index import parse_duration
+
+    ad = llspacedevs.AstronautData()
+    astronauts = ad.get_astronauts()
+    ad.get_index()  # build outside the timing
+
+    def scan() -> list:
+        hits = [
+            a
+            for a in astronauts
+            if "american" in (a.get("nationality") or "").lower()
+            and ((a.get("status") or {}).get("name") or "").lower() == "retired"
+        ]
+        hits.sort(key=lambda a: -(parse_duration(a.get("time_in_space")) or 0))
+        return hits[:20]
+
+    def indexed() -> dict:
+        return ad.search_astronauts(
+            country="american",
+            status="retired",
+            sort="time_in_space",
+            order="desc",
+            limit=20,
+        )
+
+    def unfiltered() -> dict:
+        return ad.search_astronauts(sort="eva_time", order="desc", limit=50)
+
+    scan_us = _timeit(scan, repeat) * 1000
+    indexed_us = _timeit(indexed, repeat) * 1000
+    all_us = _timeit(unfiltered, repeat) * 1000
+    print(
+        f"astronaut_search ({len(astronauts)} records): scan {scan_us:.0f} us, "
+        f"indexed {indexed_us:.0f} us ({scan_us / indexed_us:.1f}x), "
+        f"unfiltered page {all_us:.0f} us"
+    )
+
+
+def bench_astronaut_fulltext(repeat: int = 200) -> None:
+    """Free-text query over names and bios: substring scan vs the BM25 index."""
+    import llspacedevs
+
+    ad = llspacedevs.AstronautData()
+    astronauts = ad.get_astronauts()
+    ad.fulltext_search("warmup")  # load or build the index outside the timing
+
+    def scan() -> list:
+        terms = ("soyuz", "commander")
+        return [
+            a["name"]
+            for a in astronauts
+            if any(
+                t in f"{a.get('name') or ''} {a.get('bio') or ''}".lower()
+                for t in terms
+            )
+        ][:10]
+
+    def indexed() -> dict:
+        return ad.fulltext_search("soyuz commander", limit=10)
+
+    scan_us = _timeit(scan, repeat) * 1000
+    indexed_us = _timeit(indexed, repeat) * 1000
+    print(
+        f"astronaut_fulltext ({len(astronauts)} records): scan {scan_us:.0f} us "
+        f"(unranked), BM25 top-10 {indexed_us:.0f} us ({scan_us / indexed_us:.1f}x)"
+    )
+
+
+def bench_astronaut_load(repeat: int = 10) -> None:
+    """Cold AstronautData load: JSON cache vs the binary (SQLite) cache."""
+    import os
+    import shutil
+    import tempfile
+
+    import astronaut_store
+    import llspacedevs
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "astronauts.json")
+        db_path = os.path.join(tmp, "astronauts.db")
+        shutil.copy(llspacedevs.JSON_CACHE_PATH, json_path)
+        astronaut_store.import_json(json_path, db_path)
+
+        def cold(path: str) -> Callable[[], object]:
+            return lambda: llspacedevs.AstronautData(path).get_records()
+
+        json_ms = _timeit(cold(json_path), repeat)
+        db_ms = _timeit(cold(db_path), repeat)
+        rows_ms = _timeit(lambda: astronaut_store.read_records(db_path), repeat)
+        sizes = os.path.getsize(json_path) / 1e6, os.path.getsize(db_path) / 1e6
+    print(
+        f"astronaut_load: json {json_ms:.1f} ms ({sizes[0]:.1f} MB), "
+        f"sqlite {db_ms:.1f} ms ({sizes[1]:.1f} MB, {json_ms / db_ms:.1f}x; "
+        f"reading records {rows_ms:.1f} ms, the rest is index/stats build)"
+    )
+
+
+BENCHMARKS: dict[str, Callable[[], None]] = {
+    "moon_rise_set": bench_moon_rise_set,
+    "moon_phase_range": bench_moon_phase_range,
+    "moon_rise_set_range": bench_moon_rise_set_range,
+    "compute_isolation": bench_compute_isolation,
+    "astronaut_search": bench_astronaut_search,
+    "astronaut_fulltext": bench_astronaut_fulltext,
+    "astronaut_load": bench_astronaut_load,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"unknown benchmark '{name}', choose from: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
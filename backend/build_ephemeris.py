@@ -0,0 +1,75 @@
+"""Build the trimmed ephemeris that ships with the backend.
+
+`moon_phase` used to call `load("de421.bsp")`, which downloads the full 17 MB
+JPL file the first time a container computes a rise/set (and fails offline).
+This script cuts an SPK excerpt holding only the segments moon_phase needs,
+over the date span we support, and writes it next to the code:
+
+    python build_ephemeris.py                      # from the JPL URL, 2000-2050
+    python build_ephemeris.py --source de421.bsp --start 1990 --end 2053
+
+A URL source is read with HTTP range requests, so only the kept segments are
+downloaded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+DEFAULT_SOURCE = "https://ssd.jpl.nasa.gov/ftp/eph/planets/bsp/de421.bsp"
+
+OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "de421_moon.bsp")
+
+# Earth (EMB + 399), Moon (301) and Sun (10), plus the Jupiter (5) and Saturn
+# (6) barycenters: skyfield's apparent() deflects light around those two and
+# refuses to run without them. Together they are a few hundred KB.
+TARGETS = (3, 5, 6, 10, 301, 399)
+
+DEFAULT_START_YEAR = 2000
+DEFAULT_END_YEAR = 2050
+
+
+def build(
+    source: str = DEFAULT_SOURCE,
+    output_path: str = OUTPUT_PATH,
+    start_year: int = DEFAULT_START_YEAR,
+    end_year: int = DEFAULT_END_YEAR,
+) -> int:
+    """Write the excerpt covering Jan 1 `start_year` to Jan 1 `end_year + 1`.
+
+    Returns the size of the written file in bytes.
+    """
+    from jplephem.calendar import compute_julian_date
+    from jplephem.daf import DAF
+    from jplephem.excerpter import RemoteFile, write_excerpt
+    from jplephem.spk import SPK
+
+    start_jd = compute_julian_date(start_year, 1, 1)
+    end_jd = compute_julian_date(end_year + 1, 1, 1)
+
+    remote = source.startswith(("http://", "https://"))
+    tmp = f"{output_path}.tmp"
+    with RemoteFile(source) if remote else open(source, "rb") as f:
+        spk = SPK(DAF(f))
+        summaries = [
+            summary
+            for summary, segment in zip(spk.daf.summaries(), spk.segments)
+            if segment.target in TARGETS
+        ]
+        with open(tmp, "w+b") as out:
+            write_excerpt(spk, out, start_jd, end_jd, summaries)
+    os.replace(tmp, output_path)
+    return os.path.getsize(output_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="URL or .bsp path")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--start", type=int, default=DEFAULT_START_YEAR)
+    parser.add_argument("--end", type=int, default=DEFAULT_END_YEAR)
+    args = parser.parse_args()
+
+    size = build(args.source, args.output, args.start, args.end)
+    print(f"Wrote {args.output} ({size / 1e6:.1f} MB, {args.start}-{args.end})")
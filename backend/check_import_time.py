@@ -0,0 +1,70 @@
+"""Startup import budget for the backend.
+
+Imports `app` under `python -X importtime` and fails (exit code 1) when a heavy
+dependency that should only load on first use is imported at startup, or when
+the total import time goes over budget. Run from anywhere:
+
+    python backend/check_import_time.py
+    IMPORT_BUDGET_MS=300 python backend/check_import_time.py
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Loaded lazily by the feature modules; none of them may be pulled in by `import app`.
+LAZY_MODULES = ("requests", "dotenv", "numpy", "skyfield", "jplephem")
+
+# Flask itself is ~150-200 ms on a laptop; leave headroom for slower CI runners.
+DEFAULT_BUDGET_MS = 400.0
+
+RUNS = 3
+
+
+def measure() -> tuple[float, set[str]]:
+    """Return (cumulative ms for `import app`, top-level packages imported)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    packages = set()
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[12:].split("|"))
+        packages.add(name.split(".")[0])
+        if name == "app":
+            total_us = int(cumulative)
+    return total_us / 1000.0, packages
+
+
+def main() -> int:
+    budget = float(os.getenv("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+
+    # best of a few runs, so a noisy neighbour doesn't fail the check
+    results = [measure() for _ in range(RUNS)]
+    best_ms = min(ms for ms, _ in results)
+    eager = sorted(set(LAZY_MODULES) & results[0][1])
+
+    print(f"import app: {best_ms:.1f} ms (budget {budget:.0f} ms)")
+    ok = True
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+        ok = False
+    if best_ms > budget:
+        print("FAIL: startup import time over budget")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""Process pool for CPU-heavy astronomy work.
+
+skyfield searches are GIL-bound NumPy/Python, so running them on the Flask
+request threads stalls every other route served by the same process. All
+moon_phase/moon_tiles computations that touch skyfield go through the shared
+executor here instead:
+
+- workers are pre-initialized with the ephemeris, timescale and Moon;
+- every call has a deadline: the caller stops waiting and gets
+  `DeadlineExceeded` (HTTP 504), and tasks still queued are cancelled or
+  skipped by the worker once their deadline has passed;
+- at most COMPUTE_MAX_PENDING tasks may be queued or running; beyond that
+  calls fail fast with `ExecutorBusy` (HTTP 503) instead of piling up.
+
+Code already running inside a worker (or any code when COMPUTE_INLINE=1)
+calls straight through, so public functions can route through the executor
+without nesting pools.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_EXCEPTION, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", "0")) or (os.cpu_count() or 1)
+COMPUTE_MAX_PENDING = int(os.getenv("COMPUTE_MAX_PENDING", "0")) or (
+    COMPUTE_WORKERS * 8
+)
+# Default per-call deadline; batch and raster callers pass their own.
+COMPUTE_TIMEOUT_S = float(os.getenv("COMPUTE_TIMEOUT_S", "10"))
+# Run everything in the calling process: for tests and single-core debugging.
+COMPUTE_INLINE = os.getenv("COMPUTE_INLINE") == "1"
+
+_in_worker = False
+
+
+class ComputeError(RuntimeError):
+    """The executor could not produce a result; `status` is the HTTP code."""
+
+    status = 503
+
+
+class ExecutorBusy(ComputeError):
+    status = 503
+
+
+class DeadlineExceeded(ComputeError):
+    status = 504
+
+
+def _init_worker() -> None:
+    """Pool initializer: mark the process and open the skyfield objects."""
+    global _in_worker
+    _in_worker = True
+
+    import moon_phase
+
+    if moon_phase.SKYFIELD_AVAILABLE:
+        moon_phase._get_ephemeris()
+        moon_phase._get_timescale()
+        moon_phase._get_moon()
+
+
+def _run_task(deadline: float | None, fn: Callable, args: tuple) -> Any:
+    """Worker side: skip tasks whose caller has already given up."""
+    if deadline is not None and time.time() > deadline:
+        raise DeadlineExceeded("Task expired before a worker picked it up")
+    return fn(*args)
+
+
+class ComputeExecutor:
+    """Bounded ProcessPoolExecutor with deadlines and fail-fast admission."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.finished = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a pool that lost a worker; the next call starts a fresh one."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _admit(self, n: int) -> None:
+        with self._lock:
+            if self._pending + n > self.max_pending:
+                self.rejected += 1
+                raise ExecutorBusy(
+                    f"Compute queue is full ({self._pending}/{self.max_pending}), "
+                    "try again shortly"
+                )
+            self._pending += n
+
+    def _release(self, _future: Future | None = None) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.finished += 1
+
+    def map(
+        self,
+        fn: Callable,
+        arg_list: Iterable[tuple],
+        timeout: float | None = COMPUTE_TIMEOUT_S,
+    ) -> list:
+        """Run `fn(*args)` for each args tuple in the pool, results in order.
+
+        All tasks share one deadline `timeout` seconds from now (None waits
+        forever). The first task error is re-raised and the remaining tasks
+        are cancelled. `fn` must be a picklable module-level function.
+        """
+        arg_list = list(arg_list)
+        if _in_worker or COMPUTE_INLINE:
+            return [fn(*args) for args in arg_list]
+        if not arg_list:
+            return []
+
+        deadline = None if timeout is None else time.time() + timeout
+        self._admit(len(arg_list))
+        pool = self._get_pool()
+        futures: list[Future] = []
+        try:
+            for args in arg_list:
+                future = pool.submit(_run_task, deadline, fn, args)
+                future.add_done_callback(self._release)
+                futures.append(future)
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise ComputeError("Compute workers restarted, try again")
+        finally:
+            for _ in range(len(arg_list) - len(futures)):
+                self._release()  # slots reserved for tasks never submitted
+
+        try:
+            done, not_done = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+            for future in futures:
+                if future in done and future.exception() is not None:
+                    raise future.exception()
+            if not_done:
+                with self._lock:
+                    self.timed_out += 1
+                raise DeadlineExceeded(f"Computation exceeded {timeout:g}s deadline")
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise ComputeError("A compute worker crashed, try again")
+        finally:
+            for future in futures:
+                future.cancel()  # no-op for finished or running tasks
+
+    def run(
+        self, fn: Callable, *args: Any, timeout: float | None = COMPUTE_TIMEOUT_S
+    ) -> Any:
+        """Run a single `fn(*args)` in the pool and return its result."""
+        if _in_worker or COMPUTE_INLINE:
+            return fn(*args)
+        return self.map(fn, [args], timeout=timeout)[0]
+
+    def info(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "started": self._pool is not None,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "finished": self.finished,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "default_timeout_s": COMPUTE_TIMEOUT_S,
+            }
+
+
+_executor: ComputeExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ComputeExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ComputeExecutor(COMPUTE_WORKERS, COMPUTE_MAX_PENDING)
+    return _executor
+
+
+def run(fn: Callable, *args: Any, timeout: float | None = COMPUTE_TIMEOUT_S) -> Any:
+    """`fn(*args)` on the shared executor."""
+    return get_executor().run(fn, *args, timeout=timeout)
+
+
+def run_many(
+    fn: Callable,
+    arg_list: Iterable[tuple],
+    timeout: float | None = COMPUTE_TIMEOUT_S,
+) -> list:
+    """`fn(*args)` for each args tuple on the shared executor."""
+    return get_executor().map(fn, arg_list, timeout=timeout)
+
+
+def executor_info() -> dict[str, Any]:
+    return get_executor().info()
@@ -1,23 +1,246 @@
-import requests
+import base64
+import heapq
 import json
-from collections import Counter
+import logging
 import os
+import textwrap
+import threading
+import time
+from datetime import UTC, date, datetime, timedelta
+
+import astronaut_crawler
+import astronaut_store
+from astronaut_fulltext import FullTextIndex, checksum
+from astronaut_index import AstronautIndex
+from astronaut_records import AstronautRecord, DetailsStore
+from astronaut_stats import AstronautStats
+
+logger = logging.getLogger(__name__)
+
+JSON_CACHE_PATH = os.path.join(
+    os.path.dirname(__file__), "astronauts.json"
+)  # should be cached in /backend
+# Binary (SQLite) cache loaded by default; seeded from the JSON cache next to
+# it. Set ASTRONAUT_CACHE_FORMAT=json to load the JSON file directly.
+CACHE_PATH = (
+    JSON_CACHE_PATH
+    if os.getenv("ASTRONAUT_CACHE_FORMAT", "sqlite") == "json"
+    else os.path.splitext(JSON_CACHE_PATH)[0] + ".db"
+)
+
+# How long the shared dataset trusts its in-memory copy before re-reading the
+# cache file, even if the file looks unchanged.
+DATASET_TTL_S = float(os.getenv("ASTRONAUT_DATASET_TTL_S", "3600"))
+
+# Background delta sync (see AstronautData.sync). Each sync re-asks for a
+# window before the previous one, in case records were edited after landing.
+SYNC_INTERVAL_S = float(os.getenv("ASTRONAUT_SYNC_INTERVAL_S", str(6 * 3600)))
+SYNC_OVERLAP = timedelta(days=7)
+# Delta syncs miss edits that don't come with a flight (status, bio), so sync
+# re-crawls everything when the last full crawl is older than this.
+FULL_SYNC_INTERVAL_S = float(
+    os.getenv("ASTRONAUT_FULL_SYNC_INTERVAL_S", str(7 * 24 * 3600))
+)
+
+# Fields search_astronauts can return. Nested objects are flattened to their
+# name (agency to its abbreviation) so results stay small.
+SEARCH_FIELDS = (
+    "id",
+    "name",
+    "nationality",
+    "status",
+    "type",
+    "agency",
+    "in_space",
+    "age",
+    "date_of_birth",
+    "date_of_death",
+    "time_in_space",
+    "eva_time",
+    "flights_count",
+    "spacewalks_count",
+    "profile_image_thumbnail",
+    "url",
+    "wiki",
+    "bio",
+)
+DEFAULT_SEARCH_FIELDS = ("id", "name", "nationality", "status", "agency")
+MAX_SEARCH_LIMIT = 200
+
+
+def _check_fields(fields):
+    fields = tuple(fields) if fields else DEFAULT_SEARCH_FIELDS
+    unknown = [f for f in fields if f not in SEARCH_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def _project(snapshot, position, fields):
+    record = snapshot.records[position]
+    details = None
+    out = {}
+    for field in fields:
+        if field in AstronautRecord.__slots__:
+            out[field] = getattr(record, field)
+        else:
+            # heavy fields (bio, urls) live in the details store
+            if details is None:
+                details = snapshot.details.get(position)
+            out[field] = details.get(field)
+    return out
+
+
+def _encode_cursor(version, sort, descending, rank):
+    raw = json.dumps([version, sort, descending, rank]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, sort, descending, rank = json.loads(base64.urlsafe_b64decode(padded))
+        return int(version), str(sort), bool(descending), int(rank)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+class _Snapshot:
+    """One loaded dataset: compact records, their index and the details store."""
+
+    __slots__ = ("_fulltext", "_lock", "details", "index", "records", "stats")
+
+    def __init__(self, records, details):
+        self.details = details
+        self.records = records
+        self.index = AstronautIndex(records)
+        self.stats = AstronautStats(records, self.index)
+        self._fulltext = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_payloads(cls, astronauts, details_path):
+        """Snapshot of full payloads, moving them to a details file."""
+        details = DetailsStore.build(details_path, astronauts)
+        return cls([AstronautRecord.from_dict(a) for a in astronauts], details)
+
+    @classmethod
+    def from_store(cls, path):
+        """Snapshot of a binary cache: hot columns only, payloads on demand."""
+        return cls(
+            astronaut_store.read_records(path), astronaut_store.SqliteDetails(path)
+        )
+
+    def split_changes(self, changed):
+        """({position: payload} for known ids, [payloads for new ids])."""
+        replaced = {}
+        added = {}
+        for a in changed:
+            position = self.index.position(a.get("id"))
+            if position is not None:
+                replaced[position] = a
+            elif a.get("id") is not None:
+                added[a["id"]] = a
+        return replaced, list(added.values())
+
+    def merged(self, changed):
+        """
+        A new snapshot with `changed` payloads merged in by id: known ids are
+        replaced in place, new ones appended. Unchanged records are shared
+        with this snapshot; the details file is rewritten (streamed from this
+        snapshot's) into a new file, so this snapshot stays valid for readers
+        still using it. Returns None for binary caches, which are rewritten
+        whole instead.
+        """
+        replaced, added = self.split_changes(changed)
+        details = self.details.with_changes(replaced, added)
+        if details is None:
+            return None
+
+        records = list(self.records)
+        for position, a in replaced.items():
+            records[position] = AstronautRecord.from_dict(a)
+        records.extend(AstronautRecord.from_dict(a) for a in added)
+        return _Snapshot(records, details)
+
+    def full(self):
+        """
+        Full payload dicts, read back from the details store. Not kept: the
+        payloads stay on disk, so callers should iterate details.iter_all()
+        when they only need one pass.
+        """
+        return self.details.all()
+
+    def fulltext(self, path):
+        """
+        BM25 index over names and bios, loaded from `path` if it was saved
+        for the same text, otherwise built (on first use) and saved there.
+        """
+        if self._fulltext is None:
+            with self._lock:
+                if self._fulltext is None:
+                    docs = [
+                        (a.get("name"), a.get("bio")) for a in self.details.iter_all()
+                    ]
+                    index = FullTextIndex.load(path, checksum(docs))
+                    if index is None:
+                        index = FullTextIndex.build(docs)
+                        index.save(path)
+                    self._fulltext = index
+        return self._fulltext
 
 
 class AstronautData:
     """
     Class for fetching and analyzing astronaut data from TheSpaceDevs API.
     Uses caching to avoid rate limiting, which was the solution I found when I looked up my issue
+
+    Only compact AstronautRecords (hot fields) and an AstronautIndex built at
+    load time stay in memory; full payloads (bios, URLs, flights) are moved to
+    a details file next to the cache and read by position on demand. A cache
+    file ending in ".db" is the binary (SQLite) format, which stores hot
+    fields and payloads in separate tables, so loading it parses no JSON; it
+    is seeded from the ".json" cache next to it if that exists. The
+    cache is only re-read when the file changes (mtime or size) or, if `ttl`
+    is set, after `ttl` seconds. Reloads swap in a whole new snapshot, so
+    readers never mix data from two loads; treat returned data as read-only.
     """
 
     def __init__(
         self,
-        cache_file="astronauts.json",
+        cache_file=CACHE_PATH,
         base_url="https://lldev.thespacedevs.com/2.2.0/astronaut/",
+        ttl=None,
     ):
         self.cache_file = cache_file
         self.base_url = base_url
-        self._astronauts = None
+        self.ttl = ttl
+        self.binary = cache_file.endswith(".db")
+        self.json_file = os.path.splitext(cache_file)[0] + ".json"
+        self.details_file = os.path.splitext(cache_file)[0] + ".details.jsonl"
+        self.crawl_dir = os.path.splitext(cache_file)[0] + ".crawl"
+        self.sync_file = os.path.splitext(cache_file)[0] + ".sync.json"
+        self.fulltext_file = os.path.splitext(cache_file)[0] + ".fulltext.json"
+        self._snapshot = None
+        self._signature = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.RLock()
+
+    def _cache_signature(self):
+        """(mtime_ns, size) of the cache file, or None if it doesn't exist."""
+        try:
+            st = os.stat(self.cache_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _is_stale(self):
+        if self._snapshot is None:
+            return True
+        if self.ttl is not None and time.monotonic() - self._loaded_at > self.ttl:
+            return True
+        return self._cache_signature() != self._signature
 
     def _fetch_astronauts(self):
         """
@@ -26,40 +249,248 @@ class AstronautData:
         """
         # if cache exists, retun
         if os.path.exists(self.cache_file):
-            with open(self.cache_file, "r") as f:
-                return json.load(f)
-
-        # Fetch from API
-        astronauts = []
-        url = f"{self.base_url}?limit=100"
+            if not self.binary:
+                with open(self.cache_file, "r") as f:
+                    return json.load(f)
+            try:
+                return astronaut_store.read_payloads(self.cache_file)
+            except astronaut_store.StoreError as e:
+                print(f"Rebuilding {self.cache_file}: {e}")
+
+        # binary caches are seeded from the JSON cache when there is one
+        if self.binary and os.path.exists(self.json_file):
+            with open(self.json_file, "r") as f:
+                astronauts = json.load(f)
+            self._write_cache(astronauts)
+            return astronauts
+
+        return self._crawl()
+
+    def _write_cache(self, astronauts):
+        """
+        Replace the cache file; readers only ever see a complete file.
+        `astronauts` may be any iterable and is written as it is consumed.
+        """
+        if self.binary:
+            astronaut_store.write(self.cache_file, astronauts)
+            return
+        tmp = f"{self.cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                # same layout as json.dump(list, indent=2), one record at a time
+                sep = "[\n"
+                for a in astronauts:
+                    f.write(sep)
+                    f.write(textwrap.indent(json.dumps(a, indent=2), "  "))
+                    sep = ",\n"
+                f.write("\n]" if sep != "[\n" else "[]")
+            os.replace(tmp, self.cache_file)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _crawl(self):
+        """
+        Download every astronaut with the concurrent crawler and write the cache.
+        Pages are checkpointed next to the cache, so after a failure (e.g. rate
+        limiting) calling this again only fetches the missing pages.
+        """
+        started = datetime.now(UTC)
+        crawler = astronaut_crawler.AstronautCrawler(
+            self.base_url, checkpoint_dir=self.crawl_dir
+        )
+        astronauts = crawler.crawl()
 
-        # Adapted this code from another project I am working on and used AI to tailor it and get the exception raising
-        while url:
-            print(f"Fetching: {url}")
-            r = requests.get(url)
+        self._write_cache(astronauts)
+        crawler.clear_checkpoints()
+        self._write_sync_state(started, full=True)
 
-            if r.status_code == 429:
-                raise Exception("Rate limit hit — try again later or use caching.")
+        return astronauts
 
-            r.raise_for_status()
-            data = r.json()
-            astronauts.extend(data.get("results", []))
-            url = data.get("next")
+    def refresh(self):
+        """
+        Re-download the dataset even if a cache exists. The shared snapshot
+        picks up the new cache file on its next access. Returns the count.
+        """
+        with self._sync_lock:
+            return len(self._crawl())
+
+    def _read_sync_state(self):
+        try:
+            with open(self.sync_file, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _write_sync_state(self, started, full=False):
+        state = self._read_sync_state()
+        state["synced_at"] = started.isoformat()
+        if full:
+            state["full_at"] = started.isoformat()
+        tmp = f"{self.sync_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.sync_file)
+
+    def _full_sync_due(self, state):
+        """
+        Whether the last full crawl is older than FULL_SYNC_INTERVAL_S (for
+        caches from before that was recorded, the cache file's age counts).
+        """
+        try:
+            full_at = datetime.fromisoformat(state["full_at"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            full_at = os.path.getmtime(self.cache_file)
+        return time.time() - full_at > FULL_SYNC_INTERVAL_S
 
-        # Save to cache
-        with open(self.cache_file, "w") as f:
-            json.dump(astronauts, f, indent=2)
+    def _sync_since(self, snapshot, state):
+        """
+        Watermark for a delta sync: the last sync time or, for caches from
+        before sync state was kept, the newest last_flight in the data.
+        """
+        try:
+            since = datetime.fromisoformat(state["synced_at"])
+        except (KeyError, TypeError, ValueError):
+            flights = [
+                a.get(astronaut_crawler.DELTA_FIELD)
+                for a in snapshot.details.iter_all()
+                if a.get(astronaut_crawler.DELTA_FIELD)
+            ]
+            if not flights:
+                return None
+            since = datetime.fromisoformat(max(flights))
+        return (since - SYNC_OVERLAP).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-        return astronauts
+    def sync(self):
+        """
+        Incremental refresh: fetch only astronauts changed since the last sync
+        and merge them into the dataset by id. The cache file is rewritten
+        and the in-memory snapshot updated without re-reading it. A binary
+        cache is seeded from the JSON cache first if it doesn't exist yet.
+        Does a full crawl if there is no cache to start from, nothing to take
+        a watermark from, or the last full crawl is older than
+        FULL_SYNC_INTERVAL_S (the delta query can't see status or bio edits;
+        see astronaut_crawler.DELTA_FIELD).
+        Returns the number of records fetched.
+        """
+        with self._sync_lock:
+            if not os.path.exists(self.cache_file) and not os.path.exists(
+                self.json_file
+            ):
+                return self.refresh()
+            snapshot = self._get_snapshot()  # seeds a binary cache from JSON
+            state = self._read_sync_state()
+            if self._full_sync_due(state):
+                return self.refresh()
+            since = self._sync_since(snapshot, state)
+            if since is None:
+                return self.refresh()
+
+            started = datetime.now(UTC)
+            crawler = astronaut_crawler.AstronautCrawler(self.base_url)
+            changed = crawler.fetch_changed(since)
+            if changed:
+                merged = snapshot.merged(changed)
+                if merged is None:
+                    # rewrite the cache; the next access loads it
+                    replaced, added = snapshot.split_changes(changed)
+
+                    def payloads():
+                        for position, a in enumerate(snapshot.details.iter_all()):
+                            yield replaced.get(position, a)
+                        yield from added
+
+                    self._write_cache(payloads())
+                else:
+                    self._write_cache(merged.details.iter_all())
+                    with self._lock:
+                        if self._snapshot is snapshot:
+                            self._snapshot = merged
+                            self._signature = self._cache_signature()
+                            self._loaded_at = time.monotonic()
+            self._write_sync_state(started)
+            return len(changed)
+
+    def _load_store(self):
+        """Snapshot of the binary cache, (re)building it first if needed."""
+        try:
+            return _Snapshot.from_store(self.cache_file)
+        except astronaut_store.StoreError:
+            self._fetch_astronauts()  # imports or downloads, then writes it
+            return _Snapshot.from_store(self.cache_file)
+
+    def _get_snapshot(self):
+        if not self._is_stale():
+            return self._snapshot
+        with self._lock:
+            # another thread may have reloaded while we waited
+            if self._is_stale():
+                signature = self._cache_signature()
+                if self.binary:
+                    snapshot = self._load_store()
+                else:
+                    astronauts = self._fetch_astronauts()
+                    snapshot = _Snapshot.from_payloads(astronauts, self.details_file)
+                # a fresh download just wrote the file; remember what we loaded
+                self._signature = signature or self._cache_signature()
+                self._loaded_at = time.monotonic()
+                self._snapshot = snapshot
+            return self._snapshot
 
     def get_astronauts(self):
         """
         Get all astronauts (cached after first fetch).
         Returns a list of astronaut dictionaries. These dictionaries contain the astronaut's name, nationality.
+
+        These are the full payloads, materialized from the details store on the
+        first call; hot paths should use get_records()/get_index() instead.
+        """
+        return self._get_snapshot().full()
+
+    def get_records(self):
+        """
+        Get the compact AstronautRecords for the current snapshot.
+        """
+        return self._get_snapshot().records
+
+    def get_index(self):
+        """
+        Get the AstronautIndex for the current snapshot (rebuilt on reload).
+        """
+        return self._get_snapshot().index
+
+    def get_stats(self):
+        """Materialized leaderboards and aggregates for the current snapshot."""
+        return self._get_snapshot().stats
+
+    def get_leaderboard(self, metric="time_in_space", limit=10):
+        """
+        Top astronauts by time_in_space, eva_time, flights_count or
+        spacewalks_count (durations in seconds). Raises ValueError on bad args.
+        """
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+        return self.get_stats().leaderboard(metric, limit)
+
+    def get_country_stats(self, sort="count", limit=None):
+        """
+        Per-country aggregates, largest `sort` value first; all countries
+        unless `limit` is given. Raises ValueError on bad args.
         """
-        if self._astronauts is None:
-            self._astronauts = self._fetch_astronauts()
-        return self._astronauts
+        if limit is not None and not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+        return self.get_stats().countries(sort, limit)
+
+    def get_details(self, astronaut_id):
+        """
+        Get the full payload (bio, links, flights, ...) of one astronaut by API id.
+
+        Returns None if there is no astronaut with that id.
+        """
+        snapshot = self._get_snapshot()
+        position = snapshot.index.position(astronaut_id)
+        return None if position is None else snapshot.details.get(position)
 
     def get_astronauts_by_country(self, country_name):
         """
@@ -68,16 +499,141 @@ class AstronautData:
         Takes in country name and returns list of astronauts from that country
 
         """
-        astronauts = self.get_astronauts()
+        index = self.get_index()
+        return index.names(index.country(country_name))
+
+    def get_country_breakdown(self, country_name):
+        """
+        Astronauts of a country split by status.
+
+        Uses the same case-insensitive substring match as get_astronauts_by_country.
+        Returns {"count": int, "active": [names], "inactive": [names]}.
+        """
+        index = self.get_index()
+        ids = index.country(country_name)
+        active = ids & index.status("active")
+        return {
+            "count": len(ids),
+            "active": index.names(active),
+            "inactive": index.names(ids - active),
+        }
+
+    def search_astronauts(
+        self,
+        country=None,
+        status="all",
+        type=None,
+        agency=None,
+        in_space=None,
+        min_age=None,
+        max_age=None,
+        born_after=None,
+        born_before=None,
+        sort="name",
+        order="asc",
+        limit=50,
+        cursor=None,
+        fields=None,
+    ):
+        """
+        Filter, sort and page through astronauts using the index.
+
+        Filters are combined with AND; country is a substring match like
+        get_astronauts_by_country, status/type must be known values ("all" or
+        None skips them), ages are inclusive and birth dates are YYYY-MM-DD.
+        Sort by name, time_in_space or eva_time (order "asc"/"desc"; missing
+        values last). `cursor` is the `next_cursor` of a previous page.
 
-        filtered = [
-            a["name"]
-            for a in astronauts
-            if a.get("nationality")
-            and country_name.lower() in a.get("nationality", "").lower()
-        ]
+        Returns {"count": total matches, "results": [projected dicts],
+        "next_cursor": str or None}. Raises ValueError on bad arguments.
+        """
+        snapshot = self._get_snapshot()
+        index = snapshot.index
+
+        postings = []
+        if country:
+            postings.append(index.country(country))
+        if status and status.lower() != "all":
+            if status.lower() not in index.statuses:
+                raise ValueError(
+                    f"Invalid status '{status}'. Use 'all' or one of: "
+                    + ", ".join(index.statuses)
+                )
+            postings.append(index.status(status))
+        if type and type.lower() != "all":
+            if type.lower() not in index.types:
+                raise ValueError(
+                    f"Invalid type '{type}'. Use 'all' or one of: "
+                    + ", ".join(index.types)
+                )
+            postings.append(index.type(type))
+        if agency:
+            postings.append(index.agency(agency))
+        if in_space is not None:
+            space = index.in_space()
+            postings.append(space if in_space else index.all_ids - space)
+        if min_age is not None or max_age is not None:
+            postings.append(index.age_range(min_age, max_age))
+        if born_after or born_before:
+            for d in (born_after, born_before):
+                if d:
+                    date.fromisoformat(d)  # ValueError on bad dates
+            postings.append(index.birth_range(born_after, born_before))
+        ids = index.intersect(*postings) if postings else index.all_ids
+
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        descending = order == "desc"
+        ranks = index.rank(sort, descending)
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+        fields = _check_fields(fields)
+
+        # keyset pagination on the precomputed rank of the last returned row
+        candidates = ids
+        if cursor:
+            version, c_sort, c_desc, after = _decode_cursor(cursor)
+            if (version, c_sort, c_desc) != (index.version, sort, descending):
+                raise ValueError("Cursor is stale or from a different query")
+            candidates = [i for i in ids if ranks[i] > after]
+        page = heapq.nsmallest(limit + 1, candidates, key=ranks.__getitem__)
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = _encode_cursor(
+                index.version, sort, descending, ranks[page[-1]]
+            )
+
+        return {
+            "count": len(ids),
+            "results": [_project(snapshot, i, fields) for i in page],
+            "next_cursor": next_cursor,
+        }
+
+    def fulltext_search(self, q, limit=10, fields=None):
+        """
+        Rank astronauts by BM25 relevance of `q` to their name and bio.
 
-        return filtered
+        The last query word (and any word ending in "*") also matches as a
+        prefix. Returns {"count": matching records, "results": [projected
+        dicts with a "score"]}, best first. Raises ValueError on bad arguments.
+        """
+        if not q or not q.strip():
+            raise ValueError("q must not be empty")
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+        fields = _check_fields(fields)
+
+        snapshot = self._get_snapshot()
+        count, top = snapshot.fulltext(self.fulltext_file).search(q, limit)
+        return {
+            "count": count,
+            "results": [
+                {**_project(snapshot, i, fields), "score": round(score, 4)}
+                for i, score in top
+            ],
+        }
 
     def get_top_countries(self, top_n=10):
         """
@@ -87,40 +643,9 @@ class AstronautData:
             top_n: Number of top countries to return
 
         Returns:
-            List of tuples: (country, count, [astronaut_names])
-        """
-        astronauts = self.get_astronauts()
-
-        # Collect astronauts per nationality with status
-        nationality_counts = Counter()
-        nationality_astronauts = {}
-
-        for astronaut in astronauts:
-            nationality = astronaut.get("nationality")
-            status = (astronaut.get("status") or {}).get("name")
-            if nationality:
-                nationality_counts[nationality] += 1
-                if nationality not in nationality_astronauts:
-                    nationality_astronauts[nationality] = []
-                nationality_astronauts[nationality].append(
-                    {"name": astronaut.get("name"), "status": status}
-                )
-
-        # Get top N countries
-        top_countries = nationality_counts.most_common(top_n)
-
-        # Return with astronaut names split into active/inactive lists
-        result = []
-        for country, count in top_countries:
-            people = nationality_astronauts.get(country, [])
-            active = [
-                p["name"] for p in people if (p.get("status") or "").lower() == "active"
-            ]
-            inactive = [
-                p["name"] for p in people if (p.get("status") or "").lower() != "active"
-            ]
-            result.append((country, count, {"active": active, "inactive": inactive}))
-        return result
+            List of tuples: (country, count, {"active": [names], "inactive": [names]})
+        """
+        return self.get_index().top_countries(top_n)
 
     def get_astronaut_count_by_country(self):
         """
@@ -129,15 +654,47 @@ class AstronautData:
         Returns:
             Dictionary mapping country names to astronaut counts
         """
-        astronauts = self.get_astronauts()
+        return dict(self.get_index().nationality_counts)
+
+
+_dataset = None
+_dataset_lock = threading.Lock()
+
+
+def get_dataset():
+    """
+    Process-wide AstronautData shared by all requests.
+
+    Parsing the ~2 MB cache takes tens of milliseconds, so the API routes use
+    this instead of building a new AstronautData per request.
+    """
+    global _dataset
+    if _dataset is None:
+        with _dataset_lock:
+            if _dataset is None:
+                _dataset = AstronautData(ttl=DATASET_TTL_S)
+    return _dataset
+
+
+_sync_thread = None
+
+
+def start_sync_job(interval_s=SYNC_INTERVAL_S):
+    """Run `get_dataset().sync()` now and every `interval_s` in a daemon thread."""
+    global _sync_thread
+    if _sync_thread is not None:
+        return
 
-        nationality_counts = Counter()
-        for astronaut in astronauts:
-            nationality = astronaut.get("nationality")
-            if nationality:
-                nationality_counts[nationality] += 1
+    def loop():
+        while True:
+            try:
+                get_dataset().sync()
+            except Exception:
+                logger.exception("astronaut sync failed")
+            time.sleep(interval_s)
 
-        return dict(nationality_counts)
+    _sync_thread = threading.Thread(target=loop, name="astronaut-sync", daemon=True)
+    _sync_thread.start()
 
 
 def main():
@@ -7,17 +7,24 @@ Also includes moon rise/set times based on location.
 
 from __future__ import annotations
 
+import importlib.util
 import math
-from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional
+import os
+import threading
+from collections import OrderedDict
+from datetime import UTC, date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-try:
-    from skyfield.api import load, Topos
-    from skyfield.almanac import find_discrete, risings_and_settings
+import numpy as np
+
+import compute_executor
+import moon_phase_table
 
-    SKYFIELD_AVAILABLE = True
-except ImportError:
-    SKYFIELD_AVAILABLE = False
+# skyfield is only imported when a rise/set is first computed, so workers that
+# only serve phase data never pay for it.
+SKYFIELD_AVAILABLE = importlib.util.find_spec("skyfield") is not None
 
 
 # Mean synodic month (new moon to new moon), in days.
@@ -27,12 +34,158 @@ _SYNODIC_MONTH = 29.530588853
 # Using a well-known epoch greatly improves phase accuracy for simple models.
 _NEW_MOON_EPOCH_JD = 2451550.1
 
+# Trimmed DE421 excerpt (Earth, Moon, Sun, 2000-2050) bundled with the
+# backend; see build_ephemeris.py. Dates outside it (or every date, if the
+# excerpt is missing) use the full EPHEMERIS_FILE, downloaded on first use.
+EPHEMERIS_PATH = os.getenv("MOON_EPHEMERIS_PATH") or os.path.join(
+    os.path.dirname(__file__), "de421_moon.bsp"
+)
+EPHEMERIS_FILE = "de421.bsp"
+
+# Rise/set and sky tracks are supported over the span of the full DE421 file
+# (1899-07-29 to 2053-10-09), trimmed to whole years.
+SUPPORTED_START = date(1900, 1, 1)
+SUPPORTED_END = date(2052, 12, 31)
+
+# Skyfield objects are expensive to build (the SPK file alone is ~17 MB) but
+# immutable once built, so they are created once per process and shared.
+_skyfield_lock = threading.Lock()
+_ephemeris = None
+_full_ephemeris = None
+_timescale = None
+_moon = None
+
+
+def _skyfield():
+    """Import skyfield on first use.
+
+    Returns (load, find_discrete, risings_and_settings); tests patch this.
+    """
+    from skyfield.almanac import find_discrete, risings_and_settings
+    from skyfield.api import load
+
+    return load, find_discrete, risings_and_settings
+
+
+def _get_ephemeris():
+    """Return the process-wide ephemeris, opening it on first use.
+
+    jplephem memory-maps the SPK segments, so pages are only read as they are
+    touched and forked workers share them instead of re-parsing the file.
+    """
+    global _ephemeris
+    if _ephemeris is None:
+        with _skyfield_lock:
+            if _ephemeris is None:
+                _ephemeris = _open_ephemeris()
+    return _ephemeris
+
+
+def _open_ephemeris():
+    """Open the bundled ephemeris, or download the full one if it's missing."""
+    load, _, _ = _skyfield()
+    if os.path.exists(EPHEMERIS_PATH):
+        return load(EPHEMERIS_PATH)  # an existing path is opened, never fetched
+    return load(EPHEMERIS_FILE)
+
+
+def _get_full_ephemeris():
+    """Return the full DE421 file, downloading it on first use.
+
+    Only needed for dates outside the bundled excerpt.
+    """
+    global _full_ephemeris
+    if _full_ephemeris is None:
+        with _skyfield_lock:
+            if _full_ephemeris is None:
+                load, _, _ = _skyfield()
+                _full_ephemeris = load(EPHEMERIS_FILE)
+    return _full_ephemeris
+
+
+def _needs_full_ephemeris(first_day: date, last_day: date) -> bool:
+    """True if local days `first_day`..`last_day` reach past the bundled file."""
+    segments = [s.spk_segment for s in _get_ephemeris().segments]
+    if not segments:
+        return True
+    # a day behind and ahead, for local days in zones up to UTC+-14
+    start_jd = _julian_day(datetime.combine(first_day, time(0))) - 1
+    end_jd = _julian_day(datetime.combine(last_day, time(0))) + 2
+    return not (
+        max(s.start_jd for s in segments) <= start_jd
+        and end_jd <= min(s.end_jd for s in segments)
+    )
+
+
+def _check_supported_span(first_day: date, last_day: date) -> None:
+    """Raise ValueError if a window leaves SUPPORTED_START..SUPPORTED_END."""
+    if first_day < SUPPORTED_START or last_day > SUPPORTED_END:
+        raise ValueError(
+            f"Moon rise/set and position are supported from "
+            f"{SUPPORTED_START.isoformat()} to {SUPPORTED_END.isoformat()}"
+        )
+
+
+def _get_timescale():
+    """Return the process-wide skyfield timescale."""
+    global _timescale
+    if _timescale is None:
+        with _skyfield_lock:
+            if _timescale is None:
+                load, _, _ = _skyfield()
+                _timescale = load.timescale()
+    return _timescale
+
+
+def _get_moon():
+    """Return the moon body from the shared ephemeris."""
+    global _moon
+    if _moon is None:
+        eph = _get_ephemeris()  # takes the lock itself, so resolve it first
+        with _skyfield_lock:
+            if _moon is None:
+                _moon = eph["moon"]
+    return _moon
+
+
+@lru_cache(maxsize=1024)
+def _get_topos(latitude: float, longitude: float):
+    """Observer location, cached per (lat, lon)."""
+    from skyfield.api import Topos
+
+    return Topos(latitude_degrees=latitude, longitude_degrees=longitude)
+
+
+@lru_cache(maxsize=1024)
+def _get_observer(latitude: float, longitude: float, full: bool = False):
+    """Barycentric observer (earth + topos), cached per (lat, lon).
+
+    `full` builds it on the full DE421 file instead of the bundled excerpt.
+    """
+    eph = _get_full_ephemeris() if full else _get_ephemeris()
+    return eph["earth"] + _get_topos(latitude, longitude)
+
+
+@lru_cache(maxsize=1024)
+def _rise_set_function(latitude: float, longitude: float, full: bool = False):
+    """`risings_and_settings` predicate for a location, cached per (lat, lon).
+
+    `full` builds it on the full DE421 file instead of the bundled excerpt.
+    """
+    _, _, risings_and_settings = _skyfield()
+    if full:
+        eph = _get_full_ephemeris()
+        return risings_and_settings(eph, eph["moon"], _get_topos(latitude, longitude))
+    return risings_and_settings(
+        _get_ephemeris(), _get_moon(), _get_topos(latitude, longitude)
+    )
+
 
 def _to_utc(dt: datetime) -> datetime:
     """Return an aware UTC datetime. If naive, assume it's already UTC."""
     if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
+        return dt.replace(tzinfo=UTC)
+    return dt.astimezone(UTC)
 
 
 def _julian_day(dt: datetime) -> float:
@@ -67,7 +220,7 @@ def _julian_day(dt: datetime) -> float:
     return jd
 
 
-def calculate_moon_phase(date: datetime) -> Dict[str, Any]:
+def calculate_moon_phase(date: datetime) -> dict[str, Any]:
     """Calculate moon phase information for a given date.
 
     Returns a dict with phase name, illumination percentage, age, and next phase info.
@@ -83,6 +236,13 @@ def calculate_moon_phase(date: datetime) -> Dict[str, Any]:
     # Moon age in days
     age = phase * _SYNODIC_MONTH
 
+    # Prefer the precomputed true phase instants when the table covers the date
+    true_days_to_next = None
+    seconds = _to_utc(date).timestamp()
+    if moon_phase_table.covers(seconds):
+        t_phase, t_age, _, t_days = moon_phase_table.true_phase([seconds])
+        phase, age, true_days_to_next = float(t_phase[0]), float(t_age[0]), t_days[0]
+
     # Illumination percentage (simple phase-geometry approximation)
     illumination = (1.0 - math.cos(2.0 * math.pi * phase)) / 2.0 * 100.0
 
@@ -108,6 +268,8 @@ def calculate_moon_phase(date: datetime) -> Dict[str, Any]:
     days_to_next = (next_boundary - phase) * _SYNODIC_MONTH
     if days_to_next < 0:
         days_to_next += _SYNODIC_MONTH
+    if true_days_to_next is not None:
+        days_to_next = float(true_days_to_next)
 
     return {
         "phase": phase_name,
@@ -119,9 +281,106 @@ def calculate_moon_phase(date: datetime) -> Dict[str, Any]:
     }
 
 
+# Vectorized form of the branches in calculate_moon_phase, indexed by quarter
+# (0 = new -> first quarter, ... 3 = last quarter -> new). Within a quarter the
+# name switches from the "early" to the "late" one past the split point.
+_QUARTER_SPLIT = np.array([0.02, 0.27, 0.52, 0.98])
+_QUARTER_EARLY_NAMES = np.array(
+    ["New Moon", "First Quarter", "Full Moon", "Waning Crescent"]
+)
+_QUARTER_LATE_NAMES = np.array(
+    ["Waxing Crescent", "Waxing Gibbous", "Waning Gibbous", "New Moon"]
+)
+_NEXT_PHASE_NAMES = np.array(["First Quarter", "Full Moon", "Last Quarter", "New Moon"])
+
+_RESOLUTION_HOURS = {"daily": 24, "hourly": 1}
+
+# Upper bound on instants per series so a single request can't build a
+# multi-million element response.
+MAX_SERIES_POINTS = 500_000
+
+
+def calculate_moon_phases(instants: np.ndarray) -> dict[str, list]:
+    """Vectorized `calculate_moon_phase` for an array of UTC datetime64 instants.
+
+    Returns columnar output: a dict of equal-length lists keyed like the
+    scalar result ("phase", "illumination", "age", "next_phase",
+    "days_to_next", "date").
+    """
+    instants = np.asarray(instants, dtype="datetime64[us]")
+
+    # Julian day straight from the Unix epoch (JD 2440587.5); for Gregorian
+    # dates this is identical to the Meeus formula in _julian_day.
+    unix_days = instants.astype(np.int64) / 86_400_000_000.0
+    jd = unix_days + 2440587.5
+
+    phase = ((jd - _NEW_MOON_EPOCH_JD) / _SYNODIC_MONTH) % 1.0
+    age = phase * _SYNODIC_MONTH
+
+    quarter = np.minimum((phase * 4.0).astype(np.int64), 3)
+    days_to_next = ((quarter + 1) * 0.25 - phase) * _SYNODIC_MONTH
+
+    # overwrite with true phase data wherever the precomputed table covers
+    table = moon_phase_table.load_table()
+    if table is not None:
+        seconds = (unix_days * 86400.0).astype(np.float64)
+        covered = (seconds >= table[0][0]) & (seconds < table[0][-1])
+        if covered.any():
+            t_phase, t_age, _, t_days = moon_phase_table.true_phase(seconds[covered])
+            phase[covered] = t_phase
+            age[covered] = t_age
+            days_to_next[covered] = t_days
+            quarter = np.minimum((phase * 4.0).astype(np.int64), 3)
+
+    illumination = (1.0 - np.cos(2.0 * np.pi * phase)) / 2.0 * 100.0
+
+    split = _QUARTER_SPLIT[quarter]
+    # the last quarter's split is inclusive, the others are exclusive
+    late = np.where(quarter == 3, phase >= split, phase > split)
+    names = np.where(late, _QUARTER_LATE_NAMES[quarter], _QUARTER_EARLY_NAMES[quarter])
+
+    return {
+        "phase": names.tolist(),
+        "illumination": np.round(illumination, 1).tolist(),
+        "age": np.round(age, 1).tolist(),
+        "next_phase": _NEXT_PHASE_NAMES[quarter].tolist(),
+        "days_to_next": np.round(days_to_next, 1).tolist(),
+        "date": np.datetime_as_string(instants, unit="s").tolist(),
+    }
+
+
+def moon_phase_series(
+    start: datetime, days: int, resolution: str = "daily"
+) -> dict[str, list]:
+    """Columnar moon phase data from `start` over `days` days.
+
+    `resolution` is "daily" (one instant per day) or "hourly".
+    """
+    if resolution not in _RESOLUTION_HOURS:
+        raise ValueError(
+            f"Invalid resolution '{resolution}'. Use one of: "
+            + ", ".join(_RESOLUTION_HOURS)
+        )
+    step_hours = _RESOLUTION_HOURS[resolution]
+    count = max(int(days), 0) * 24 // step_hours
+    if count > MAX_SERIES_POINTS:
+        raise ValueError(
+            f"Range too large: {count} points requested, max is {MAX_SERIES_POINTS}"
+        )
+
+    base = np.datetime64(_to_utc(start).replace(tzinfo=None), "us")
+    offsets = np.arange(count, dtype=np.int64) * np.timedelta64(step_hours, "h")
+    return calculate_moon_phases(base + offsets)
+
+
+def _columns_to_rows(columns: dict[str, list]) -> list[dict[str, Any]]:
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
 def get_current_moon_phase(
-    latitude: Optional[float] = None, longitude: Optional[float] = None
-) -> Dict[str, Any]:
+    latitude: float | None = None, longitude: float | None = None
+) -> dict[str, Any]:
     """Get current moon phase information."""
     now = datetime.now()
     phase_data = calculate_moon_phase(now)
@@ -134,8 +393,8 @@ def get_current_moon_phase(
 
 
 def get_moon_phase_for_date(
-    date_str: str, latitude: Optional[float] = None, longitude: Optional[float] = None
-) -> Dict[str, Any]:
+    date_str: str, latitude: float | None = None, longitude: float | None = None
+) -> dict[str, Any]:
     """Get moon phase for a specific date (YYYY-MM-DD format)."""
     try:
         date = datetime.fromisoformat(date_str)
@@ -150,64 +409,383 @@ def get_moon_phase_for_date(
         raise ValueError("Invalid date format. Use YYYY-MM-DD")
 
 
-def get_moon_phase_range(start_date: str, days: int = 7) -> list[Dict[str, Any]]:
-    """Get moon phase information for a range of dates."""
+def get_moon_phase_range(
+    start_date: str,
+    days: int = 7,
+    resolution: str = "daily",
+    columnar: bool = False,
+    latitude: float | None = None,
+    longitude: float | None = None,
+    tz: str | None = None,
+):
+    """Get moon phase information for a range of dates.
+
+    Computed in one vectorized pass. Returns a list of per-instant dicts, or
+    the columnar dict from `calculate_moon_phases` when `columnar` is True.
+    With a location, each entry also gets the "rise"/"set" of its day from a
+    single skyfield search over the whole window.
+    """
     try:
         start = datetime.fromisoformat(start_date)
-        phases = []
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+
+    columns = moon_phase_series(start, days, resolution)
+
+    if latitude is not None and longitude is not None:
+        by_day = {
+            d["date"]: d
+            for d in calculate_moon_rise_set_range(start, days, latitude, longitude, tz)
+        }
+        day_keys = [d[:10] for d in columns["date"]]
+        columns["rise"] = [by_day.get(k, {}).get("rise") for k in day_keys]
+        columns["set"] = [by_day.get(k, {}).get("set") for k in day_keys]
+
+    return columns if columnar else _columns_to_rows(columns)
+
+
+# A year of rise/set per request is plenty for calendars and keeps one
+# find_discrete search bounded.
+MAX_RISE_SET_DAYS = 366
+
+
+def calculate_moon_rise_set_range(
+    start: datetime,
+    days: int,
+    latitude: float,
+    longitude: float,
+    tz: str | None = None,
+) -> list[dict[str, Any]]:
+    """Moon rise and set times for each local day of a multi-day window.
+
+    Runs one `risings_and_settings` search over the whole window and buckets
+    the events by local day in `tz` (an IANA name, default UTC). Returns one
+    dict per day, {"date", "rise", "set"}, with None where the moon doesn't
+    rise or set that day. Raises on invalid input or skyfield errors, and
+    `compute_executor.ComputeError` when the compute pool is busy or slow.
+    """
+    return compute_executor.run(_rise_set_range, start, days, latitude, longitude, tz)
+
+
+def _rise_set_range(
+    start: datetime,
+    days: int,
+    latitude: float,
+    longitude: float,
+    tz: str | None = None,
+) -> list[dict[str, Any]]:
+    """Compute side of `calculate_moon_rise_set_range` (runs in a worker)."""
+    if not SKYFIELD_AVAILABLE:
+        raise RuntimeError("Skyfield library not available for rise/set calculations")
+    if days > MAX_RISE_SET_DAYS:
+        raise ValueError(f"Rise/set range is limited to {MAX_RISE_SET_DAYS} days")
+
+    _, find_discrete, _ = _skyfield()
+    try:
+        zone = ZoneInfo(tz) if tz else UTC
+    except (ValueError, ZoneInfoNotFoundError):
+        raise ValueError(f"Unknown time zone '{tz}'")
+    first_day = start.date()
+    day_list = [first_day + timedelta(days=i) for i in range(max(int(days), 0))]
+    if not day_list:
+        return []
+    _check_supported_span(day_list[0], day_list[-1])
+
+    ts = _get_timescale()
+    window_start = datetime.combine(first_day, time(0), tzinfo=zone)
+    window_end = datetime.combine(
+        day_list[-1] + timedelta(days=1), time(0), tzinfo=zone
+    )
+    times, events = find_discrete(
+        ts.from_datetime(window_start),
+        ts.from_datetime(window_end),
+        _rise_set_function(
+            latitude, longitude, _needs_full_ephemeris(day_list[0], day_list[-1])
+        ),
+    )
+
+    results = {d: {"date": d.isoformat(), "rise": None, "set": None} for d in day_list}
+    for t, event in zip(times, events):
+        local = t.utc_datetime().astimezone(zone)
+        day = results.get(local.date())
+        if day is None:
+            continue
+        # like the single-day search, a second event of the same kind wins
+        day["rise" if event == 1 else "set"] = local.isoformat()
+
+    return [results[d] for d in day_list]
+
+
+# Sky track limits: 1-60 minute steps, at most two days per request.
+MAX_TRACK_HOURS = 48
+
+
+def calculate_moon_sky_track(
+    latitude: float,
+    longitude: float,
+    start: datetime,
+    hours: float = 12.0,
+    step_minutes: int = 5,
+) -> dict[str, Any]:
+    """Moon altitude, azimuth and distance for an observer over a window.
+
+    All instants go through skyfield as one array Time, so the whole track is
+    a single vectorized observe/apparent/altaz call. Output is columnar and
+    the timestamps are implied: sample i is at `start + i * step_minutes`.
+    """
+    if not SKYFIELD_AVAILABLE:
+        raise RuntimeError("Skyfield library not available for position calculations")
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        raise ValueError(f"Location out of range: {latitude}, {longitude}")
+    if not 1 <= step_minutes <= 60:
+        raise ValueError("step must be between 1 and 60 minutes")
+    if not 0 < hours <= MAX_TRACK_HOURS:
+        raise ValueError(f"hours must be between 0 and {MAX_TRACK_HOURS}")
+
+    start = _to_utc(start)
+    count = int(hours * 60 // step_minutes) + 1
+    end = start + timedelta(minutes=(count - 1) * step_minutes)
+    _check_supported_span(start.date(), end.date())
+    return compute_executor.run(
+        _sky_track, latitude, longitude, start, count, step_minutes
+    )
+
+
+def _sky_track(
+    latitude: float, longitude: float, start: datetime, count: int, step_minutes: int
+) -> dict[str, Any]:
+    """Compute side of `calculate_moon_sky_track` (runs in a worker)."""
+    minutes = np.arange(count) * step_minutes
+    last_day = (start + timedelta(minutes=int(minutes[-1]))).date()
+    full = _needs_full_ephemeris(start.date(), last_day)
+    moon = _get_full_ephemeris()["moon"] if full else _get_moon()
+
+    ts = _get_timescale()
+    t = ts.utc(
+        start.year,
+        start.month,
+        start.day,
+        start.hour,
+        start.minute + minutes,
+        start.second + start.microsecond / 1_000_000,
+    )
+    alt, az, distance = (
+        _get_observer(latitude, longitude, full).at(t).observe(moon).apparent().altaz()
+    )
+
+    return {
+        "start": start.isoformat(),
+        "step_minutes": step_minutes,
+        "count": count,
+        "location": {"lat": latitude, "lon": longitude},
+        "alt_deg": np.round(alt.degrees, 3).tolist(),
+        "az_deg": np.round(az.degrees, 3).tolist(),
+        "distance_km": np.round(distance.km, 1).tolist(),
+    }
 
-        for i in range(days):
-            current_date = start + timedelta(days=i)
-            phases.append(calculate_moon_phase(current_date))
 
-        return phases
+# Bulk rise/set requests are split into one task per compute worker. Big
+# batches get a longer deadline than single lookups.
+MAX_BATCH_LOCATIONS = 1000
+MAX_BATCH_LOCATION_DAYS = 20_000
+BATCH_TIMEOUT_S = float(os.getenv("MOON_BATCH_TIMEOUT_S", "60"))
+
+
+def _rise_set_chunk(
+    cells: list[tuple[float, float]], start_iso: str, days: int, tz: str | None
+) -> list[Any]:
+    """Worker task: rise/set for several locations over one shared window."""
+    start = datetime.fromisoformat(start_iso)
+    out: list[Any] = []
+    for lat, lon in cells:
+        try:
+            out.append(_rise_set_range(start, days, lat, lon, tz))
+        except (RuntimeError, ValueError, ArithmeticError) as e:
+            out.append({"error": f"Failed to calculate rise/set times: {e}"})
+    return out
+
+
+def calculate_moon_rise_set_batch(
+    locations: list[dict[str, Any]],
+    start_date: str,
+    days: int = 1,
+    tz: str | None = None,
+) -> list[dict[str, Any]]:
+    """Moon rise/set for many observers over the same window.
+
+    `locations` is a list of {"lat", "lon", optional "id"}. Observers are
+    snapped to the rise/set grid and deduplicated, then split into one chunk
+    per compute worker; each worker reuses its ephemeris, timescale and
+    per-location search predicates across its chunk. Returns one entry per
+    input location, in order, with either "days" or "error".
+    """
+    if not SKYFIELD_AVAILABLE:
+        raise RuntimeError("Skyfield library not available for rise/set calculations")
+    try:
+        start = datetime.fromisoformat(start_date)
     except ValueError:
         raise ValueError("Invalid date format. Use YYYY-MM-DD")
+    if tz:
+        try:
+            ZoneInfo(tz)
+        except (ValueError, ZoneInfoNotFoundError):
+            raise ValueError(f"Unknown time zone '{tz}'")
+    if not locations:
+        return []
+    if len(locations) > MAX_BATCH_LOCATIONS:
+        raise ValueError(f"At most {MAX_BATCH_LOCATIONS} locations per request")
+    if days < 1 or days > MAX_RISE_SET_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_RISE_SET_DAYS}")
+    if len(locations) * days > MAX_BATCH_LOCATION_DAYS:
+        raise ValueError(
+            f"locations x days is limited to {MAX_BATCH_LOCATION_DAYS} per request"
+        )
+    _check_supported_span(start.date(), start.date() + timedelta(days=days - 1))
+
+    parsed = []
+    for loc in locations:
+        try:
+            lat, lon = float(loc["lat"]), float(loc["lon"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Each location needs numeric 'lat' and 'lon'")
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+            raise ValueError(f"Location out of range: {lat}, {lon}")
+        parsed.append((loc.get("id"), lat, lon))
+
+    cells = list(
+        dict.fromkeys((_quantize(lat), _quantize(lon)) for _, lat, lon in parsed)
+    )
+    n_chunks = min(compute_executor.COMPUTE_WORKERS, len(cells))
+    chunks = [cells[i::n_chunks] for i in range(n_chunks)]
+
+    start_iso = start.date().isoformat()
+    chunk_results = compute_executor.run_many(
+        _rise_set_chunk,
+        [(chunk, start_iso, days, tz) for chunk in chunks],
+        timeout=BATCH_TIMEOUT_S,
+    )
+
+    by_cell = {}
+    for chunk, results in zip(chunks, chunk_results):
+        by_cell.update(zip(chunk, results))
+
+    out = []
+    for loc_id, lat, lon in parsed:
+        result = by_cell[(_quantize(lat), _quantize(lon))]
+        entry: dict[str, Any] = {"id": loc_id, "location": {"lat": lat, "lon": lon}}
+        if isinstance(result, dict):
+            entry.update(result)
+        else:
+            entry["days"] = result
+        out.append(entry)
+    return out
+
+
+# Rise/set only depends on the UTC date and the observer, and shifts by
+# seconds within a small cell, so results are memoized per (date, grid cell).
+# A grid of 0 disables quantization.
+RISE_SET_GRID_DEG = float(os.getenv("MOON_RISE_SET_GRID_DEG", "0.1"))
+RISE_SET_CACHE_SIZE = int(os.getenv("MOON_RISE_SET_CACHE_SIZE", "4096"))
+
+
+class _RiseSetCache:
+    """Bounded, thread-safe LRU of single-day rise/set results.
+
+    The entry count is the memory cap: each entry is a two-string dict, so the
+    default 4096 entries stay around a couple of MB.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "grid_deg": RISE_SET_GRID_DEG,
+            }
+
+
+_rise_set_cache = _RiseSetCache(RISE_SET_CACHE_SIZE)
+
+
+def _quantize(value: float) -> float:
+    """Snap a coordinate to the rise/set cache grid."""
+    if RISE_SET_GRID_DEG <= 0:
+        return value
+    return round(round(value / RISE_SET_GRID_DEG) * RISE_SET_GRID_DEG, 6)
+
+
+def rise_set_cache_info() -> dict[str, Any]:
+    """Hit/miss counters and size of the rise/set cache."""
+    return _rise_set_cache.info()
 
 
 def calculate_moon_rise_set(
     date: datetime, latitude: float, longitude: float
-) -> Dict[str, Any]:
+) -> dict[str, Any]:
     """Calculate moon rise and set times for a specific location and date.
 
     Returns a dict with rise and set times, or None if the moon doesn't rise/set.
+    Results are computed for the location snapped to RISE_SET_GRID_DEG and
+    memoized, so nearby observers on the same day share one search.
     """
     if not SKYFIELD_AVAILABLE:
         return {"error": "Skyfield library not available for rise/set calculations"}
 
     try:
-        # Load ephemeris
-        eph = load("de421.bsp")
-        moon = eph["moon"]
-
-        # Create location
-        location = Topos(latitude_degrees=latitude, longitude_degrees=longitude)
-
-        # Time scale
-        ts = load.timescale()
-
-        # Get times for the date
-        start_time = ts.utc(date.year, date.month, date.day, 0, 0, 0)
-        end_time = ts.utc(date.year, date.month, date.day, 23, 59, 59)
-
-        # Find rise and set times
-        f = risings_and_settings(eph, moon, location)
-        times, events = find_discrete(start_time, end_time, f)
-
-        rise_time = None
-        set_time = None
-
-        for t, event in zip(times, events):
-            if event == 1:  # Rising
-                rise_time = t.utc_datetime()
-            elif event == 0:  # Setting
-                set_time = t.utc_datetime()
+        day = _to_utc(date).date()
+        lat, lon = _quantize(latitude), _quantize(longitude)
+        key = (day, lat, lon)
+
+        times = _rise_set_cache.get(key)
+        if times is None:
+            result = calculate_moon_rise_set_range(
+                datetime.combine(day, time(0)), 1, lat, lon
+            )[0]
+            times = {"rise": result["rise"], "set": result["set"]}
+            _rise_set_cache.put(key, times)
 
         return {
-            "rise": rise_time.isoformat() if rise_time else None,
-            "set": set_time.isoformat() if set_time else None,
+            "rise": times["rise"],
+            "set": times["set"],
             "location": {"lat": latitude, "lon": longitude},
         }
 
+    except compute_executor.ComputeError:
+        raise  # overload/deadline, not a bad input: let the route map it
     except Exception as e:
         return {"error": f"Failed to calculate rise/set times: {str(e)}"}
@@ -0,0 +1,172 @@
+"""Precomputed table of true lunar phase instants.
+
+`moon_phase.calculate_moon_phase` uses a mean synodic month, which can put
+the predicted next phase up to ~14 hours off. Asking skyfield for the exact
+instant on every request is far too slow, so the new / first quarter / full /
+last quarter instants are generated once with skyfield's `moon_phases` and
+stored as a compact .npz (float64 Unix seconds + int8 phase codes, ~60 KB
+for 1900-2052 from de421). Lookups are then a binary search over that array
+and the mean-month model is only used outside the table's span.
+
+Build the table from the full ephemeris (the bundled excerpt only covers
+2000-2050):
+
+    MOON_EPHEMERIS_PATH=de421.bsp python moon_phase_table.py   # 1900-2100, clamped
+    MOON_EPHEMERIS_PATH=de421.bsp python moon_phase_table.py 1950 2050
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import zipfile
+from datetime import UTC, datetime
+
+import numpy as np
+
+TABLE_PATH = os.path.join(
+    os.path.dirname(__file__), "moon_phases.npz"
+)  # should be stored in /backend
+
+# Indexed by skyfield's phase code (0 = new moon ... 3 = last quarter).
+PHASE_NAMES = ("New Moon", "First Quarter", "Full Moon", "Last Quarter")
+
+_table_lock = threading.Lock()
+_table: tuple[np.ndarray, np.ndarray] | None = None
+_table_loaded = False
+
+
+def build_table(
+    start_year: int = 1900, end_year: int = 2100, path: str = TABLE_PATH
+) -> tuple[int, int, int]:
+    """Generate the phase table with skyfield and write it to `path`.
+
+    The span is clamped to the years the ephemeris fully covers. Returns
+    (first_year, last_year, number_of_events).
+    """
+    import moon_phase
+    from skyfield import almanac
+
+    eph = moon_phase._get_ephemeris()
+    ts = moon_phase._get_timescale()
+
+    # the usable span is where every segment (Sun, Earth, Moon, ...) has data
+    first_jd = max(s.spk_segment.start_jd for s in eph.segments)
+    last_jd = min(s.spk_segment.end_jd for s in eph.segments)
+    start_year = max(start_year, ts.tdb_jd(first_jd).utc_datetime().year + 1)
+    end_year = min(end_year, ts.tdb_jd(last_jd).utc_datetime().year - 1)
+    if start_year > end_year:
+        raise ValueError("Requested years are outside the ephemeris coverage")
+
+    t, codes = almanac.find_discrete(
+        ts.utc(start_year, 1, 1), ts.utc(end_year + 1, 1, 1), almanac.moon_phases(eph)
+    )
+    seconds = np.array([dt.timestamp() for dt in t.utc_datetime()], dtype=np.float64)
+    codes = np.asarray(codes, dtype=np.int8)
+
+    # start on a new moon so every later entry has one to measure age from
+    first_new = int(np.argmax(codes == 0))
+    seconds, codes = seconds[first_new:], codes[first_new:]
+
+    tmp = f"{path}.tmp.npz"  # np.savez appends .npz unless it's already there
+    np.savez_compressed(tmp, t=seconds, phase=codes)
+    os.replace(tmp, path)
+
+    global _table_loaded
+    with _table_lock:
+        _table_loaded = False  # pick up the new file on next lookup
+    return start_year, end_year, len(seconds)
+
+
+def load_table(path: str = TABLE_PATH) -> tuple[np.ndarray, np.ndarray] | None:
+    """Return (unix_seconds, phase_codes), loading the table once per process.
+
+    Returns None when the table hasn't been built; callers then fall back to
+    the mean synodic month model.
+    """
+    global _table, _table_loaded
+    if _table_loaded:
+        return _table
+    with _table_lock:
+        if not _table_loaded:
+            try:
+                with np.load(path) as data:
+                    _table = (data["t"], data["phase"])
+            except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+                _table = None
+            _table_loaded = True
+    return _table
+
+
+def _unix(dt: datetime) -> float:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return dt.timestamp()
+
+
+def covers(seconds: float) -> bool:
+    """True if `seconds` (Unix time) lies strictly inside the table."""
+    table = load_table()
+    return table is not None and table[0][0] <= seconds < table[0][-1]
+
+
+def _as_event(table, idx: int) -> tuple[str, datetime]:
+    times, codes = table
+    when = datetime.fromtimestamp(float(times[idx]), tz=UTC)
+    return PHASE_NAMES[int(codes[idx])], when
+
+
+def next_phase_event(dt: datetime) -> tuple[str, datetime] | None:
+    """The first principal phase strictly after `dt`, as (name, utc_datetime)."""
+    table = load_table()
+    if table is None:
+        return None
+    idx = int(np.searchsorted(table[0], _unix(dt), side="right"))
+    if idx >= len(table[0]):
+        return None
+    return _as_event(table, idx)
+
+
+def previous_phase_event(dt: datetime) -> tuple[str, datetime] | None:
+    """The last principal phase at or before `dt`, as (name, utc_datetime)."""
+    table = load_table()
+    if table is None:
+        return None
+    idx = int(np.searchsorted(table[0], _unix(dt), side="right")) - 1
+    if idx < 0:
+        return None
+    return _as_event(table, idx)
+
+
+def true_phase(seconds: np.ndarray):
+    """Table-anchored phase data for Unix times inside the table.
+
+    Returns (phase_fraction, age_days, next_code, days_to_next) arrays. The
+    fraction is interpolated between the surrounding true phase events, so it
+    is exactly 0, .25, .5 and .75 at new, first quarter, full and last quarter.
+    Callers must check `covers` first.
+    """
+    times, codes = load_table()
+    seconds = np.asarray(seconds, dtype=np.float64)
+
+    nxt = np.searchsorted(times, seconds, side="right")
+    prev = nxt - 1
+    prev_code = codes[prev].astype(np.int64)
+
+    span = times[nxt] - times[prev]
+    phase = (prev_code + (seconds - times[prev]) / span) / 4.0
+
+    # phases cycle 0..3 from a new moon, so the last one is prev_code events back
+    last_new = prev - prev_code
+    age = (seconds - times[last_new]) / 86400.0
+
+    days_to_next = (times[nxt] - seconds) / 86400.0
+    return phase, age, codes[nxt].astype(np.int64), days_to_next
+
+
+if __name__ == "__main__":
+    import sys
+
+    years = [int(a) for a in sys.argv[1:3]]
+    first, last, n = build_table(*years)
+    print(f"Wrote {n} phase events for {first}-{last} to {TABLE_PATH}")
@@ -0,0 +1,263 @@
+"""Global moonrise/moonset rasters for map overlays.
+
+Running `find_discrete` once per map cell would take hours for a world grid,
+so the raster is computed differently: the Moon's geocentric apparent RA/Dec,
+distance and Greenwich sidereal time are sampled once for the day with
+skyfield, and every grid cell's altitude curve is then evaluated with NumPy
+(sin h = sin φ sin δ + cos φ cos δ cos H). Horizon crossings are found by
+sign changes between samples and refined by linear interpolation. Latitude
+bands are spread over the compute executor's process pool.
+
+Rasters are stored on disk as compressed .npz files holding uint16 minutes
+after 00:00 UTC (NO_EVENT where the Moon doesn't rise or set), so a 1-degree
+world raster is a few hundred KB and can be served as-is.
+
+Pre-generate upcoming days as a job of its own, outside the web process
+(docker-compose runs it as the `moon-tiles` service with --every 6):
+
+    python moon_tiles.py --days 7 --res 1 [--every HOURS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import logging
+import os
+import threading
+import time
+
+import compute_executor
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TILE_DIR = os.path.join(
+    os.path.dirname(__file__), "moon_tiles"
+)  # should be cached in /backend
+
+# Allowed grid spacings in degrees.
+RESOLUTIONS = (0.25, 0.5, 1.0, 2.0)
+DEFAULT_RES = 1.0
+
+NO_EVENT = np.iinfo(np.uint16).max
+
+# Altitude sampling step. The Moon's altitude changes by at most ~3 degrees in
+# 10 minutes, so linear interpolation between samples is good to ~1 minute.
+SAMPLE_MINUTES = 10
+
+# Same horizon as moon_phase's risings_and_settings: the Moon's center at -34'
+# topocentric, i.e. geocentric altitude = horizontal parallax - 34'.
+_REFRACTION_DEG = 34.0 / 60.0
+_EARTH_RADIUS_KM = 6378.137
+
+# Rows evaluated at once; keeps the (rows x cols x samples) work array small.
+_ROWS_PER_BLOCK = 16
+
+# A 0.25-degree raster takes a few CPU-seconds; leave room for a busy pool.
+TILE_TIMEOUT_S = float(os.getenv("MOON_TILE_TIMEOUT_S", "120"))
+
+_generate_lock = threading.Lock()
+
+
+def tile_path(date: datetime.date, res: float = DEFAULT_RES) -> str:
+    return os.path.join(TILE_DIR, f"{date.isoformat()}_{res:g}.npz")
+
+
+def _check_res(res: float) -> float:
+    res = float(res)
+    if res not in RESOLUTIONS:
+        raise ValueError(
+            f"Invalid resolution {res:g}. Use one of: "
+            + ", ".join(f"{r:g}" for r in RESOLUTIONS)
+        )
+    return res
+
+
+def _moon_samples(date: datetime.date):
+    """Geocentric Moon RA/Dec, GAST and horizon altitude, sampled over the day.
+
+    Returns degree arrays (ra, dec, gast, h0) of length 24*60/SAMPLE_MINUTES + 1.
+    """
+    import moon_phase
+
+    moon_phase._check_supported_span(date, date)
+    if moon_phase._needs_full_ephemeris(date, date):
+        eph = moon_phase._get_full_ephemeris()
+        moon = eph["moon"]
+    else:
+        eph, moon = moon_phase._get_ephemeris(), moon_phase._get_moon()
+
+    ts = moon_phase._get_timescale()
+    minutes = np.arange(0, 24 * 60 + 1, SAMPLE_MINUTES)
+    t = ts.utc(date.year, date.month, date.day, 0, minutes)
+
+    earth = eph["earth"]
+    ra, dec, distance = earth.at(t).observe(moon).apparent().radec(epoch="date")
+    parallax = np.degrees(np.arcsin(_EARTH_RADIUS_KM / distance.km))
+    return ra.hours * 15.0, dec.degrees, t.gast * 15.0, parallax - _REFRACTION_DEG
+
+
+def _crossings(
+    lats: np.ndarray,
+    lons: np.ndarray,
+    ra: np.ndarray,
+    dec: np.ndarray,
+    gast: np.ndarray,
+    h0: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Rise/set minutes after 00:00 UTC for a lat x lon block.
+
+    Pure NumPy: only `_moon_samples` needs skyfield. Like moon_phase's single-day
+    search, the last rise/set of the day wins.
+    """
+    phi = np.radians(lats)[:, None, None]
+    hour_angle = np.radians(gast[None, None, :] + lons[None, :, None] - ra)
+    dec_r = np.radians(dec)
+    sin_alt = np.sin(phi) * np.sin(dec_r) + np.cos(phi) * np.cos(dec_r) * np.cos(
+        hour_angle
+    )
+    f = sin_alt - np.sin(np.radians(h0))  # > 0 while the Moon is up
+
+    up = f > 0
+    rising = ~up[..., :-1] & up[..., 1:]
+    setting = up[..., :-1] & ~up[..., 1:]
+
+    # linear zero crossing inside each sample interval, in minutes
+    f0, f1 = f[..., :-1], f[..., 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.clip(f0 / (f0 - f1), 0.0, 1.0)
+    minutes = (np.arange(f0.shape[-1]) + frac) * SAMPLE_MINUTES
+
+    def last(mask: np.ndarray) -> np.ndarray:
+        n = mask.shape[-1]
+        idx = n - 1 - np.argmax(mask[..., ::-1], axis=-1)
+        found = mask.any(axis=-1)
+        value = np.take_along_axis(minutes, idx[..., None], axis=-1)[..., 0]
+        # a crossing exactly at 24:00 belongs to the next day
+        found &= value < 24 * 60
+        return np.where(found, np.rint(value), NO_EVENT).astype(np.uint16)
+
+    return last(rising), last(setting)
+
+
+def _crossings_band(lats: np.ndarray, lons: np.ndarray, *samples: np.ndarray):
+    """Pool task: `_crossings` over a latitude band, a few rows at a time."""
+    blocks = [
+        _crossings(lats[i : i + _ROWS_PER_BLOCK], lons, *samples)
+        for i in range(0, len(lats), _ROWS_PER_BLOCK)
+    ]
+    return (
+        np.concatenate([b[0] for b in blocks]),
+        np.concatenate([b[1] for b in blocks]),
+    )
+
+
+def generate_tile(
+    date: datetime.date, res: float = DEFAULT_RES, overwrite: bool = False
+) -> str:
+    """Compute the rise/set raster for `date` and store it. Returns the path."""
+    res = _check_res(res)
+    path = tile_path(date, res)
+    if os.path.exists(path) and not overwrite:
+        return path
+
+    lats = np.arange(-90.0, 90.0 + res / 2, res)
+    lons = np.arange(-180.0, 180.0, res)
+    samples = compute_executor.run(_moon_samples, date)
+
+    n_tasks = min(compute_executor.COMPUTE_WORKERS, len(lats))
+    bands = np.array_split(lats, n_tasks)
+    parts = compute_executor.run_many(
+        _crossings_band,
+        [(band, lons, *samples) for band in bands],
+        timeout=TILE_TIMEOUT_S,
+    )
+
+    rise = np.concatenate([p[0] for p in parts])
+    set_ = np.concatenate([p[1] for p in parts])
+
+    os.makedirs(TILE_DIR, exist_ok=True)
+    # per process: the moon-tiles job and the web workers may race on a day
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(
+        tmp,
+        rise=rise,
+        set=set_,
+        lat=np.array([lats[0], res]),
+        lon=np.array([lons[0], res]),
+        date=np.array(date.isoformat()),
+    )
+    os.replace(tmp, path)  # readers (and ETags) only ever see complete files
+    return path
+
+
+def get_tile(date: datetime.date, res: float = DEFAULT_RES) -> str:
+    """Path of the stored raster, generating it on first request."""
+    res = _check_res(res)
+    path = tile_path(date, res)
+    if os.path.exists(path):
+        return path
+    with _generate_lock:  # one generation at a time per process
+        return generate_tile(date, res)
+
+
+def prune_tiles(keep_days: int = 7) -> int:
+    """Delete rasters for dates more than `keep_days` before today."""
+    if not os.path.isdir(TILE_DIR):
+        return 0
+    cutoff = datetime.date.today() - datetime.timedelta(days=keep_days)
+    removed = 0
+    for name in os.listdir(TILE_DIR):
+        try:
+            day = datetime.date.fromisoformat(name.split("_", 1)[0])
+        except ValueError:
+            continue
+        if day < cutoff:
+            os.remove(os.path.join(TILE_DIR, name))
+            removed += 1
+    return removed
+
+
+def run_daily_job(days_ahead: int = 7, res: float = DEFAULT_RES) -> int:
+    """Make sure rasters exist for today and the next `days_ahead` days."""
+    today = datetime.date.today()
+    made = 0
+    for i in range(days_ahead + 1):
+        day = today + datetime.timedelta(days=i)
+        if not os.path.exists(tile_path(day, res)):
+            with _generate_lock:
+                generate_tile(day, res)
+            made += 1
+    prune_tiles()
+    return made
+
+
+def run_forever(
+    days_ahead: int = 7, res: float = DEFAULT_RES, interval_s: float = 6 * 3600
+) -> None:
+    """Run `run_daily_job` now and then every `interval_s`, logging failures."""
+    while True:
+        try:
+            n = run_daily_job(days_ahead, res)
+            logger.info("Generated %d raster(s) in %s", n, TILE_DIR)
+        except Exception:
+            logger.exception("moon tile job failed")
+        time.sleep(interval_s)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate moonrise rasters")
+    parser.add_argument("--days", type=int, default=7, help="days ahead of today")
+    parser.add_argument("--res", type=float, default=DEFAULT_RES)
+    parser.add_argument(
+        "--every", type=float, metavar="HOURS", help="keep running, every HOURS"
+    )
+    args = parser.parse_args()
+
+    if args.every:
+        logging.basicConfig(level=logging.INFO)
+        run_forever(args.days, args.res, args.every * 3600)
+    else:
+        n = run_daily_job(args.days, args.res)
+        print(f"Generated {n} raster(s) in {TILE_DIR}")
@@ -1,10 +1,13 @@
 import os
 import datetime
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv, find_dotenv
 from dataclasses import dataclass
 import requests
 
-
 load_dotenv(
     find_dotenv(), override=False
 )  # For loading the .env file and accessing any sensitive info like API keys - https://pypi.org/project/python-dotenv/
@@ -23,6 +26,53 @@ def getNASA_APIKey():
         return "DEMO_KEY"
 
 
+APOD_ENDPOINT = "https://api.nasa.gov/planetary/apod"
+
+# Lookback: one start_date/end_date range request, then (only if that fails)
+# single-date probes of the most recent days in parallel. Worst case is one
+# range timeout plus one probe timeout, and 1 + LOOKBACK_PROBES requests.
+RANGE_TIMEOUT_S = 10
+PROBE_TIMEOUT_S = 5
+LOOKBACK_PROBES = 7
+PROBE_WORKERS = 4
+
+# X-RateLimit-Remaining from the last api.nasa.gov range response (None until
+# one carried it); the APOD archive backfill stops before using it all up.
+rate_limit_remaining = None
+
+# Publication-aware cache for the latest APOD. An entry dated D stays current
+# until the next one is expected at 00:00 US Eastern on D+1; from then on the
+# API is polled every ROLLOVER_POLL_S (doubling up to ROLLOVER_POLL_MAX_S)
+# until the new entry appears. The state lives in a JSON file so every worker
+# on the host shares it, and a lock file lets one of them do the refresh.
+LATEST_CACHE_PATH = os.path.join(
+    os.path.dirname(__file__), "apod_latest.json"
+)  # should be cached in /backend
+ROLLOVER_POLL_S = 300
+ROLLOVER_POLL_MAX_S = 3600
+ERROR_RETRY_S = 600  # after a failed or rate-limited refresh
+
+try:
+    import fcntl
+except ImportError:  # Windows: workers refresh independently
+    fcntl = None
+
+try:
+    from zoneinfo import ZoneInfo
+
+    APOD_TZ = ZoneInfo("America/New_York")
+except Exception:  # no tz database (slim images without tzdata)
+    APOD_TZ = datetime.timezone(datetime.timedelta(hours=-5), "EST")
+
+
+def apod_today() -> datetime.date:
+    """
+    The current date where APOD is published (US Eastern). The API rejects
+    dates after this, so ranges must not end on the server's local "today".
+    """
+    return datetime.datetime.now(APOD_TZ).date()
+
+
 def getCurrDate():
     """
     Return a string of the current date in YYYY-MM-DD for APOD query
@@ -48,34 +98,12 @@ class APOD_Item:
     raw_url: str
 
 
-def get_APOD() -> APOD_Item:
-    """
-    Will return an object on the current date.
-    Otherwise, it will return an empty apod object of: {'date': '', 'title': '', 'explanation': '', 'media_type': '', 'url': '', 'hdurl': '', 'copyright': '', 'raw_url': ''}
-    https://github.com/nasa/apod-api
-    """
+def _empty_item() -> APOD_Item:
+    return APOD_Item("", "", "", "", "", "", "", "")
 
-    api_key = getNASA_APIKey()
-    today = getCurrDate()
-    endpoint = "https://api.nasa.gov/planetary/apod"
 
-    try:
-        resp = requests.get(
-            endpoint,
-            params={"api_key": api_key, "date": today, "thumbs": "true"},
-            timeout=10,
-        )
-        resp.raise_for_status()
-        data = resp.json()  # Parse the JSON response into a dict
-        if isinstance(data, dict) and "error" in data:
-            return APOD_Item(
-                "", "", "", "", "", "", "", ""
-            )  # If there is an error return empty
-    except Exception:  # any other error exception return empty
-        return APOD_Item("", "", "", "", "", "", "", "")
-
-    # print(f"Successfully fetched APOD for {today}")
-    return APOD_Item(  # return the object
+def _to_item(data: dict) -> APOD_Item:
+    return APOD_Item(
         date=data.get("date", ""),
         title=data.get("title", ""),
         explanation=data.get("explanation", ""),
@@ -87,57 +115,204 @@ def get_APOD() -> APOD_Item:
     )
 
 
-def get_APOD_lookback(max_lookback_days=30) -> APOD_Item:
+def get_APOD() -> APOD_Item:
     """
-    Get NASA APOD from the last available day using a lookback parameter
+    Will return an object on the current date.
+    Otherwise, it will return an empty apod object of: {'date': '', 'title': '', 'explanation': '', 'media_type': '', 'url': '', 'hdurl': '', 'copyright': '', 'raw_url': ''}
+    Served from the same publication-aware cache as get_APOD_lookback.
     https://github.com/nasa/apod-api
     """
+    item = get_APOD_lookback()
+    if item.date != apod_today().isoformat():
+        return _empty_item()
+    return item
+
+
+def fetch_APOD_range(start: datetime.date, end: datetime.date, timeout=RANGE_TIMEOUT_S):
+    """
+    All APOD entries from `start` to `end` (inclusive) in one request, oldest
+    first. Raises requests exceptions (HTTPError carries the status code).
+    https://github.com/nasa/apod-api#docs-
+    """
+    resp = requests.get(
+        APOD_ENDPOINT,
+        params={
+            "api_key": getNASA_APIKey(),
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "thumbs": "true",
+        },
+        timeout=timeout,
+    )
+    global rate_limit_remaining
+    remaining = (getattr(resp, "headers", None) or {}).get("X-RateLimit-Remaining")
+    if remaining is not None and remaining.isdigit():
+        rate_limit_remaining = int(remaining)
+    resp.raise_for_status()
+    data = resp.json()
+    if isinstance(data, list):
+        return [
+            d
+            for d in data
+            if isinstance(d, dict) and d.get("date") and "error" not in d
+        ]
+    raise ValueError(f"Unexpected APOD range response: {str(data)[:200]}")
+
+
+def _probe_dates(dates):
+    """
+    Fallback for a failed range request: fetch single dates in parallel and
+    return the newest entry found. A 404 just means no APOD that day; any
+    other error (429 included) stops probing, since more requests won't help.
+    """
     api_key = getNASA_APIKey()
-    today = datetime.date.today()
-    endpoint = "https://api.nasa.gov/planetary/apod"
 
     def fetch(date_str: str):
         params = {"api_key": api_key, "date": date_str, "thumbs": "true"}
-        return requests.get(
-            endpoint, params=params, timeout=10
-        )  # Makes HTTP Get with a timeout
-
-    for d in range(
-        max_lookback_days + 1
-    ):  # Iterates each day starting from the current day and walks backwards until it reaches either a succesful day or the max_lookback_days
-        date_obj = today - datetime.timedelta(days=d)
-        date_str = date_obj.strftime("%Y-%m-%d")
-        r = fetch(date_str)  # requests for the given date
-
-        if not r.ok:
-            if (
-                r.status_code != 404
-            ):  # A 404 means there is no nasa-apod that day and thus you can continue to traverse
+        return requests.get(APOD_ENDPOINT, params=params, timeout=PROBE_TIMEOUT_S)
+
+    found = {}
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+        futures = {pool.submit(fetch, d.isoformat()): d for d in dates}
+        for future in as_completed(futures):
+            try:
+                r = future.result()
+            except requests.RequestException:
+                continue  # timeout/connection error on this date only
+            if r.status_code == 404:
                 continue
-            elif r.status_code == 429:  # A 429 means rate limited
-                # print("Rate limited by the API.")
+            if not r.ok:  # rate limited or API failure: stop probing
+                for f in futures:
+                    f.cancel()
                 break
-            else:
-                # print(f" {r.status_code} on {date_str}: {r.text[:200]}")
-                continue
+            try:
+                data = r.json()
+            except ValueError:
+                continue  # non-JSON body (e.g. an HTML error page): a miss
+            if isinstance(data, dict) and "error" not in data:
+                found[futures[future]] = data
+    return found[max(found)] if found else None
 
-        data = r.json()  # parse json as a dict
-        if "error" in data:  # Error with the API
-            # print(f"NASA API error on {date_str}: {data['error'].get('message')}")
-            break
-
-        print(f"Successfully fetched APOD for {date_str}")
-        return APOD_Item(
-            date=data.get("date", ""),
-            title=data.get("title", ""),
-            explanation=data.get("explanation", ""),
-            media_type=data.get("media_type", ""),
-            url=data.get("thumbnail_url", data.get("url", "")),
-            hdurl=data.get("hdurl"),
-            copyright=data.get("copyright"),
-            raw_url=data.get("url"),
-        )
-
-    # No data thus return empty object
-    # print("Could not fetch any APOD data.")
-    return APOD_Item("", "", "", "", "", "", "", "")
+
+def fetch_APOD_lookback(max_lookback_days=30) -> APOD_Item:
+    """
+    Fetch the most recent NASA APOD within `max_lookback_days` (uncached).
+
+    Uses a single start_date/end_date range request; if that fails with
+    anything but a rate limit, probes the last LOOKBACK_PROBES days in
+    parallel instead. Returns an empty APOD_Item if nothing is found.
+    https://github.com/nasa/apod-api
+    """
+    today = apod_today()
+    start = today - datetime.timedelta(days=max_lookback_days)
+
+    try:
+        entries = fetch_APOD_range(start, today)
+        if entries:
+            latest = max(entries, key=lambda d: d["date"])
+            print(f"Successfully fetched APOD for {latest['date']}")
+            return _to_item(latest)
+        return _empty_item()  # a valid answer: nothing published in range
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 429:
+            # Rate limited; more requests would only spend more of the budget
+            return _empty_item()
+    except (requests.RequestException, ValueError):
+        pass
+
+    probes = min(LOOKBACK_PROBES, max_lookback_days + 1)
+    data = _probe_dates([today - datetime.timedelta(days=d) for d in range(probes)])
+    if data is None:
+        return _empty_item()
+    print(f"Successfully fetched APOD for {data.get('date')}")
+    return _to_item(data)
+
+
+def _next_publication(date_str: str) -> float:
+    """When the APOD after the one dated `date_str` is due (00:00 US Eastern)."""
+    day = datetime.date.fromisoformat(date_str) + datetime.timedelta(days=1)
+    return datetime.datetime.combine(day, datetime.time(0), APOD_TZ).timestamp()
+
+
+def _expiry(item: dict, previous: dict, now: float) -> dict:
+    """Cache state for a freshly fetched `item` (falsy if the fetch failed)."""
+    if not item:
+        # keep serving what we had, and don't retry straight away
+        return {
+            "item": previous.get("item"),
+            "expires_at": now + ERROR_RETRY_S,
+            "misses": previous.get("misses", 0),
+        }
+    due = _next_publication(item["date"])
+    if due > now:
+        return {"item": item, "expires_at": due, "misses": 0}
+    # past the rollover and the next APOD isn't out yet: back off gently
+    misses = previous.get("misses", 0) + 1 if previous.get("item") == item else 1
+    wait = min(ROLLOVER_POLL_S * 2 ** (misses - 1), ROLLOVER_POLL_MAX_S)
+    return {"item": item, "expires_at": now + wait, "misses": misses}
+
+
+class _LatestCache:
+    """The latest APOD, shared on disk and held in memory until it expires."""
+
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._state: dict = {}
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, state: dict) -> None:
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def get(self, fetch) -> dict:
+        """Current state ({"item", "expires_at"}), calling `fetch()` if expired."""
+        state = self._state
+        if state.get("expires_at", 0) > self._clock():
+            return state
+        with self._lock:
+            state = self._read()  # another worker may have refreshed it
+            if state.get("expires_at", 0) <= self._clock():
+                with open(f"{self.path}.lock", "a") as lock:
+                    if fcntl is not None:
+                        fcntl.flock(lock, fcntl.LOCK_EX)
+                    state = self._read()
+                    if state.get("expires_at", 0) <= self._clock():
+                        item = fetch()
+                        state = _expiry(
+                            item.__dict__ if item.date else None, state, self._clock()
+                        )
+                        try:
+                            self._write(state)
+                        except OSError:
+                            pass  # read-only disk: still cached in memory
+            self._state = state
+            return state
+
+
+_latest = _LatestCache(LATEST_CACHE_PATH)
+
+
+def get_APOD_lookback(max_lookback_days=30) -> APOD_Item:
+    """
+    The most recent NASA APOD, fetched at most once per publication (see
+    LATEST_CACHE_PATH) with fetch_APOD_lookback(max_lookback_days).
+    Returns an empty APOD_Item if nothing has been found.
+    """
+    state = _latest.get(lambda: fetch_APOD_lookback(max_lookback_days))
+    return APOD_Item(**state["item"]) if state.get("item") else _empty_item()
+
+
+def latest_max_age() -> int:
+    """Seconds until the cached latest APOD may change (for Cache-Control)."""
+    return max(0, int(_latest._state.get("expires_at", 0) - _latest._clock()))
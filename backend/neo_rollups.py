@@ -0,0 +1,405 @@
+"""Pre-aggregated daily rollups of the NASA NEO feed.
+
+The NEO feed only answers 7-day windows, so charting counts or miss distances
+over years would mean pulling hundreds of feeds per request. Instead, every
+feed we fetch is folded into a per-day rollup (count, hazardous count, min
+miss distance, max diameter, mean velocity), and week, month and year buckets
+are kept up to date alongside it. A trend query then costs one dict lookup
+per bucket regardless of how many days the span covers.
+
+Every worker process keeps its own copy in memory. Writers take a lock file,
+merge in what other workers saved since and then rewrite the file, and
+readers pick up the file whenever it changes, so no worker's days are lost.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import json
+import os
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+ROLLUP_PATH = os.path.join(
+    os.path.dirname(__file__), "neo_rollups.json"
+)  # should be cached in /backend
+
+BUCKETS = ("day", "week", "month", "year")
+
+# Most rows one trend query may return, per bucket level.
+MAX_TREND_ROWS = {"day": 3 * 366, "week": 10 * 53, "month": 50 * 12, "year": 200}
+
+_SCHEMA_VERSION = 1
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, last writer wins
+    fcntl = None
+
+
+def _empty() -> dict[str, Any]:
+    return {
+        "count": 0,
+        "hazardous": 0,
+        "min_miss_km": None,
+        "max_diameter_m": None,
+        "velocity_sum": 0.0,
+        "velocity_n": 0,
+    }
+
+
+def _float_or_none(value: Any) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def aggregate_day(items: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Fold the feed entries for a single day into one rollup record."""
+    agg = _empty()
+    for obj in items:
+        agg["count"] += 1
+        if obj.get("is_potentially_hazardous_asteroid"):
+            agg["hazardous"] += 1
+
+        diam = _float_or_none(
+            (obj.get("estimated_diameter") or {})
+            .get("meters", {})
+            .get("estimated_diameter_max")
+        )
+        if diam is not None and (
+            agg["max_diameter_m"] is None or diam > agg["max_diameter_m"]
+        ):
+            agg["max_diameter_m"] = diam
+
+        cad = obj.get("close_approach_data") or []
+        first = cad[0] if cad else {}
+        miss_km = _float_or_none((first.get("miss_distance") or {}).get("kilometers"))
+        if miss_km is not None and (
+            agg["min_miss_km"] is None or miss_km < agg["min_miss_km"]
+        ):
+            agg["min_miss_km"] = miss_km
+
+        vel = _float_or_none(
+            (first.get("relative_velocity") or {}).get("kilometers_per_second")
+        )
+        if vel is not None:
+            agg["velocity_sum"] += vel
+            agg["velocity_n"] += 1
+    return agg
+
+
+def merge(aggs: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Combine rollup records. Sums add, extremes take min/max."""
+    out = _empty()
+    for a in aggs:
+        out["count"] += a["count"]
+        out["hazardous"] += a["hazardous"]
+        out["velocity_sum"] += a["velocity_sum"]
+        out["velocity_n"] += a["velocity_n"]
+        if a["min_miss_km"] is not None and (
+            out["min_miss_km"] is None or a["min_miss_km"] < out["min_miss_km"]
+        ):
+            out["min_miss_km"] = a["min_miss_km"]
+        if a["max_diameter_m"] is not None and (
+            out["max_diameter_m"] is None or a["max_diameter_m"] > out["max_diameter_m"]
+        ):
+            out["max_diameter_m"] = a["max_diameter_m"]
+    return out
+
+
+def bucket_start(day: datetime.date, bucket: str) -> datetime.date:
+    """First day of the bucket containing `day` (weeks start on Monday)."""
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "year":
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Invalid bucket '{bucket}'. Use one of: {', '.join(BUCKETS)}")
+
+
+def next_bucket_start(start: datetime.date, bucket: str) -> datetime.date:
+    """First day of the bucket following the one that starts at `start`."""
+    if bucket == "day":
+        return start + datetime.timedelta(days=1)
+    if bucket == "week":
+        return start + datetime.timedelta(days=7)
+    if bucket == "month":
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    if bucket == "year":
+        return start.replace(year=start.year + 1)
+    raise ValueError(f"Invalid bucket '{bucket}'. Use one of: {', '.join(BUCKETS)}")
+
+
+def _bucket_count(start: datetime.date, end: datetime.date, bucket: str) -> int:
+    """Number of `bucket`s overlapping [start, end] (start <= end)."""
+    if bucket == "day":
+        return (end - start).days + 1
+    if bucket == "week":
+        return (bucket_start(end, "week") - bucket_start(start, "week")).days // 7 + 1
+    if bucket == "month":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    return end.year - start.year + 1
+
+
+def _iter_days(start: datetime.date, end: datetime.date) -> Iterator[datetime.date]:
+    day = start
+    while day <= end:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+def _public(agg: dict[str, Any]) -> dict[str, Any]:
+    """Shape a stored rollup for the API (velocity sum/n become a mean)."""
+    mean_vel = agg["velocity_sum"] / agg["velocity_n"] if agg["velocity_n"] else None
+    return {
+        "count": agg["count"],
+        "hazardous_count": agg["hazardous"],
+        "min_miss_distance_km": agg["min_miss_km"],
+        "max_diameter_m": agg["max_diameter_m"],
+        "mean_velocity_km_s": round(mean_vel, 3) if mean_vel is not None else None,
+    }
+
+
+class RollupStore:
+    """Day-keyed NEO rollups with precomputed week/month/year levels.
+
+    Buckets are keyed by the ISO date of their first day, so every level uses
+    the same key space and a trend walk is just `next_bucket_start` + lookup.
+    """
+
+    def __init__(self, path: str = ROLLUP_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._levels: dict[str, dict[str, dict[str, Any]]] = {b: {} for b in BUCKETS}
+        self._stamp: tuple | None = None
+        self._load()
+
+    def _load(self) -> list[datetime.date]:
+        """Adopt the file if another worker rewrote it since we last looked.
+
+        Days only this process has (e.g. the disk is read-only) are kept;
+        they are returned so the caller can re-derive their buckets.
+        """
+        try:
+            stamp = self._file_stamp()
+        except OSError:
+            return []
+        if stamp == self._stamp:
+            return []
+        self._stamp = stamp
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return []  # a corrupt cache is rebuilt from future feeds
+        if not isinstance(stored, dict) or stored.get("version") != _SCHEMA_VERSION:
+            return []
+        ours = self._levels["day"]
+        self._levels = {b: stored.get(b, {}) for b in BUCKETS}
+        daily = self._levels["day"]
+        kept = [k for k in ours if k not in daily]
+        for key in kept:
+            daily[key] = ours[key]
+        return [datetime.date.fromisoformat(k) for k in kept]
+
+    def _file_stamp(self) -> tuple:
+        # os.replace gives every save a new inode, even within one mtime tick
+        st = os.stat(self.path)
+        return st.st_ino, st.st_mtime_ns
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Hold the lock file shared by every worker writing this store."""
+        with contextlib.ExitStack() as stack:
+            try:
+                lock = stack.enter_context(open(f"{self.path}.lock", "a"))
+            except OSError:  # read-only disk: there is nothing to write anyway
+                lock = None
+            if lock is not None and fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _save(self) -> None:
+        payload = {"version": _SCHEMA_VERSION, **self._levels}
+        # unique per writer, so workers saving at once don't share a temp file
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp, self.path)  # atomic, readers never see a partial file
+            self._stamp = self._file_stamp()
+        except OSError:
+            # HAS TO BE PASS so a read-only disk never breaks /api/neos
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def has_day(self, day: datetime.date) -> bool:
+        self._refresh()
+        return day.isoformat() in self._levels["day"]
+
+    def _refresh(self) -> None:
+        """Pick up rollups other workers saved (one stat when nothing changed)."""
+        with self._lock:
+            self._rebuild(self._load())
+
+    def _rebuild(self, days: Iterable[datetime.date]) -> None:
+        """Re-derive the coarser buckets `days` fall into from the day level.
+
+        Min/max can't be "subtracted" when a day is replaced, so each touched
+        bucket is rebuilt from its days (at most 366 of them).
+        """
+        daily = self._levels["day"]
+        for b in BUCKETS[1:]:
+            for start in {bucket_start(d, b) for d in days}:
+                end = next_bucket_start(start, b) - datetime.timedelta(days=1)
+                members = [
+                    daily[d.isoformat()]
+                    for d in _iter_days(start, end)
+                    if d.isoformat() in daily
+                ]
+                self._levels[b][start.isoformat()] = merge(members)
+
+    def missing_days(
+        self, start: datetime.date, end: datetime.date
+    ) -> list[datetime.date]:
+        self._refresh()
+        daily = self._levels["day"]
+        return [d for d in _iter_days(start, end) if d.isoformat() not in daily]
+
+    def ingest_feed(self, feed_json: dict[str, Any]) -> int:
+        """Fold a `/feed` response into the store. Returns the number of days ingested.
+
+        The file is only rewritten when a day's rollup actually changed, so
+        re-fetching a window the store already has costs no disk write.
+        """
+        neos = feed_json.get("near_earth_objects", {}) or {}
+        days = {}
+        for date_str, items in neos.items():
+            try:
+                day = datetime.date.fromisoformat(date_str)
+            except ValueError:
+                continue
+            days[day] = aggregate_day(items or [])
+        if not days:
+            return 0
+
+        with self._lock:
+            daily = self._levels["day"]
+            if all(daily.get(d.isoformat()) == agg for d, agg in days.items()):
+                return len(days)
+            # another worker may have saved days we haven't seen: merge them
+            # in under the lock file, or our rewrite would drop them
+            with self._file_lock():
+                kept = self._load()
+                daily = self._levels["day"]
+                changed = [
+                    d for d, agg in days.items() if daily.get(d.isoformat()) != agg
+                ]
+                for day in changed:
+                    daily[day.isoformat()] = days[day]
+                self._rebuild(kept + changed)
+                if changed:
+                    self._save()
+        return len(days)
+
+    def trend(
+        self, start: datetime.date, end: datetime.date, bucket: str = "month"
+    ) -> list[dict[str, Any]]:
+        """Return one row per bucket overlapping [start, end].
+
+        Rows for buckets that straddle `start` or `end` cover the whole bucket,
+        which keeps the cost at a single lookup per bucket.
+        """
+        if end < start:
+            raise ValueError("'from' must be on or before 'to'")
+        self._refresh()
+        level = self._levels.get(bucket)
+        if level is None:
+            raise ValueError(
+                f"Invalid bucket '{bucket}'. Use one of: {', '.join(BUCKETS)}"
+            )
+        if _bucket_count(start, end, bucket) > MAX_TREND_ROWS[bucket]:
+            raise ValueError(
+                f"Span too long for bucket '{bucket}' "
+                f"(at most {MAX_TREND_ROWS[bucket]} buckets)"
+            )
+
+        rows = []
+        cur = bucket_start(start, bucket)
+        while cur <= end:
+            nxt = next_bucket_start(cur, bucket)
+            agg = level.get(cur.isoformat())
+            row = {
+                "bucket": cur.isoformat(),
+                "start": cur.isoformat(),
+                "end": (nxt - datetime.timedelta(days=1)).isoformat(),
+                "has_data": agg is not None,
+            }
+            row.update(_public(agg or _empty()))
+            rows.append(row)
+            cur = nxt
+        return rows
+
+    def backfill(
+        self,
+        start: datetime.date,
+        end: datetime.date,
+        fetch: Callable[[str, str], dict[str, Any]] | None = None,
+    ) -> int:
+        """Fetch any days missing from the store in 7-day feed windows.
+
+        Returns the number of days ingested.
+        """
+        if fetch is None:
+            import nasa_neos
+
+            fetch = nasa_neos.fetch_feed
+
+        total = 0
+        missing = self.missing_days(start, end)
+        while missing:
+            window_start = missing[0]
+            window_end = min(window_start + datetime.timedelta(days=6), end)
+            feed = fetch(window_start.isoformat(), window_end.isoformat())
+            total += self.ingest_feed(feed)
+            missing = [d for d in missing if d > window_end]
+        return total
+
+
+_store: RollupStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> RollupStore:
+    """Process-wide rollup store, loaded from disk on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RollupStore()
+        return _store
+
+
+if __name__ == "__main__":
+    """
+    Backfill rollups for a date range:  python neo_rollups.py 2020-01-01 2020-12-31
+    """
+    import sys
+
+    if len(sys.argv) != 3:
+        print("usage: python neo_rollups.py START END")
+        sys.exit(1)
+    store = get_store()
+    n = store.backfill(
+        datetime.date.fromisoformat(sys.argv[1]),
+        datetime.date.fromisoformat(sys.argv[2]),
+    )
+    print(f"Ingested {n} day(s) into {store.path}")
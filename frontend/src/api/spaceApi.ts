@@ -13,6 +13,8 @@ export function fetchApod() {
     explanation: string;
     media_type: string;
     url: string;
+    // proxied copies of the image (see backend/apod_media.py); null for videos
+    media?: { thumb: string; medium: string; hd: string } | null;
   }>("/api/apod");
 }
 
@@ -1,5 +1,6 @@
 import { useEffect, useState } from "react";
 import ComponentCard from "../common/ComponentCard";
+import { API_BASE } from "../../api/client";
 import useDashboardData from "../../hooks/useDashboardData";
 
 export default function RemoteData() {
@@ -231,7 +232,17 @@ export default function RemoteData() {
             <div>
               {/* Show image or embed video when available. If APOD returns a YouTube link we convert it to an embed URL so it plays inline. */}
               {data.apod.media_type === "image" && (
-                <img src={data.apod.url} alt={data.apod.title} className="w-full rounded mb-2" />
+                <img
+                  src={data.apod.media ? `${API_BASE}${data.apod.media.medium}` : data.apod.url}
+                  srcSet={
+                    data.apod.media
+                      ? `${API_BASE}${data.apod.media.thumb} 320w, ${API_BASE}${data.apod.media.medium} 1280w`
+                      : undefined
+                  }
+                  sizes="(min-width: 768px) 33vw, 100vw"
+                  alt={data.apod.title}
+                  className="w-full rounded mb-2"
+                />
               )}
 
               {data.apod.media_type === "video" && (
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import ComponentCard from "../../components/common/ComponentCard";
-import { getJSON } from "../../api/client";
+import { API_BASE, getJSON } from "../../api/client";
 
 export default function ApodPage() {
   const [data, setData] = useState<any | null>(null);
@@ -28,7 +28,11 @@ export default function ApodPage() {
           <div>
             {/* Render image or embed video when available. For YouTube links we convert to an embed URL so the video plays inline. */}
             {data.media_type === "image" && (
-              <img src={data.url} alt={data.title} className="w-full rounded mb-3" />
+              <img
+                src={data.media ? `${API_BASE}${data.media.medium}` : data.url}
+                alt={data.title}
+                className="w-full rounded mb-3"
+              />
             )}
 
             {data.media_type === "video" && (
@@ -0,0 +1,113 @@
+import math
+import operator
+import os
+import sys
+import time
+from unittest.mock import patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import compute_executor  # the module moon_phase and app import by bare name
+import moon_phase
+import pytest
+from compute_executor import ComputeExecutor, DeadlineExceeded, ExecutorBusy
+
+
+@pytest.fixture
+def executor():
+    ex = ComputeExecutor(workers=1, max_pending=2)
+    yield ex
+    if ex._pool is not None:
+        ex._pool.shutdown(wait=True, cancel_futures=True)
+
+
+class TestComputeExecutor:
+    """Admission bound, deadlines and error propagation of the pool."""
+
+    def test_runs_tasks_in_order(self, executor):
+        assert executor.map(math.sqrt, [(16,), (9,)]) == [4.0, 3.0]
+        assert executor.run(operator.add, 2, 3) == 5
+
+        info = executor.info()
+        assert info["started"] is True
+        assert info["pending"] == 0
+        assert info["finished"] == 3
+
+    def test_full_queue_fails_fast(self, executor):
+        with pytest.raises(ExecutorBusy, match="queue is full"):
+            executor.map(time.sleep, [(0,)] * 3)
+
+        info = executor.info()
+        assert info["rejected"] == 1
+        assert info["pending"] == 0
+        assert info["started"] is False  # rejected before starting workers
+
+    def test_deadline_exceeded(self, executor):
+        with pytest.raises(DeadlineExceeded, match="0.2s deadline"):
+            executor.run(time.sleep, 1, timeout=0.2)
+        assert executor.info()["timed_out"] == 1
+
+    def test_expired_tasks_are_skipped_by_the_worker(self):
+        with pytest.raises(DeadlineExceeded, match="expired"):
+            compute_executor._run_task(time.time() - 1, math.sqrt, (4,))
+        assert compute_executor._run_task(None, math.sqrt, (4,)) == 2.0
+
+    def test_task_errors_propagate(self, executor):
+        with pytest.raises(ZeroDivisionError):
+            executor.run(operator.truediv, 1, 0)
+        assert executor.info()["pending"] == 0
+
+    def test_inline_mode_skips_the_pool(self, executor, monkeypatch):
+        monkeypatch.setattr(compute_executor, "COMPUTE_INLINE", True)
+        assert executor.run(os.getpid) == os.getpid()
+        assert executor.info()["started"] is False
+
+    def test_error_status_codes(self):
+        assert ExecutorBusy.status == 503
+        assert DeadlineExceeded.status == 504
+
+
+class TestComputeErrorRoutes:
+    """Routes map an overloaded pool to 503 and a missed deadline to 504."""
+
+    @pytest.fixture
+    def client(self):
+        from backend.app import app
+
+        return app.test_client()
+
+    @pytest.mark.parametrize(
+        "error, status",
+        [(ExecutorBusy("busy"), 503), (DeadlineExceeded("slow"), 504)],
+    )
+    def test_routes(self, client, error, status):
+        with patch.object(moon_phase, "calculate_moon_sky_track", side_effect=error):
+            resp = client.get("/api/moon-position?lat=40&lon=-74")
+        assert resp.status_code == status
+        assert resp.get_json() == {"error": str(error)}
+
+        with patch.object(
+            moon_phase, "calculate_moon_rise_set_batch", side_effect=error
+        ):
+            resp = client.post(
+                "/api/moon-phase/rise-set/batch",
+                json={"locations": [{"lat": 0, "lon": 0}]},
+            )
+        assert resp.status_code == status
+
+    @pytest.mark.skipif(not moon_phase.SKYFIELD_AVAILABLE, reason="needs skyfield")
+    def test_single_rise_set_does_not_swallow_compute_errors(self, client):
+        # unlike bad input, overload is not reported inside a 200 payload
+        with patch.object(
+            moon_phase, "calculate_moon_rise_set_range", side_effect=ExecutorBusy("x")
+        ):
+            resp = client.get("/api/moon-phase?lat=40.5&lon=-74.5")
+        assert resp.status_code == 503
+
+    def test_status_route(self, client):
+        info = client.get("/api/compute/status").get_json()
+        assert {"workers", "pending", "max_pending", "rejected", "timed_out"} <= set(
+            info
+        )
@@ -4,10 +4,10 @@ import pytest
 import os
 import sys
 
-
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
+from backend import llspacedevs
 from backend.llspacedevs import AstronautData
 
 
@@ -80,6 +80,7 @@ def test_fetch_raises_on_rate_limit(monkeypatch, tmp_path):
         return MockResponse({}, status_code=429)
 
     monkeypatch.setattr("requests.get", fake_get)
+    monkeypatch.setattr(llspacedevs.astronaut_crawler, "MAX_RETRIES", 0)
     ad = AstronautData(cache_file=str(tmp_path / "astronauts.json"))
     with pytest.raises(Exception) as exc:
         ad._fetch_astronauts()
@@ -134,3 +135,602 @@ def test_empty_dataset_behaviors(tmp_path):
     assert ad.get_top_countries(top_n=5) == []
     # counts on empty data -> empty dict
     assert ad.get_astronaut_count_by_country() == {}
+
+
+# 7) in-memory copy is reused until the cache file changes
+def test_reloads_only_when_cache_file_changes(tmp_path):
+    cache = tmp_path / "astronauts.json"
+    cache.write_text(json.dumps([{"name": "Alice", "nationality": "American"}]))
+    ad = AstronautData(cache_file=str(cache))
+
+    first = ad.get_records()
+    assert ad.get_records() is first  # no re-parse while unchanged
+
+    cache.write_text(
+        json.dumps(
+            [
+                {"name": "Alice", "nationality": "American"},
+                {"name": "Bob", "nationality": "Canadian"},
+            ]
+        )
+    )
+    assert [a["name"] for a in ad.get_astronauts()] == ["Alice", "Bob"]
+
+
+# 8) TTL forces a re-read even if the file looks the same
+def test_ttl_expiry_reloads(tmp_path, monkeypatch):
+    cache = tmp_path / "astronauts.json"
+    cache.write_text(json.dumps([{"name": "Alice"}]))
+    ad = AstronautData(cache_file=str(cache), ttl=60)
+    first = ad.get_records()
+
+    now = llspacedevs.time.monotonic()
+    monkeypatch.setattr(llspacedevs.time, "monotonic", lambda: now + 61)
+    assert ad.get_records() is not first
+
+
+# 9) shared dataset is a single instance
+def test_get_dataset_is_shared(monkeypatch):
+    monkeypatch.setattr(llspacedevs, "_dataset", None)
+    assert llspacedevs.get_dataset() is llspacedevs.get_dataset()
+
+
+# 10) country breakdown matches get_astronauts_by_country in one pass
+def test_country_breakdown(tmp_path):
+    data = [
+        {"name": "Alice", "nationality": "American", "status": {"name": "Active"}},
+        {"name": "Bob", "nationality": "American", "status": {"name": "Retired"}},
+        {"name": "Carlos", "nationality": "Spanish", "status": {"name": "Active"}},
+        {"name": "Dana", "nationality": "American", "status": None},
+    ]
+    cache = tmp_path / "astronauts.json"
+    cache.write_text(json.dumps(data))
+    ad = AstronautData(cache_file=str(cache))
+
+    breakdown = ad.get_country_breakdown("american")
+    assert breakdown["count"] == len(ad.get_astronauts_by_country("american"))
+    assert breakdown["active"] == ["Alice"]
+    assert breakdown["inactive"] == ["Bob", "Dana"]
+
+
+# 11) index matches multi-nationality strings and intersects postings
+def test_index_postings_and_intersection(tmp_path):
+    data = [
+        {
+            "name": "Alice",
+            "nationality": "American/Russian",
+            "status": {"name": "Active"},
+            "agency": {"abbrev": "NASA", "name": "National Aeronautics"},
+        },
+        {
+            "name": "Boris",
+            "nationality": "Russian",
+            "status": {"name": "Retired"},
+            "agency": {"abbrev": "RFSA", "name": "Roscosmos"},
+        },
+        {"name": "Carla", "nationality": "Puerto Rican", "status": {"name": "Active"}},
+    ]
+    cache = tmp_path / "astronauts.json"
+    cache.write_text(json.dumps(data))
+    ad = AstronautData(cache_file=str(cache))
+    index = ad.get_index()
+
+    assert ad.get_astronauts_by_country("russ") == ["Alice", "Boris"]
+    assert ad.get_astronauts_by_country("can/rus") == ["Alice"]
+    assert ad.get_astronauts_by_country("puerto rican") == ["Carla"]
+
+    russian_active = index.intersect(index.country("russian"), index.status("ACTIVE"))
+    assert index.names(russian_active) == ["Alice"]
+    assert index.names(index.agency("nasa")) == index.names(
+        index.agency("National Aeronautics")
+    )
+    assert index.status("unknown") == frozenset()
+    assert ad.get_astronaut_count_by_country() == {
+        "American/Russian": 1,
+        "Russian": 1,
+        "Puerto Rican": 1,
+    }
+
+
+def _search_fixture(tmp_path):
+    data = [
+        {
+            "id": 1,
+            "name": "Alice",
+            "nationality": "American",
+            "status": {"name": "Active"},
+            "type": {"name": "Government"},
+            "agency": {"abbrev": "NASA"},
+            "in_space": True,
+            "age": 45,
+            "date_of_birth": "1980-05-01",
+            "time_in_space": "P100DT1H",
+            "eva_time": "PT10H",
+        },
+        {
+            "id": 2,
+            "name": "bob",
+            "nationality": "American",
+            "status": {"name": "Retired"},
+            "type": {"name": "Government"},
+            "agency": {"abbrev": "NASA"},
+            "in_space": False,
+            "age": 70,
+            "date_of_birth": "1955-01-01",
+            "time_in_space": "P200D",
+            "eva_time": None,
+        },
+        {
+            "id": 3,
+            "name": "Chen",
+            "nationality": "Chinese",
+            "status": {"name": "Active"},
+            "type": {"name": "Government"},
+            "agency": {"abbrev": "CNSA"},
+            "in_space": False,
+            "age": None,
+            "date_of_birth": None,
+            "time_in_space": "PT30M",
+            "eva_time": "PT1H",
+        },
+    ]
+    cache = tmp_path / "astronauts.json"
+    cache.write_text(json.dumps(data))
+    return AstronautData(cache_file=str(cache))
+
+
+# 12) search filters combine with AND and project fields
+def test_search_filters_and_projection(tmp_path):
+    ad = _search_fixture(tmp_path)
+
+    page = ad.search_astronauts(country="american", status="active")
+    assert page["count"] == 1
+    assert page["results"] == [
+        {
+            "id": 1,
+            "name": "Alice",
+            "nationality": "American",
+            "status": "Active",
+            "agency": "NASA",
+        }
+    ]
+    assert ad.search_astronauts(in_space=False, agency="nasa")["count"] == 1
+    assert ad.search_astronauts(min_age=40, max_age=50)["count"] == 1
+    assert ad.search_astronauts(born_before="1979-12-31")["count"] == 1
+    assert ad.search_astronauts(status="all")["count"] == 3
+    assert ad.search_astronauts(fields=["name", "time_in_space"])["results"][0] == {
+        "name": "Alice",
+        "time_in_space": "P100DT1H",
+    }
+
+
+# 13) sorting uses parsed durations and cursors walk every page once
+def test_search_sort_and_cursor_pagination(tmp_path):
+    ad = _search_fixture(tmp_path)
+
+    page = ad.search_astronauts(sort="time_in_space", order="desc", limit=2)
+    assert [r["id"] for r in page["results"]] == [2, 1]
+    nxt = ad.search_astronauts(
+        sort="time_in_space", order="desc", limit=2, cursor=page["next_cursor"]
+    )
+    assert [r["id"] for r in nxt["results"]] == [3]
+    assert nxt["next_cursor"] is None
+
+    # missing eva_time sorts last in both directions
+    asc = ad.search_astronauts(sort="eva_time")["results"]
+    assert [r["id"] for r in asc] == [3, 1, 2]
+    # names sort case-insensitively
+    names = ad.search_astronauts(sort="name")["results"]
+    assert [r["name"] for r in names] == ["Alice", "bob", "Chen"]
+
+
+# 14) bad arguments raise ValueError (the route maps these to 400)
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"status": "orbiting"},
+        {"type": "robot"},
+        {"sort": "age"},
+        {"order": "sideways"},
+        {"limit": 0},
+        {"fields": ["password"]},
+        {"cursor": "not-a-cursor"},
+        {"born_after": "yesterday"},
+    ],
+)
+def test_search_rejects_bad_arguments(tmp_path, kwargs):
+    ad = _search_fixture(tmp_path)
+    with pytest.raises(ValueError):
+        ad.search_astronauts(**kwargs)
+
+
+# 15) ISO 8601 durations parse to seconds
+def test_parse_duration():
+    from backend.astronaut_index import parse_duration
+
+    assert parse_duration("P1DT2H3M4S") == 86400 + 7200 + 180 + 4
+    assert parse_duration("PT8H10M") == 8 * 3600 + 600
+    assert parse_duration("P9D") == 9 * 86400
+    assert parse_duration(None) is None
+    assert parse_duration("garbage") is None
+
+
+# 16) hot fields live in slotted records, heavy ones in the details store
+def test_records_and_lazy_details(tmp_path):
+    data = [
+        {
+            "id": 7,
+            "name": "Alice",
+            "nationality": "American",
+            "status": {"name": "Active"},
+            "agency": {"abbrev": "NASA", "name": "National Aeronautics"},
+            "bio": "A very long biography...",
+            "wiki": "https://example.org/alice",
+        }
+    ]
+    cache = tmp_path / "astronauts.json"
+    cache.write_text(json.dumps(data))
+    ad = AstronautData(cache_file=str(cache))
+
+    (record,) = ad.get_records()
+    assert not hasattr(record, "__dict__")
+    assert (record.name, record.status, record.agency) == ("Alice", "Active", "NASA")
+    assert not hasattr(record, "bio")
+
+    assert ad.get_details(7)["bio"] == "A very long biography..."
+    assert ad.get_details(999) is None
+    page = ad.search_astronauts(fields=["name", "wiki"])
+    assert page["results"] == [{"name": "Alice", "wiki": "https://example.org/alice"}]
+    # the legacy full view still round-trips the cache file
+    assert ad.get_astronauts() == data
+
+
+def _offset_pages(n, page_size=2):
+    people = [{"id": i, "name": f"P{i}"} for i in range(n)]
+    base = "https://example.test/astronaut/"
+    pages = {}
+    for offset in range(0, n, page_size):
+        url = f"{base}?limit={page_size}"
+        if offset:
+            url += f"&offset={offset}"
+        pages[url] = {"count": n, "results": people[offset : offset + page_size]}
+    return base, pages, people
+
+
+# 17) offset crawl fetches pages concurrently and retries 429s
+def test_crawler_offset_pages_and_retry_after(tmp_path, monkeypatch):
+    base, pages, people = _offset_pages(7)
+    calls = []
+
+    def fake_get(url, *args, **kwargs):
+        calls.append(url)
+        assert kwargs.get("timeout")
+        if calls.count(url) == 1 and "offset=4" in url:
+            response = MockResponse({}, status_code=429)
+            response.headers = {"Retry-After": "0"}
+            return response
+        return MockResponse(pages[url], 200)
+
+    monkeypatch.setattr("requests.get", fake_get)
+    crawler = llspacedevs.astronaut_crawler.AstronautCrawler(
+        base, checkpoint_dir=str(tmp_path / "crawl"), page_size=2, rate_per_min=0
+    )
+    assert crawler.crawl() == people
+    assert len(calls) == len(pages) + 1
+
+
+# 18) a failed crawl keeps its finished pages and resumes from them
+def test_crawler_resumes_from_checkpoints(tmp_path, monkeypatch):
+    base, pages, people = _offset_pages(6)
+    failing = {"on": True}
+    calls = []
+
+    def fake_get(url, *args, **kwargs):
+        calls.append(url)
+        if failing["on"] and "offset=2" in url:
+            return MockResponse({}, status_code=429)
+        return MockResponse(pages[url], 200)
+
+    monkeypatch.setattr("requests.get", fake_get)
+    monkeypatch.setattr(llspacedevs.astronaut_crawler, "MAX_RETRIES", 0)
+    crawler = llspacedevs.astronaut_crawler.AstronautCrawler(
+        base, checkpoint_dir=str(tmp_path / "crawl"), page_size=2, rate_per_min=0
+    )
+    with pytest.raises(llspacedevs.astronaut_crawler.CrawlError):
+        crawler.crawl()
+
+    failing["on"] = False
+    calls.clear()
+    assert crawler.crawl() == people
+    assert calls == [f"{base}?limit=2&offset=2"]
+
+
+# 19) delta sync asks for recent changes and merges them by id
+def test_sync_merges_changed_records_by_id(tmp_path, monkeypatch):
+    data = [
+        {
+            "id": 1,
+            "name": "Alice",
+            "nationality": "American",
+            "flights_count": 1,
+            "last_flight": "2020-05-30T19:22:00Z",
+            "bio": "old",
+        },
+        {
+            "id": 2,
+            "name": "Boris",
+            "nationality": "Russian",
+            "flights_count": 2,
+            "last_flight": "2019-01-01T00:00:00Z",
+        },
+    ]
+    cache = tmp_path / "astronauts.json"
+    cache.write_text(json.dumps(data))
+    changed = [
+        {
+            "id": 1,
+            "name": "Alice",
+            "nationality": "American",
+            "flights_count": 2,
+            "last_flight": "2024-01-01T00:00:00Z",
+            "bio": "new",
+        },
+        {"id": 3, "name": "Chen", "nationality": "Chinese", "in_space": True},
+    ]
+    urls = []
+
+    def fake_get(url, *args, **kwargs):
+        urls.append(url)
+        if "in_space=true" in url:
+            return MockResponse({"results": [changed[1]], "next": None})
+        return MockResponse({"results": [changed[0]], "next": None})
+
+    monkeypatch.setattr("requests.get", fake_get)
+    ad = AstronautData(cache_file=str(cache))
+    before = ad.get_records()
+
+    assert ad.sync() == 2
+    # no sync state yet: watermark is the newest last_flight minus the overlap
+    assert "last_flight__gte=2020-05-23T19%3A22%3A00Z" in urls[0]
+    assert "ordering=-last_flight" in urls[0]
+
+    records = ad.get_records()
+    assert [r.id for r in records] == [1, 2, 3]
+    assert records[1] is before[1]  # unchanged records are shared
+    assert records[0].flights_count == 2
+    assert ad.get_details(1)["bio"] == "new"
+    assert ad.get_astronauts_by_country("chinese") == ["Chen"]
+    # the cache file holds the merged data and is not re-parsed
+    assert json.loads(cache.read_text()) == ad.get_astronauts()
+    assert ad.get_records() is records
+
+    # the next sync starts from the recorded sync time
+    urls.clear()
+    ad.sync()
+    assert "last_flight__gte=2020" not in urls[0]
+
+    # payloads aren't kept in memory, and the details file doesn't grow
+    assert not hasattr(ad._get_snapshot(), "_full")
+    details = tmp_path / "astronauts.details.jsonl"
+    size = details.stat().st_size
+    ad.sync()
+    assert details.stat().st_size == size
+    assert len(details.read_text().splitlines()) == 3
+    # streamed writes keep the json.dump(indent=2) layout
+    assert cache.read_text() == json.dumps(ad.get_astronauts(), indent=2)
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+
+# 20) full-text search ranks names above bios, matches prefixes and persists
+def test_fulltext_search_ranking_prefix_and_persistence(tmp_path, monkeypatch):
+    data = [
+        {
+            "id": 1,
+            "name": "Harrison Schmitt",
+            "bio": "A geologist who walked on the Moon.",
+        },
+        {"id": 2, "name": "Jessica Watkins", "bio": "Planetary geology researcher."},
+        {"id": 3, "name": "Yuri Geologov", "bio": "Soyuz commander."},
+        {"id": 4, "name": "Pilot", "bio": None},
+    ]
+    cache = tmp_path / "astronauts.json"
+    cache.write_text(json.dumps(data))
+    ad = AstronautData(cache_file=str(cache))
+
+    page = ad.fulltext_search("geologist", fields=["id"])
+    assert [r["id"] for r in page["results"]] == [1]
+    page = ad.fulltext_search("geolog", fields=["id"])
+    assert page["count"] == 3
+    assert page["results"][0]["id"] == 3  # name matches weigh more than bios
+    assert ad.fulltext_search("soyuz commander")["results"][0]["name"] == (
+        "Yuri Geologov"
+    )
+    top = ad.fulltext_search("geolog* moon", limit=1, fields=["id"])["results"]
+    assert top[0]["id"] == 1
+    assert ad.fulltext_search("nonexistent")["results"] == []
+
+    # a new process loads the saved index instead of re-tokenizing
+    assert os.path.exists(ad.fulltext_file)
+    monkeypatch.setattr(
+        llspacedevs.FullTextIndex,
+        "build",
+        classmethod(lambda cls, docs: pytest.fail("index was rebuilt")),
+    )
+    again = AstronautData(cache_file=str(cache))
+    assert again.fulltext_search("geolog") == ad.fulltext_search("geolog")
+
+    for kwargs in (
+        {"q": " "},
+        {"q": "moon", "limit": 0},
+        {"q": "moon", "fields": ["x"]},
+    ):
+        with pytest.raises(ValueError):
+            ad.fulltext_search(**kwargs)
+
+
+# 21) leaderboards and aggregates are materialized from parsed durations
+def test_leaderboards_and_aggregates(tmp_path):
+    ad = _search_fixture(tmp_path)
+    data = json.loads((tmp_path / "astronauts.json").read_text())
+    data.append(
+        {
+            "id": 4,
+            "name": "Starman",
+            "nationality": "Earthling",
+            "age": 5,
+            "type": {"name": "Non-Human"},
+            "time_in_space": "P2000D",
+        }
+    )
+    (tmp_path / "astronauts.json").write_text(json.dumps(data))
+
+    board = ad.get_leaderboard("time_in_space", limit=2)
+    assert [(e["rank"], e["id"]) for e in board] == [(1, 2), (2, 1)]
+    assert board[0]["value"] == 200 * 86400 and board[0]["display"] == "200d 0h 0m"
+    assert [e["id"] for e in ad.get_leaderboard("eva_time")] == [1, 3]
+
+    stats = ad.get_stats()
+    american, chinese = stats.countries("total_time_in_space_s")
+    assert american["country"] == "American" and american["count"] == 2
+    assert american["total_time_in_space_s"] == 300 * 86400 + 3600
+    assert american["median_time_in_space_s"] == (300 * 86400 + 3600) / 2
+    assert american["median_eva_time_s"] == 10 * 3600
+    assert chinese["total_time_in_space_s"] == 1800
+    assert stats.countries("count", limit=1) == [american]
+
+    ages = stats.ages()
+    assert ages["all"]["count"] == 2
+    assert ages["all"]["buckets"] == {"40-49": 1, "70-79": 1}
+    assert ages["by_status"]["Retired"]["median"] == 70
+
+    with pytest.raises(ValueError):
+        ad.get_leaderboard("age")
+    with pytest.raises(ValueError):
+        stats.countries("name")
+    assert ad.get_country_stats("count", 1) == [american]
+    for limit in (0, -1, llspacedevs.MAX_SEARCH_LIMIT + 1):
+        with pytest.raises(ValueError, match="limit must be between"):
+            ad.get_country_stats("count", limit)
+
+
+# 22) binary cache is seeded from JSON, loads without it and exports back
+def test_binary_cache_roundtrip(tmp_path):
+    from backend import astronaut_store
+
+    data = [
+        {
+            "id": 1,
+            "name": "Alice",
+            "nationality": "American",
+            "in_space": True,
+            "status": {"name": "Active"},
+            "time_in_space": "P1D",
+            "bio": "Long bio",
+        },
+        {"id": 2, "name": "Boris", "nationality": "Russian", "in_space": False},
+    ]
+    (tmp_path / "astronauts.json").write_text(json.dumps(data))
+    db = tmp_path / "astronauts.db"
+
+    ad = AstronautData(cache_file=str(db))
+    assert ad.get_astronauts() == data
+    assert db.exists()
+
+    (tmp_path / "astronauts.json").unlink()
+    fresh = AstronautData(cache_file=str(db))
+    alice = fresh.get_records()[0]
+    assert (alice.name, alice.in_space, alice.status) == ("Alice", True, "Active")
+    assert fresh.get_details(1)["bio"] == "Long bio"
+    assert list(fresh._get_snapshot().details.iter_all()) == data
+    assert fresh.search_astronauts(sort="time_in_space")["results"][0]["id"] == 1
+
+    out = tmp_path / "export.json"
+    assert astronaut_store.export_json(str(db), str(out)) == 2
+    assert json.loads(out.read_text()) == data
+
+    # a cache from another schema version is rebuilt from the JSON cache
+    (tmp_path / "astronauts.json").write_text(json.dumps(data[:1]))
+    db.write_bytes(b"not a database")
+    assert len(AstronautData(cache_file=str(db)).get_records()) == 1
+
+
+# 23) status/bio edits need a full crawl, so sync runs one once a week
+def test_sync_does_a_periodic_full_crawl(tmp_path, monkeypatch):
+    cache = tmp_path / "astronauts.json"
+    cache.write_text(json.dumps([{"id": 1, "name": "Alice"}]))
+    ad = AstronautData(cache_file=str(cache))
+    full = []
+    monkeypatch.setattr(ad, "refresh", lambda: full.append(1) or 1)
+    monkeypatch.setattr(
+        "requests.get", lambda url, *a, **k: MockResponse({"results": []})
+    )
+    now = llspacedevs.time.time()
+
+    ad._write_sync_state(
+        llspacedevs.datetime.fromtimestamp(now, llspacedevs.UTC), full=True
+    )
+    assert ad.sync() == 0
+    assert full == []
+
+    later = now + llspacedevs.FULL_SYNC_INTERVAL_S + 1
+    monkeypatch.setattr(llspacedevs.time, "time", lambda: later)
+    ad.sync()
+    assert full == [1]
+
+
+# 24) the country stats route rejects bad limits with a 400
+@pytest.mark.parametrize("limit", ["-1", "0", "201", "abc", "1.5", ""])
+def test_country_stats_route_validates_limit(tmp_path, monkeypatch, limit):
+    import llspacedevs as app_llspacedevs  # the copy app.py uses
+
+    from backend.app import app
+
+    ad = _search_fixture(tmp_path)
+    monkeypatch.setattr(app_llspacedevs, "get_dataset", lambda: ad)
+    client = app.test_client()
+
+    resp = client.get(f"/api/llspacedevs/stats/countries?limit={limit}")
+    assert resp.status_code == 400
+    assert len(client.get("/api/llspacedevs/stats/countries?limit=1").json) == 1
+
+
+# 25) a binary cache is seeded from the JSON cache, not crawled, on first sync
+def test_sync_seeds_binary_cache_from_json(tmp_path, monkeypatch):
+    data = [
+        {"id": 1, "name": "Alice", "last_flight": "2020-05-30T19:22:00Z"},
+        {"id": 2, "name": "Boris", "last_flight": "2019-01-01T00:00:00Z"},
+    ]
+    (tmp_path / "astronauts.json").write_text(json.dumps(data))
+    urls = []
+
+    def fake_get(url, *args, **kwargs):
+        urls.append(url)
+        assert "last_flight__gte" in url or "in_space=true" in url, "full crawl"
+        return MockResponse({"results": [], "next": None})
+
+    monkeypatch.setattr("requests.get", fake_get)
+    ad = AstronautData(cache_file=str(tmp_path / "astronauts.db"))
+
+    assert ad.sync() == 0
+    assert (tmp_path / "astronauts.db").exists()
+    assert [r.name for r in ad.get_records()] == ["Alice", "Boris"]
+    assert len(urls) == 2
+
+
+# 26) concurrent writers of the binary cache use their own temp files
+def test_binary_cache_temp_file_is_per_writer(tmp_path, monkeypatch):
+    from backend import astronaut_store
+
+    opened = []
+    connect = astronaut_store.sqlite3.connect
+    monkeypatch.setattr(
+        astronaut_store.sqlite3,
+        "connect",
+        lambda path, *a, **k: opened.append(path) or connect(path, *a, **k),
+    )
+    db = tmp_path / "astronauts.db"
+    astronaut_store.write(str(db), [{"id": 1, "name": "Alice"}])
+
+    assert str(os.getpid()) in opened[0] and opened[0] != f"{db}.tmp"
+    assert os.listdir(tmp_path) == ["astronauts.db"]
+    assert [r.name for r in astronaut_store.read_records(str(db))] == ["Alice"]
@@ -1,6 +1,6 @@
 import os
 import sys
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import patch, MagicMock
 
 # Add the project root to the Python path
@@ -21,6 +21,26 @@ from backend.moon_phase import (
     _NEW_MOON_EPOCH_JD,
     SKYFIELD_AVAILABLE,
 )
+from backend import moon_phase, moon_phase_table
+
+
+@pytest.fixture(autouse=True)
+def isolated_skyfield_state(monkeypatch):
+    """Drop the shared skyfield objects and rise/set results per test.
+
+    The ephemeris, timescale, per-location objects and rise/set results are
+    cached process-wide, so without this a mock patched into one test would
+    leak into the next. Compute runs inline so patches reach it.
+    """
+    monkeypatch.setattr(moon_phase.compute_executor, "COMPUTE_INLINE", True)
+    for name in ("_ephemeris", "_full_ephemeris", "_timescale", "_moon"):
+        monkeypatch.setattr(moon_phase, name, None)
+    moon_phase._rise_set_cache.clear()
+    yield
+    moon_phase._get_topos.cache_clear()
+    moon_phase._get_observer.cache_clear()
+    moon_phase._rise_set_function.cache_clear()
+    moon_phase._rise_set_cache.clear()
 
 
 class TestMoonPhaseCalculations:
@@ -161,10 +181,10 @@ class TestMoonPhaseWithLocation:
 class TestMoonRiseSetCalculations:
     """Test moon rise/set calculations (requires Skyfield)."""
 
-    @patch("backend.moon_phase.load")
-    def test_calculate_moon_rise_set_success(self, mock_load):
+    def test_calculate_moon_rise_set_success(self):
         """Test successful moon rise/set calculation."""
         # Mock Skyfield objects
+        mock_load = MagicMock()
         mock_eph = MagicMock()
         mock_moon = MagicMock()
         mock_eph.__getitem__.return_value = mock_moon
@@ -172,13 +192,13 @@ class TestMoonRiseSetCalculations:
         mock_ts = MagicMock()
         mock_times = MagicMock()
         mock_events = MagicMock()
+        mock_find_discrete = MagicMock(return_value=(mock_times, mock_events))
+        mock_risings = MagicMock()
 
-        # Mock the find_discrete function
         with patch(
-            "backend.moon_phase.find_discrete", return_value=(mock_times, mock_events)
-        ) as mock_find_discrete, patch(
-            "backend.moon_phase.risings_and_settings"
-        ) as mock_risings:
+            "backend.moon_phase._skyfield",
+            return_value=(mock_load, mock_find_discrete, mock_risings),
+        ):
 
             # Setup mock times and events
             mock_time1 = MagicMock()
@@ -205,6 +225,7 @@ class TestMoonRiseSetCalculations:
             assert "location" in result
             assert result["location"]["lat"] == 40.0
             assert result["location"]["lon"] == -74.0
+            mock_find_discrete.assert_called_once()
 
     def test_calculate_moon_rise_set_no_skyfield(self):
         """Test moon rise/set calculation when Skyfield is not available."""
@@ -216,10 +237,11 @@ class TestMoonRiseSetCalculations:
             assert "error" in result
             assert "Skyfield library not available" in result["error"]
 
-    @patch("backend.moon_phase.load")
-    def test_calculate_moon_rise_set_exception(self, mock_load):
+    @patch("backend.moon_phase._skyfield")
+    def test_calculate_moon_rise_set_exception(self, mock_skyfield):
         """Test moon rise/set calculation when an exception occurs."""
-        mock_load.side_effect = Exception("Test error")
+        mock_load = MagicMock(side_effect=Exception("Test error"))
+        mock_skyfield.return_value = (mock_load, MagicMock(), MagicMock())
 
         dt = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
         result = calculate_moon_rise_set(dt, 40.0, -74.0)
@@ -295,3 +317,425 @@ class TestMoonPhaseEdgeCases:
             prev_date = datetime.fromisoformat(result[i - 1]["date"])
             curr_date = datetime.fromisoformat(result[i]["date"])
             assert (curr_date - prev_date).days == 1
+
+
+class TestVectorizedMoonPhases:
+    """The NumPy engine behind ranges must agree with the scalar formula."""
+
+    def test_matches_scalar_over_years_of_days(self):
+        start = datetime(2020, 1, 1)
+        columns = moon_phase.moon_phase_series(start, 3 * 366)
+        rows = moon_phase._columns_to_rows(columns)
+
+        for i, row in enumerate(rows):
+            assert row == calculate_moon_phase(start + timedelta(days=i))
+
+    def test_matches_scalar_at_hourly_instants(self):
+        start = datetime(2023, 1, 20, 6)
+        rows = get_moon_phase_range(start.isoformat(), 3, resolution="hourly")
+
+        assert len(rows) == 72
+        for i, row in enumerate(rows):
+            assert row == calculate_moon_phase(start + timedelta(hours=i))
+
+    def test_columnar_output_matches_rows(self):
+        columns = get_moon_phase_range("2023-01-01", 5, columnar=True)
+        rows = get_moon_phase_range("2023-01-01", 5)
+
+        assert set(columns) == set(rows[0])
+        assert all(len(values) == 5 for values in columns.values())
+        assert [dict(zip(columns, v)) for v in zip(*columns.values())] == rows
+
+    def test_rejects_bad_resolution_and_oversized_ranges(self):
+        with pytest.raises(ValueError, match="resolution"):
+            get_moon_phase_range("2023-01-01", 2, resolution="minutely")
+        too_many = moon_phase.MAX_SERIES_POINTS // 24 + 1
+        with pytest.raises(ValueError, match="Range too large"):
+            get_moon_phase_range("2023-01-01", too_many, resolution="hourly")
+        assert get_moon_phase_range("2023-01-01", 0) == []
+
+    def test_range_route_maps_value_errors_to_400(self):
+        from backend.app import app
+
+        client = app.test_client()
+        ok = client.get("/api/moon-phase/range?start=2023-01-01&days=2&format=columns")
+        assert ok.status_code == 200
+        assert len(ok.get_json()["phase"]) == 2
+        for query in (
+            "start=2023-13-01",
+            "start=2023-01-01&resolution=minutely",
+            "start=2023-01-01&days=100000&resolution=hourly",
+        ):
+            resp = client.get(f"/api/moon-phase/range?{query}")
+            assert resp.status_code == 400
+            assert "error" in resp.get_json()
+
+
+class FakeTime:
+    def __init__(self, iso):
+        self._dt = datetime.fromisoformat(iso)
+
+    def utc_datetime(self):
+        return self._dt
+
+
+@pytest.mark.skipif(not SKYFIELD_AVAILABLE, reason="skyfield not installed")
+class TestMoonRiseSetRange:
+    """One search over the window, events bucketed by local day."""
+
+    def run(self, events, days=3, tz="America/New_York"):
+        times = [FakeTime(iso) for iso, _ in events]
+        kinds = [kind for _, kind in events]
+        ts = MagicMock()
+        search = MagicMock(return_value=(times, kinds))
+        with patch("backend.moon_phase._get_timescale", return_value=ts), patch(
+            "backend.moon_phase._rise_set_function", return_value="f"
+        ), patch("backend.moon_phase._needs_full_ephemeris", return_value=False), patch(
+            "backend.moon_phase._skyfield", return_value=(None, search, None)
+        ):
+            result = moon_phase.calculate_moon_rise_set_range(
+                datetime(2024, 3, 1), days, 40.0, -74.0, tz=tz
+            )
+        return result, ts, search
+
+    def test_events_bucket_by_local_day(self):
+        result, ts, search = self.run(
+            [
+                ("2024-03-01T12:00:00+00:00", 1),  # 07:00 EST, Mar 1
+                ("2024-03-02T03:00:00+00:00", 0),  # 22:00 EST, still Mar 1
+                ("2024-03-02T13:00:00+00:00", 1),  # Mar 2
+                ("2024-03-04T06:00:00+00:00", 0),  # past the window
+            ]
+        )
+
+        assert search.call_count == 1
+        window = [c.args[0] for c in ts.from_datetime.call_args_list]
+        assert window[0].isoformat() == "2024-03-01T00:00:00-05:00"
+        assert window[1].isoformat() == "2024-03-04T00:00:00-05:00"
+        assert result == [
+            {
+                "date": "2024-03-01",
+                "rise": "2024-03-01T07:00:00-05:00",
+                "set": "2024-03-01T22:00:00-05:00",
+            },
+            {"date": "2024-03-02", "rise": "2024-03-02T08:00:00-05:00", "set": None},
+            {"date": "2024-03-03", "rise": None, "set": None},
+        ]
+
+    def test_defaults_to_utc_days(self):
+        result, _, _ = self.run([("2024-03-02T03:00:00+00:00", 0)], days=2, tz=None)
+        assert result[1] == {
+            "date": "2024-03-02",
+            "rise": None,
+            "set": "2024-03-02T03:00:00+00:00",
+        }
+
+    def test_rejects_bad_zone_and_long_windows(self):
+        with pytest.raises(ValueError, match="time zone"):
+            self.run([], tz="Mars/Olympus_Mons")
+        with pytest.raises(ValueError, match="limited"):
+            self.run([], days=moon_phase.MAX_RISE_SET_DAYS + 1)
+        assert self.run([], days=0)[0] == []
+
+    def test_rejects_dates_outside_supported_span(self):
+        with pytest.raises(ValueError, match="supported from 1900-01-01"):
+            moon_phase.calculate_moon_rise_set_range(datetime(1899, 12, 31), 1, 0, 0)
+        with pytest.raises(ValueError, match="to 2052-12-31"):
+            moon_phase.calculate_moon_rise_set_range(datetime(2052, 12, 30), 3, 0, 0)
+        result = moon_phase.calculate_moon_rise_set(datetime(1850, 6, 1), 40.0, -74.0)
+        assert "supported from" in result["error"]
+
+        from backend.app import app
+
+        client = app.test_client()
+        resp = client.get("/api/moon-phase/range?start=1850-01-01&lat=0&lon=0")
+        assert resp.status_code == 400
+        resp = client.post(
+            "/api/moon-phase/rise-set/batch",
+            json={"locations": [{"lat": 0, "lon": 0}], "start": "2060-01-01"},
+        )
+        assert resp.status_code == 400
+        assert "supported from" in resp.get_json()["error"]
+
+
+@pytest.mark.skipif(not SKYFIELD_AVAILABLE, reason="skyfield not installed")
+class TestEphemerisSpan:
+    """The bundled excerpt serves its span; other dates use the full DE421."""
+
+    def test_bundled_excerpt_covers_its_span_only(self):
+        if not os.path.exists(moon_phase.EPHEMERIS_PATH):
+            pytest.skip("bundled ephemeris not built")
+        needs_full = moon_phase._needs_full_ephemeris
+        assert not needs_full(date(2000, 1, 2), date(2050, 12, 30))
+        assert needs_full(date(1999, 12, 31), date(2000, 1, 5))
+        assert needs_full(date(2050, 12, 31), date(2051, 1, 2))
+        assert needs_full(date(1950, 1, 1), date(1950, 1, 1))
+
+    def test_outside_excerpt_loads_full_file(self, tmp_path):
+        excerpt_path = tmp_path / "excerpt.bsp"
+        excerpt_path.write_bytes(b"")
+        excerpt, full = MagicMock(), MagicMock()
+        excerpt.segments = [
+            MagicMock(spk_segment=MagicMock(start_jd=2451544.5, end_jd=2470172.5))
+        ]
+        load = MagicMock(
+            side_effect=lambda name: full if name == "de421.bsp" else excerpt
+        )
+        risings = MagicMock()
+        search = MagicMock(return_value=([], []))
+        with patch(
+            "backend.moon_phase._skyfield", return_value=(load, search, risings)
+        ), patch.object(moon_phase, "EPHEMERIS_PATH", str(excerpt_path)):
+            moon_phase.calculate_moon_rise_set_range(datetime(2024, 1, 1), 1, 0, 0)
+            assert risings.call_args.args[0] is excerpt
+            moon_phase.calculate_moon_rise_set_range(datetime(1950, 1, 1), 1, 0, 0)
+            assert risings.call_args.args[0] is full
+
+        assert [c.args[0] for c in load.call_args_list] == [
+            str(excerpt_path),
+            "de421.bsp",
+        ]
+
+
+class TestMoonPhaseTable:
+    """Binary-search lookups in the precomputed true phase table."""
+
+    def test_next_and_previous_events(self):
+        dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        name, when = moon_phase_table.next_phase_event(dt)
+        assert name == "Last Quarter"
+        assert (
+            abs(when - datetime(2024, 1, 4, 3, 30, tzinfo=timezone.utc)).seconds < 120
+        )
+        name, when = moon_phase_table.previous_phase_event(dt)
+        assert name == "Full Moon"
+        assert (
+            abs(when - datetime(2023, 12, 27, 0, 33, tzinfo=timezone.utc)).seconds < 120
+        )
+
+        # an event instant is "previous" to itself and "next" skips it
+        assert moon_phase_table.previous_phase_event(when) == ("Full Moon", when)
+        assert moon_phase_table.next_phase_event(when)[0] == "Last Quarter"
+
+    def test_true_phase_is_exact_at_events(self):
+        _, full = moon_phase_table.previous_phase_event(datetime(2024, 1, 1))
+        _, last_quarter = moon_phase_table.next_phase_event(datetime(2024, 1, 1))
+        phase, _, next_code, days = moon_phase_table.true_phase(
+            [full.timestamp(), last_quarter.timestamp()]
+        )
+        assert phase.tolist() == pytest.approx([0.5, 0.75])
+        assert [moon_phase_table.PHASE_NAMES[c] for c in next_code] == [
+            "Last Quarter",
+            "New Moon",
+        ]
+        assert days[0] == pytest.approx((last_quarter - full).total_seconds() / 86400)
+
+    def test_scalar_uses_table_inside_its_span(self):
+        _, full = moon_phase_table.previous_phase_event(datetime(2024, 1, 1))
+        result = calculate_moon_phase(full)
+        assert result["phase"] == "Full Moon"
+        assert result["illumination"] == 100.0
+        assert result["next_phase"] == "Last Quarter"
+
+    def test_falls_back_to_mean_month_outside_span(self):
+        assert moon_phase_table.covers(datetime(2024, 1, 1).timestamp())
+        for dt in (datetime(1850, 6, 1), datetime(2080, 6, 1)):
+            assert not moon_phase_table.covers(_to_utc(dt).timestamp())
+            phase = ((_julian_day(dt) - _NEW_MOON_EPOCH_JD) / _SYNODIC_MONTH) % 1.0
+            result = calculate_moon_phase(dt)
+            assert result["age"] == round(phase * _SYNODIC_MONTH, 1)
+            vector = get_moon_phase_range(dt.date().isoformat(), 1)[0]
+            assert vector == result
+        assert moon_phase_table.next_phase_event(datetime(2080, 1, 1)) is None
+        assert moon_phase_table.previous_phase_event(datetime(1850, 1, 1)) is None
+
+
+@pytest.mark.skipif(not SKYFIELD_AVAILABLE, reason="skyfield not installed")
+class TestRiseSetCache:
+    """Rise/set results memoized per UTC day and 0.1 degree grid cell."""
+
+    def fake_range(self, start, days, lat, lon, tz=None):
+        return [{"date": start.date().isoformat(), "rise": f"{lat},{lon}", "set": None}]
+
+    def test_quantizes_to_grid(self):
+        assert moon_phase.RISE_SET_GRID_DEG == 0.1
+        assert moon_phase._quantize(40.1234) == 40.1
+        assert moon_phase._quantize(40.15001) == 40.2
+        assert moon_phase._quantize(-88.2449) == -88.2
+        assert moon_phase._quantize(0.04) == 0.0
+
+    def test_nearby_observers_share_one_search(self):
+        with patch(
+            "backend.moon_phase.calculate_moon_rise_set_range",
+            side_effect=self.fake_range,
+        ) as search:
+            first = calculate_moon_rise_set(datetime(2024, 3, 1, 8), 40.11, -88.24)
+            second = calculate_moon_rise_set(datetime(2024, 3, 1, 20), 40.14, -88.21)
+            other_day = calculate_moon_rise_set(datetime(2024, 3, 2), 40.11, -88.24)
+
+        assert search.call_count == 2
+        assert search.call_args_list[0].args[2:] == (40.1, -88.2)
+        assert first["rise"] == second["rise"] == "40.1,-88.2"
+        assert second["location"] == {"lat": 40.14, "lon": -88.21}
+        assert other_day["rise"] == "40.1,-88.2"
+        info = moon_phase.rise_set_cache_info()
+        assert (info["hits"], info["misses"], info["size"]) == (1, 2, 2)
+        assert info["hit_rate"] == round(1 / 3, 3)
+
+    def test_errors_are_not_cached(self):
+        with patch(
+            "backend.moon_phase.calculate_moon_rise_set_range",
+            side_effect=RuntimeError("boom"),
+        ):
+            assert (
+                "boom" in calculate_moon_rise_set(datetime(2024, 3, 1), 0, 0)["error"]
+            )
+        assert moon_phase.rise_set_cache_info()["size"] == 0
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = moon_phase._RiseSetCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+        assert cache.info()["size"] == 2
+        assert (cache.hits, cache.misses) == (3, 1)
+
+
+@pytest.mark.skipif(not SKYFIELD_AVAILABLE, reason="skyfield not installed")
+class TestRiseSetBatch:
+    """Batch rise/set: validation, grid dedupe and per-location results."""
+
+    def fake_range(self, start, days, lat, lon, tz=None):
+        if lat > 80:
+            raise RuntimeError("polar")
+        return [{"date": start.date().isoformat(), "rise": f"{lat},{lon}", "set": None}]
+
+    def run(self, locations, **kwargs):
+        with patch(
+            "backend.moon_phase._rise_set_range", side_effect=self.fake_range
+        ) as search:
+            results = moon_phase.calculate_moon_rise_set_batch(
+                locations, "2024-03-01", **kwargs
+            )
+        return results, search
+
+    def test_dedupes_grid_cells_and_keeps_input_order(self):
+        results, search = self.run(
+            [
+                {"id": "a", "lat": 40.11, "lon": -88.24},
+                {"id": "b", "lat": 51.5, "lon": -0.12},
+                {"id": "c", "lat": 40.14, "lon": -88.21},  # same cell as "a"
+                {"lat": 85.0, "lon": 0.0},
+            ]
+        )
+
+        assert search.call_count == 3
+        assert [r["id"] for r in results] == ["a", "b", "c", None]
+        assert results[0]["days"] == results[2]["days"]
+        assert results[0]["days"][0]["rise"] == "40.1,-88.2"
+        assert results[2]["location"] == {"lat": 40.14, "lon": -88.21}
+        assert "polar" in results[3]["error"]
+
+    @pytest.mark.parametrize(
+        "locations, kwargs, message",
+        [
+            ([{"lat": 1}], {}, "numeric 'lat' and 'lon'"),
+            ([{"lat": "x", "lon": 0}], {}, "numeric 'lat' and 'lon'"),
+            ([{"lat": 91, "lon": 0}], {}, "out of range"),
+            ([{"lat": 0, "lon": 0}], {"days": 0}, "days must be"),
+            ([{"lat": 0, "lon": 0}], {"tz": "Nowhere/Else"}, "time zone"),
+            ([{"lat": 0, "lon": 0}] * 1001, {}, "At most 1000"),
+            ([{"lat": 0, "lon": 0}] * 700, {"days": 30}, "locations x days"),
+        ],
+    )
+    def test_rejects_invalid_requests(self, locations, kwargs, message):
+        with pytest.raises(ValueError, match=message):
+            self.run(locations, **kwargs)
+
+    def test_route_validation(self):
+        from backend.app import app
+
+        client = app.test_client()
+        url = "/api/moon-phase/rise-set/batch"
+        assert client.post(url, json={}).status_code == 400
+        assert client.post(url, json={"locations": []}).status_code == 400
+        assert client.post(url, data="not json").status_code == 400
+        resp = client.post(
+            url, json={"locations": [{"lat": 0, "lon": 0}], "start": "2024-02-30"}
+        )
+        assert resp.status_code == 400
+        assert "Invalid date" in resp.get_json()["error"]
+
+
+@pytest.mark.skipif(
+    not SKYFIELD_AVAILABLE or not os.path.exists(moon_phase.EPHEMERIS_PATH),
+    reason="skyfield or the bundled ephemeris not available",
+)
+class TestMoonSkyTrack:
+    """One vectorized alt/az/distance pass, sampled every `step` minutes."""
+
+    START = datetime(2024, 3, 1, 18, 0, tzinfo=timezone.utc)
+
+    def test_samples_cover_window_at_step(self):
+        track = moon_phase.calculate_moon_sky_track(40.0, -74.0, self.START, 2, 15)
+
+        assert track["count"] == 9
+        assert track["start"] == "2024-03-01T18:00:00+00:00"
+        for key in ("alt_deg", "az_deg", "distance_km"):
+            assert len(track[key]) == 9
+        assert all(-90 <= a <= 90 for a in track["alt_deg"])
+        assert all(0 <= a < 360 for a in track["az_deg"])
+        assert all(356_000 < d < 407_000 for d in track["distance_km"])
+
+    def test_sample_i_is_at_start_plus_i_steps(self):
+        track = moon_phase.calculate_moon_sky_track(40.0, -74.0, self.START, 1, 20)
+        third = moon_phase.calculate_moon_sky_track(
+            40.0, -74.0, self.START + timedelta(minutes=40), 0.25, 15
+        )
+        assert track["alt_deg"][2] == pytest.approx(third["alt_deg"][0], abs=1e-3)
+        assert track["az_deg"][2] == pytest.approx(third["az_deg"][0], abs=1e-3)
+        assert track["distance_km"][2] == pytest.approx(third["distance_km"][0])
+
+    def test_naive_start_is_utc(self):
+        naive = moon_phase.calculate_moon_sky_track(
+            0.0, 0.0, self.START.replace(tzinfo=None), 1, 30
+        )
+        aware = moon_phase.calculate_moon_sky_track(0.0, 0.0, self.START, 1, 30)
+        assert naive == aware
+
+    @pytest.mark.parametrize(
+        "lat, hours, step, message",
+        [
+            (91.0, 1, 5, "out of range"),
+            (0.0, 1, 0, "step"),
+            (0.0, 1, 61, "step"),
+            (0.0, 0, 5, "hours"),
+            (0.0, 49, 5, "hours"),
+        ],
+    )
+    def test_rejects_bad_input(self, lat, hours, step, message):
+        with pytest.raises(ValueError, match=message):
+            moon_phase.calculate_moon_sky_track(lat, 0.0, self.START, hours, step)
+
+    def test_rejects_dates_outside_supported_span(self):
+        with pytest.raises(ValueError, match="supported from"):
+            moon_phase.calculate_moon_sky_track(
+                0.0, 0.0, datetime(2052, 12, 31, 12), 24, 60
+            )
+
+    def test_route(self):
+        from backend.app import app
+
+        client = app.test_client()
+        resp = client.get(
+            "/api/moon-position?lat=40&lon=-74"
+            "&start=2024-03-01T18:00:00%2B00:00&hours=1&step=30"
+        )
+        assert resp.status_code == 200
+        assert resp.get_json()["count"] == 3
+        assert client.get("/api/moon-position?lat=40").status_code == 400
+        resp = client.get("/api/moon-position?lat=40&lon=-74&step=0")
+        assert resp.status_code == 400
@@ -0,0 +1,157 @@
+import datetime
+import os
+import sys
+from datetime import timezone
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import moon_phase  # moon_tiles imports it by its bare name
+import numpy as np
+import pytest
+
+from backend import moon_tiles
+
+DAY = datetime.date(2024, 3, 1)
+
+needs_ephemeris = pytest.mark.skipif(
+    not moon_phase.SKYFIELD_AVAILABLE or not os.path.exists(moon_phase.EPHEMERIS_PATH),
+    reason="skyfield or the bundled ephemeris not available",
+)
+
+
+@pytest.fixture
+def tile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(moon_tiles, "TILE_DIR", str(tmp_path))
+    monkeypatch.setattr(moon_phase.compute_executor, "COMPUTE_INLINE", True)
+    return tmp_path
+
+
+@needs_ephemeris
+class TestTileGeneration:
+    """Rasters match the per-location search and are written atomically."""
+
+    def test_raster_layout(self, tile_dir):
+        path = moon_tiles.generate_tile(DAY, 2.0)
+
+        assert path == str(tile_dir / "2024-03-01_2.npz")
+        assert os.listdir(tile_dir) == ["2024-03-01_2.npz"]
+        with np.load(path) as tile:
+            assert tile["rise"].shape == (91, 180)
+            assert tile["set"].dtype == np.uint16
+            assert list(tile["lat"]) == [-90.0, 2.0]
+            assert list(tile["lon"]) == [-180.0, 2.0]
+            assert str(tile["date"]) == "2024-03-01"
+            # polar night/day cells have no event at all
+            assert (tile["rise"] == moon_tiles.NO_EVENT).any()
+
+    @pytest.mark.parametrize("lat, lon", [(40.0, -74.0), (-34.0, 150.0), (0.0, 0.0)])
+    def test_matches_per_location_search(self, tile_dir, lat, lon):
+        path = moon_tiles.generate_tile(DAY, 2.0)
+        row, col = int((lat + 90) / 2), int((lon + 180) / 2)
+        with np.load(path) as tile:
+            raster = {"rise": tile["rise"][row, col], "set": tile["set"][row, col]}
+
+        exact = moon_phase.calculate_moon_rise_set_range(
+            datetime.datetime(2024, 3, 1), 1, lat, lon
+        )[0]
+        for kind in ("rise", "set"):
+            if exact[kind] is None:
+                assert raster[kind] == moon_tiles.NO_EVENT
+                continue
+            t = datetime.datetime.fromisoformat(exact[kind]).astimezone(timezone.utc)
+            assert abs(raster[kind] - (t.hour * 60 + t.minute)) <= 2
+
+    def test_existing_tile_is_kept_unless_overwritten(self, tile_dir):
+        path = moon_tiles.generate_tile(DAY, 2.0)
+        os.utime(path, (0, 0))
+        moon_tiles.get_tile(DAY, 2.0)
+        assert os.path.getmtime(path) == 0
+        moon_tiles.generate_tile(DAY, 2.0, overwrite=True)
+        assert os.path.getmtime(path) > 0
+
+    def test_rejects_bad_resolution_and_dates(self, tile_dir):
+        with pytest.raises(ValueError, match="Invalid resolution"):
+            moon_tiles.get_tile(DAY, 3.0)
+        with pytest.raises(ValueError, match="supported from"):
+            moon_tiles.get_tile(datetime.date(1850, 1, 1), 2.0)
+        assert os.listdir(tile_dir) == []
+
+
+@needs_ephemeris
+class TestTileRoute:
+    """Tiles are served with validators so clients can revalidate."""
+
+    URL = "/api/moon-tiles/2024-03-01.npz?res=2"
+
+    @pytest.fixture
+    def client(self, tile_dir):
+        from backend.app import app
+
+        return app.test_client()
+
+    def test_etag_revalidation(self, client):
+        resp = client.get(self.URL)
+        assert resp.status_code == 200
+        assert resp.headers["Cache-Control"] == "public, max-age=86400"
+        etag = resp.headers["ETag"]
+
+        again = client.get(self.URL, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.data == b""
+
+    def test_range_request(self, client):
+        full = client.get(self.URL).data
+        part = client.get(self.URL, headers={"Range": "bytes=0-99"})
+        assert part.status_code == 206
+        assert part.data == full[:100]
+
+    def test_bad_input_is_400(self, client):
+        assert client.get("/api/moon-tiles/2024-13-01.npz").status_code == 400
+        assert client.get("/api/moon-tiles/2024-03-01.npz?res=3").status_code == 400
+
+
+class TestPruneTiles:
+    """Old rasters are removed; recent ones and stray files are left alone."""
+
+    def test_prunes_before_cutoff(self, tile_dir):
+        today = datetime.date.today()
+        names = [
+            f"{(today - datetime.timedelta(days=10)).isoformat()}_1.npz",
+            f"{(today - datetime.timedelta(days=8)).isoformat()}_0.5.npz",
+            f"{(today - datetime.timedelta(days=7)).isoformat()}_1.npz",
+            f"{today.isoformat()}_1.npz",
+            "README",
+        ]
+        for name in names:
+            (tile_dir / name).write_bytes(b"")
+
+        assert moon_tiles.prune_tiles(keep_days=7) == 2
+        assert sorted(os.listdir(tile_dir)) == sorted(names[2:])
+
+    def test_missing_dir(self, tile_dir, monkeypatch):
+        monkeypatch.setattr(moon_tiles, "TILE_DIR", str(tile_dir / "missing"))
+        assert moon_tiles.prune_tiles() == 0
+
+
+class TestTileJob:
+    """The standalone job keeps going and logs failures instead of printing."""
+
+    def test_failures_are_logged(self, monkeypatch, caplog):
+        class Stop(Exception):
+            pass
+
+        def boom(days_ahead, res):
+            raise RuntimeError("disk full")
+
+        def sleep(seconds):
+            assert seconds == 3600
+            raise Stop
+
+        monkeypatch.setattr(moon_tiles, "run_daily_job", boom)
+        monkeypatch.setattr(moon_tiles.time, "sleep", sleep)
+        with pytest.raises(Stop):
+            moon_tiles.run_forever(interval_s=3600)
+        assert "moon tile job failed" in caplog.text
+        assert "disk full" in caplog.text
@@ -0,0 +1,649 @@
+import datetime
+import io
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import pytest
+import requests
+from backend import nasa_apod
+
+TODAY = datetime.date(2024, 3, 10)
+
+
+class MockResponse:
+    def __init__(self, json_data=None, status_code=200):
+        self._json = json_data
+        self.status_code = status_code
+        self.ok = status_code < 400
+
+    def json(self):
+        return self._json
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"HTTP {self.status_code}", response=self)
+
+
+def entry(date, **extra):
+    return {
+        "date": date,
+        "title": f"APOD {date}",
+        "explanation": "...",
+        "media_type": "image",
+        "url": f"https://apod.nasa.gov/{date}.jpg",
+        **extra,
+    }
+
+
+class Calls(list):
+    """params of every requests.get call; `route(params)` picks the response."""
+
+    route = None
+
+
+class Clock:
+    """Settable stand-in for time.time (starts at noon US Eastern on TODAY)."""
+
+    def __init__(self):
+        self.now = datetime.datetime.combine(
+            TODAY, datetime.time(12), nasa_apod.APOD_TZ
+        ).timestamp()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def calls(monkeypatch, tmp_path, clock):
+    log = Calls()
+
+    def fake_get(url, params=None, timeout=None, **kwargs):
+        assert timeout
+        log.append(dict(params or {}))
+        return log.route(params or {})
+
+    monkeypatch.setattr(nasa_apod, "apod_today", lambda: TODAY)
+    monkeypatch.setattr(nasa_apod.requests, "get", fake_get)
+    cache = nasa_apod._LatestCache(str(tmp_path / "apod_latest.json"), clock)
+    monkeypatch.setattr(nasa_apod, "_latest", cache)
+    return log
+
+
+# 1) one range request returns the newest entry
+def test_lookback_uses_single_range_request(calls):
+    calls.route = lambda p: MockResponse([entry("2024-03-08"), entry("2024-03-09")])
+
+    item = nasa_apod.get_APOD_lookback()
+    assert item.date == "2024-03-09"
+    assert len(calls) == 1
+    assert calls[0]["start_date"] == "2024-02-09"
+    assert calls[0]["end_date"] == "2024-03-10"
+
+
+# 2) a rate-limited range request stops without probing
+def test_lookback_rate_limited_does_not_probe(calls):
+    calls.route = lambda p: MockResponse({"error": "slow down"}, 429)
+
+    assert nasa_apod.get_APOD_lookback().date == ""
+    assert len(calls) == 1
+
+
+# 3) a failed range request falls back to parallel probes; 404 days are skipped
+def test_lookback_falls_back_to_probes(calls):
+    def route(params):
+        if "start_date" in params:
+            return MockResponse({"msg": "boom"}, 500)
+        if params["date"] == "2024-03-10":
+            return MockResponse({"msg": "no APOD today"}, 404)
+        return MockResponse(entry(params["date"]))
+
+    calls.route = route
+    item = nasa_apod.get_APOD_lookback()
+    assert item.date == "2024-03-09"
+    assert len(calls) == 1 + nasa_apod.LOOKBACK_PROBES
+
+
+# 4) probing stops at the first non-404 error (e.g. 429)
+def test_probes_stop_on_rate_limit(calls, monkeypatch):
+    monkeypatch.setattr(nasa_apod, "PROBE_WORKERS", 1)
+
+    def route(params):
+        if "start_date" in params:
+            raise requests.ConnectionError("down")
+        return MockResponse({"msg": "slow down"}, 429)
+
+    calls.route = route
+    assert nasa_apod.get_APOD_lookback().date == ""
+    assert len(calls) < 1 + nasa_apod.LOOKBACK_PROBES
+
+
+class HTMLResponse(MockResponse):
+    """A 200 whose body isn't JSON, like a proxy's error page."""
+
+    def json(self):
+        raise requests.JSONDecodeError("Expecting value", "<html>", 0)
+
+
+# 5) a probe with a non-JSON body counts as a miss, not a crash
+def test_probe_with_invalid_json_is_a_miss(calls):
+    def route(params):
+        if "start_date" in params:
+            return HTMLResponse()
+        if params["date"] == "2024-03-10":
+            return HTMLResponse()
+        return MockResponse(entry(params["date"]))
+
+    calls.route = route
+    assert nasa_apod.get_APOD_lookback().date == "2024-03-09"
+
+
+@pytest.fixture
+def archive(calls, monkeypatch, tmp_path):
+    from backend import apod_archive
+
+    # apod_archive imports nasa_apod by its bare name; patch that copy too
+    monkeypatch.setattr(apod_archive.nasa_apod, "apod_today", lambda: TODAY)
+    monkeypatch.setattr(apod_archive.nasa_apod, "rate_limit_remaining", None)
+    store = apod_archive.APODArchive(str(tmp_path / "apod.db"))
+    yield store
+    store.close()
+
+
+def range_route(missing=()):
+    """Answer range requests with an entry per day, except `missing` days."""
+
+    def route(params):
+        start = datetime.date.fromisoformat(params["start_date"])
+        end = datetime.date.fromisoformat(params["end_date"])
+        days = [
+            start + datetime.timedelta(days=i) for i in range((end - start).days + 1)
+        ]
+        return MockResponse(
+            [entry(d.isoformat()) for d in days if d.isoformat() not in missing]
+        )
+
+    return route
+
+
+# 6) archived dates and ranges are fetched once, then served locally
+def test_archive_fetches_each_date_once(archive, calls):
+    calls.route = range_route(missing={"2024-03-02"})
+    start, end = datetime.date(2024, 3, 1), datetime.date(2024, 3, 5)
+
+    first = archive.get_range(start, end)
+    assert [e["date"] for e in first] == [
+        "2024-03-01",
+        "2024-03-03",
+        "2024-03-04",
+        "2024-03-05",
+    ]
+    assert archive.get_range(start, end) == first
+    assert archive.get_entry(datetime.date(2024, 3, 2)) is None  # known gap
+    assert archive.get_entry(datetime.date(2024, 3, 4))["title"] == "APOD 2024-03-04"
+    assert len(calls) == 1
+
+    # only the new days go upstream
+    archive.get_range(start, datetime.date(2024, 3, 7))
+    assert len(calls) == 2
+    assert calls[1]["start_date"] == "2024-03-06"
+    assert archive.random()["date"] in {e["date"] for e in archive.range(start, TODAY)}
+
+
+# 7) today's date is never marked as a gap (it may not be published yet)
+def test_archive_retries_unpublished_today(archive, calls):
+    calls.route = range_route(missing={TODAY.isoformat()})
+
+    assert archive.get_entry(TODAY) is None
+    assert archive.missing_dates(TODAY, TODAY) == [TODAY]
+
+
+# 8) backfill walks newest-first in chunks and stops at its request cap
+def test_backfill_stops_at_request_cap(archive, calls):
+    from backend import apod_archive
+
+    calls.route = range_route()
+    result = archive.backfill(datetime.date(2023, 1, 1), max_requests=2)
+
+    assert result == {
+        "requests": 2,
+        "stored": 2 * apod_archive.BACKFILL_CHUNK_DAYS,
+        "stopped": "max_requests",
+    }
+    assert calls[0]["end_date"] == TODAY.isoformat()
+    assert calls[1]["end_date"] < calls[0]["start_date"]
+
+
+# 9) backfill stops on a 429 and when the API's remaining quota is low
+def test_backfill_respects_rate_limits(archive, calls, monkeypatch):
+    from backend import apod_archive
+
+    calls.route = lambda p: MockResponse({"error": "slow down"}, 429)
+    assert archive.backfill(max_requests=5)["stopped"] == "rate_limited"
+    assert len(calls) == 1
+
+    monkeypatch.setattr(
+        apod_archive.nasa_apod, "rate_limit_remaining", apod_archive.RATE_LIMIT_RESERVE
+    )
+    assert archive.backfill(max_requests=5)["stopped"] == "rate_limit_reserve"
+    assert len(calls) == 1
+
+
+# 10) random() is uniform over stored entries, however the dates are spaced
+def test_archive_random_is_uniform(archive, calls, monkeypatch):
+    from backend import apod_archive
+
+    dates = ["2024-01-01", "2024-03-09", "2024-03-10"]
+    archive.store([entry(d) for d in dates], TODAY, TODAY)
+
+    monkeypatch.setattr(apod_archive.random, "randrange", lambda n: n - 1)
+    assert archive.random()["date"] == "2024-03-10"
+    monkeypatch.setattr(apod_archive.random, "randrange", lambda n: 0)
+    assert archive.random()["date"] == "2024-01-01"
+    monkeypatch.undo()
+
+    apod_archive.random.seed(7)
+    picks = [archive.random()["date"] for _ in range(600)]
+    # a gap-weighted pick would return 2024-03-09 about once in 70 draws
+    assert all(picks.count(d) > 150 for d in dates)
+
+
+# 11) an unpublished today is asked for at most once per TODAY_RETRY_S
+def test_archive_caches_todays_miss(archive, calls, monkeypatch):
+    from backend import apod_archive
+
+    clock = [1000.0]
+    monkeypatch.setattr(apod_archive.time, "monotonic", lambda: clock[0])
+    published = set()
+
+    def route(params):
+        return MockResponse([entry(d) for d in sorted(published)])
+
+    calls.route = route
+    assert archive.get_entry(TODAY) is None
+    assert archive.get_entry(TODAY) is None
+    assert archive.get_range(TODAY - datetime.timedelta(days=1), TODAY) == []
+    assert len(calls) == 2  # the second call was only for yesterday
+
+    published.add(TODAY.isoformat())
+    clock[0] += apod_archive.TODAY_RETRY_S + 1
+    assert archive.get_entry(TODAY)["date"] == TODAY.isoformat()
+    assert len(calls) == 3
+
+
+class KeyLeakingResponse(MockResponse):
+    """Raises like requests does: the message carries the full request URL."""
+
+    def raise_for_status(self):
+        raise requests.HTTPError(
+            f"{self.status_code} Error for url: "
+            "https://api.nasa.gov/planetary/apod?api_key=SECRET",
+            response=self,
+        )
+
+
+# 12) upstream failures report a status, never the request URL or api_key
+def test_archive_routes_do_not_leak_the_api_key(calls, monkeypatch, tmp_path):
+    import apod_archive  # the copy app.py uses
+
+    from backend.app import app
+
+    monkeypatch.setattr(apod_archive.nasa_apod, "apod_today", lambda: TODAY)
+    store = apod_archive.APODArchive(str(tmp_path / "apod.db"))
+    monkeypatch.setattr(apod_archive, "_archive", store)
+    client = app.test_client()
+
+    calls.route = lambda p: KeyLeakingResponse({"error": "slow down"}, 429)
+    resp = client.get("/api/apod/2024-03-01")
+    assert resp.status_code == 502
+    assert resp.get_json() == {
+        "error": "APOD API request failed (HTTP 429)",
+        "upstream_status": 429,
+    }
+
+    def down(params):
+        raise requests.ConnectionError("Max retries with url: /apod?api_key=SECRET")
+
+    calls.route = down
+    resp = client.get("/api/apod?start=2024-03-01&end=2024-03-02")
+    assert resp.status_code == 502
+    assert "SECRET" not in resp.get_data(as_text=True)
+
+    calls.route = lambda p: KeyLeakingResponse({}, 500)
+    result = store.backfill(datetime.date(2024, 3, 1), max_requests=1)
+    assert result["stopped"] == "APOD API request failed (HTTP 500)"
+    store.close()
+
+
+# 13) the latest APOD is fetched once and pinned until the next publication
+def test_latest_pinned_until_next_publication(calls, clock, tmp_path):
+    calls.route = lambda p: MockResponse([entry("2024-03-10")])
+
+    assert nasa_apod.get_APOD_lookback().date == "2024-03-10"
+    assert nasa_apod.get_APOD().date == "2024-03-10"
+    assert nasa_apod.latest_max_age() == 12 * 3600  # until midnight Eastern
+    clock.now += 11 * 3600
+    nasa_apod.get_APOD_lookback()
+    assert len(calls) == 1
+
+    # another worker on the host reads the shared file instead of fetching
+    other = nasa_apod._LatestCache(str(tmp_path / "apod_latest.json"), clock)
+    assert other.get(lambda: pytest.fail("fetched"))["item"]["date"] == "2024-03-10"
+
+
+# 14) past the rollover, polling backs off until the new entry appears
+def test_latest_polls_with_backoff_after_rollover(calls, clock):
+    published = [entry("2024-03-10")]
+    calls.route = lambda p: MockResponse(published)
+    nasa_apod.get_APOD_lookback()
+
+    clock.now += 12 * 3600  # midnight: due, but not out yet
+    assert nasa_apod.get_APOD_lookback().date == "2024-03-10"
+    assert nasa_apod.latest_max_age() == nasa_apod.ROLLOVER_POLL_S
+    clock.now += nasa_apod.ROLLOVER_POLL_S
+    nasa_apod.get_APOD_lookback()
+    assert nasa_apod.latest_max_age() == 2 * nasa_apod.ROLLOVER_POLL_S
+    assert len(calls) == 3
+
+    published.append(entry("2024-03-11"))
+    clock.now += 2 * nasa_apod.ROLLOVER_POLL_S
+    assert nasa_apod.get_APOD_lookback().date == "2024-03-11"
+    assert len(calls) == 4
+
+
+# 15) a failed refresh keeps serving the previous entry and waits to retry
+def test_latest_serves_stale_on_error(calls, clock):
+    calls.route = lambda p: MockResponse([entry("2024-03-10")])
+    nasa_apod.get_APOD_lookback()
+
+    clock.now += 13 * 3600
+    calls.route = lambda p: MockResponse({"error": "slow down"}, 429)
+    assert nasa_apod.get_APOD_lookback().date == "2024-03-10"
+    assert nasa_apod.get_APOD_lookback().date == "2024-03-10"
+    assert nasa_apod.latest_max_age() == nasa_apod.ERROR_RETRY_S
+    assert len(calls) == 2
+
+
+# 16) /api/apod lets caches hold an entry, but never an empty (error) answer
+def test_latest_route_cache_headers(calls, clock, monkeypatch, tmp_path):
+    import nasa_apod as app_nasa_apod  # the copy app.py uses
+
+    from backend.app import app
+
+    monkeypatch.setattr(app_nasa_apod, "apod_today", lambda: TODAY)
+    cache = app_nasa_apod._LatestCache(str(tmp_path / "route_latest.json"), clock)
+    monkeypatch.setattr(app_nasa_apod, "_latest", cache)
+    client = app.test_client()
+
+    calls.route = lambda p: MockResponse({"error": "slow down"}, 429)
+    resp = client.get("/api/apod")
+    assert resp.get_json()["date"] == ""
+    assert resp.headers["Cache-Control"] == "no-store"
+
+    clock.now += nasa_apod.ERROR_RETRY_S
+    calls.route = lambda p: MockResponse([entry("2024-03-10")])
+    resp = client.get("/api/apod")
+    assert resp.get_json()["date"] == "2024-03-10"
+    max_age = 12 * 3600 - nasa_apod.ERROR_RETRY_S  # still until midnight Eastern
+    assert resp.headers["Cache-Control"] == f"public, max-age={max_age}"
+
+
+class MediaResponse(MockResponse):
+    is_redirect = False
+
+    def __init__(self, body, content_type="image/jpeg"):
+        super().__init__()
+        self.body = body
+        self.headers = {"Content-Type": content_type}
+
+    def close(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i : i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class Redirect(MediaResponse):
+    is_redirect = True
+
+    def __init__(self, location):
+        super().__init__(b"")
+        self.status_code = 302
+        self.headers = {"Location": location}
+
+
+class Downloads(dict):
+    """Image bytes by URL for the fake downloader; `fetched` logs requests."""
+
+    def __init__(self):
+        super().__init__()
+        self.fetched = []
+
+
+@pytest.fixture
+def downloads(archive, monkeypatch, tmp_path):
+    from backend import apod_media
+
+    log = Downloads()
+
+    def fake_get(url, stream=False, timeout=None, allow_redirects=True):
+        assert stream and timeout and not allow_redirects
+        log.fetched.append(url)
+        body = log[url]
+        return body if isinstance(body, Redirect) else MediaResponse(body)
+
+    monkeypatch.setattr(apod_media.apod_archive, "get_archive", lambda: archive)
+    monkeypatch.setattr(apod_media, "MEDIA_DIR", str(tmp_path / "media"))
+    monkeypatch.setattr(apod_media.requests, "get", fake_get)
+    return log
+
+
+@pytest.fixture
+def media(downloads):
+    from backend import apod_media
+
+    return apod_media
+
+
+# 17) one download of the standard image yields every resized variant
+def test_media_variants_from_one_download(media, downloads, archive, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")  # optional "media" extra
+    buf = io.BytesIO()
+    Image.new("RGB", (1600, 800), "navy").save(buf, "JPEG")
+    monkeypatch.setattr(media, "GENERATE_VARIANTS", True)
+    url = "https://apod.nasa.gov/apod/image/2403/a.jpg"
+    hdurl = "https://apod.nasa.gov/apod/image/2403/a_big.png"
+    archive.store([entry("2024-03-01", url=url, hdurl=hdurl)], TODAY, TODAY)
+    downloads.update({url: buf.getvalue(), hdurl: b"\x89PNG..."})
+    day = datetime.date(2024, 3, 1)
+
+    thumb = media.get_media(day, "thumb")
+    medium = media.get_media(day, "medium")
+    with Image.open(thumb) as im:
+        assert im.size == (320, 160)
+    with Image.open(medium) as im:
+        assert im.size == (1280, 640)
+    assert downloads.fetched == [url]
+
+    hd = media.get_media(day, "hd")
+    assert hd.endswith("2024-03-01.hd.png")
+    assert media.get_media(day, "hd") == hd
+    assert downloads.fetched == [url, hdurl]
+    assert sorted(os.listdir(media.MEDIA_DIR)) == [
+        "2024-03-01.hd.png",
+        "2024-03-01.medium.jpg",
+        "2024-03-01.thumb.jpg",
+    ]
+
+
+# 18) the cache evicts the least recently used images past its budget
+def test_media_cache_evicts_lru(media, downloads, archive, monkeypatch):
+    monkeypatch.setattr(media, "GENERATE_VARIANTS", False)
+    monkeypatch.setattr(media, "MEDIA_CACHE_MAX_BYTES", 2500)
+    for day in ("2024-03-01", "2024-03-02", "2024-03-03"):
+        url = f"https://apod.nasa.gov/{day}.jpg"
+        archive.store([entry(day)], TODAY, TODAY)
+        downloads[url] = b"x" * 1000
+
+    first = media.get_media(datetime.date(2024, 3, 1), "thumb")
+    second = media.get_media(datetime.date(2024, 3, 2), "medium")
+    os.utime(first, (0, os.stat(first).st_mtime))
+    os.utime(second, (1, os.stat(second).st_mtime))
+    media.get_media(datetime.date(2024, 3, 1), "thumb")  # hit: now most recent
+    media.get_media(datetime.date(2024, 3, 3), "hd")
+
+    assert os.path.exists(first)
+    assert not os.path.exists(second)
+    assert len(downloads.fetched) == 3
+
+
+# 19) only image hosts APOD links to are proxied
+def test_media_rejects_other_hosts(media, downloads, archive):
+    archive.store(
+        [entry("2024-03-01", media_type="video", url="https://youtube.com/embed/x")],
+        TODAY,
+        TODAY,
+    )
+    with pytest.raises(media.MediaNotFound):
+        media.get_media(datetime.date(2024, 3, 1), "medium")
+    with pytest.raises(ValueError):
+        media.get_media(datetime.date(2024, 3, 1), "huge")
+    assert downloads.fetched == []
+
+
+# 20) images past Pillow's pixel limit are refused, not decoded
+@pytest.mark.parametrize("pixels", [100 * 100 // 2 + 1, 100 * 100 - 1])
+def test_media_refuses_decompression_bombs(
+    media, downloads, archive, monkeypatch, pixels
+):
+    Image = pytest.importorskip("PIL.Image")
+    buf = io.BytesIO()
+    Image.new("RGB", (100, 100)).save(buf, "PNG")
+    # just over the limit only warns; twice over is an error: both are refused
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", pixels)
+    monkeypatch.setattr(media, "GENERATE_VARIANTS", True)
+    url = "https://apod.nasa.gov/2024-03-01.jpg"
+    archive.store([entry("2024-03-01")], TODAY, TODAY)
+    downloads[url] = buf.getvalue()
+
+    with pytest.raises(media.MediaError, match="Could not resize"):
+        media.get_media(datetime.date(2024, 3, 1), "thumb")
+    assert os.listdir(media.MEDIA_DIR) == []
+
+
+# 21) APOD routes point image entries at the proxy, videos at nothing
+def test_routes_link_to_the_media_proxy(calls, monkeypatch, tmp_path):
+    import apod_archive  # the copies app.py uses
+    import apod_media
+
+    from backend.app import app
+
+    monkeypatch.setattr(apod_archive.nasa_apod, "apod_today", lambda: TODAY)
+    store = apod_archive.APODArchive(str(tmp_path / "apod.db"))
+    monkeypatch.setattr(apod_archive, "_archive", store)
+    store.store(
+        [
+            entry("2024-03-01"),
+            entry("2024-03-02", media_type="video", url="https://youtube.com/x"),
+        ],
+        TODAY,
+        TODAY,
+    )
+    client = app.test_client()
+
+    resp = client.get("/api/apod?start=2024-03-01&end=2024-03-02")
+    image, video = resp.get_json()
+    assert image["media"] == {
+        "thumb": "/api/apod/media/2024-03-01/thumb",
+        "medium": "/api/apod/media/2024-03-01/medium",
+        "hd": "/api/apod/media/2024-03-01/hd",
+    }
+    assert video["media"] is None
+    assert client.get("/api/apod/2024-03-01").get_json()["media"] == image["media"]
+
+    def broken(day, variant):
+        raise RuntimeError("GET https://api.nasa.gov/?api_key=SECRET")
+
+    monkeypatch.setattr(apod_media, "get_media", broken)
+    resp = client.get("/api/apod/media/2024-03-01/thumb")
+    assert resp.status_code == 500
+    assert "SECRET" not in resp.get_data(as_text=True)
+    store.close()
+
+
+# 22) the boot-time backfill only spends quota with a real key, unless forced
+@pytest.mark.parametrize(
+    "setting, key, enabled",
+    [
+        ("auto", None, False),
+        ("auto", "DEMO_KEY", False),
+        ("auto", "real-key", True),
+        ("1", None, True),
+        ("0", "real-key", False),
+    ],
+)
+def test_backfill_job_needs_a_real_key(monkeypatch, setting, key, enabled):
+    from backend import apod_archive
+
+    monkeypatch.setattr(apod_archive, "BACKFILL_JOB", setting)
+    if key is None:
+        monkeypatch.delenv("NASA_API_KEY", raising=False)
+    else:
+        monkeypatch.setenv("NASA_API_KEY", key)
+    assert apod_archive.backfill_job_enabled() is enabled
+
+
+# 23) redirects are only followed to proxied hosts
+def test_media_checks_every_redirect(media, downloads, archive, monkeypatch):
+    monkeypatch.setattr(media, "GENERATE_VARIANTS", False)
+    archive.store([entry("2024-03-01"), entry("2024-03-02")], TODAY, TODAY)
+    downloads["https://apod.nasa.gov/2024-03-01.jpg"] = Redirect("/moved/a.jpg")
+    downloads["https://apod.nasa.gov/moved/a.jpg"] = b"jpeg"
+    downloads["https://apod.nasa.gov/2024-03-02.jpg"] = Redirect(
+        "http://169.254.169.254/latest/meta-data"
+    )
+
+    path = media.get_media(datetime.date(2024, 3, 1), "thumb")
+    with open(path, "rb") as f:
+        assert f.read() == b"jpeg"
+    with pytest.raises(media.MediaNotFound, match="isn't proxied"):
+        media.get_media(datetime.date(2024, 3, 2), "thumb")
+    assert "http://169.254.169.254/latest/meta-data" not in downloads.fetched
+
+
+# 24) temp files are per process and thread, and date locks don't pile up
+def test_media_temp_names_and_striped_locks(media, downloads, archive, monkeypatch):
+    monkeypatch.setattr(media, "GENERATE_VARIANTS", False)
+    archive.store([entry("2024-03-01")], TODAY, TODAY)
+    downloads["https://apod.nasa.gov/2024-03-01.jpg"] = b"jpeg"
+    written = []
+    replace = os.replace
+    monkeypatch.setattr(
+        media.os, "replace", lambda src, dst: written.append(src) or replace(src, dst)
+    )
+
+    media.get_media(datetime.date(2024, 3, 1), "medium")
+    assert f".{os.getpid()}." in written[0]
+    # prefetch fills in the remaining variants
+    assert set(media.prefetch(datetime.date(2024, 3, 1))) == set(media.VARIANTS)
+    assert len(downloads.fetched) == 2  # the standard image, then hd
+
+    day = datetime.date(2024, 3, 1)
+    locks = {media._date_lock(day + datetime.timedelta(days=i)) for i in range(1000)}
+    assert len(locks) <= len(media._date_locks)
+    assert media._date_lock(day) is media._date_lock(day)
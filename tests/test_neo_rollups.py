@@ -0,0 +1,179 @@
+import datetime
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+from backend import neo_rollups
+
+
+def neo(hazardous=False, diameter=100.0, miss_km=1e6, velocity=10.0):
+    return {
+        "is_potentially_hazardous_asteroid": hazardous,
+        "estimated_diameter": {"meters": {"estimated_diameter_max": diameter}},
+        "close_approach_data": [
+            {
+                "miss_distance": {"kilometers": str(miss_km)},
+                "relative_velocity": {"kilometers_per_second": str(velocity)},
+            }
+        ],
+    }
+
+
+def feed(days):
+    return {"near_earth_objects": days}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return neo_rollups.RollupStore(str(tmp_path / "rollups.json"))
+
+
+FEED = feed(
+    {
+        # Sunday and Monday: two weeks, one month
+        "2024-03-03": [neo(hazardous=True, diameter=300, miss_km=5e5), neo()],
+        "2024-03-04": [neo(velocity=20.0)],
+        # next month and next year
+        "2024-04-01": [neo(miss_km=2e5)],
+        "2025-01-01": [neo(), neo(), neo()],
+    }
+)
+
+
+class TestRollupBucketing:
+    """Days fold into each coarser level by their bucket start."""
+
+    def test_bucket_start_each_level(self):
+        day = datetime.date(2024, 3, 6)  # a Wednesday
+        assert neo_rollups.bucket_start(day, "day") == day
+        assert neo_rollups.bucket_start(day, "week") == datetime.date(2024, 3, 4)
+        assert neo_rollups.bucket_start(day, "month") == datetime.date(2024, 3, 1)
+        assert neo_rollups.bucket_start(day, "year") == datetime.date(2024, 1, 1)
+        with pytest.raises(ValueError):
+            neo_rollups.bucket_start(day, "decade")
+
+    def test_ingest_fills_every_level(self, store):
+        assert store.ingest_feed(FEED) == 4
+
+        assert store._levels["day"]["2024-03-03"]["count"] == 2
+        assert store._levels["week"]["2024-02-26"]["count"] == 2
+        assert store._levels["week"]["2024-03-04"]["count"] == 1
+        march = store._levels["month"]["2024-03-01"]
+        assert march["count"] == 3
+        assert march["hazardous"] == 1
+        assert march["max_diameter_m"] == 300
+        assert march["min_miss_km"] == 5e5
+        assert store._levels["month"]["2024-04-01"]["count"] == 1
+        assert store._levels["year"]["2024-01-01"]["count"] == 4
+        assert store._levels["year"]["2025-01-01"]["count"] == 3
+
+    def test_store_round_trips_through_file(self, store):
+        store.ingest_feed(FEED)
+        reloaded = neo_rollups.RollupStore(store.path)
+        assert reloaded._levels == store._levels
+
+
+class TestRollupReingest:
+    """Fetching the same window again must not double count."""
+
+    def test_same_feed_twice_counts_once(self, store):
+        store.ingest_feed(FEED)
+        before = {b: dict(level) for b, level in store._levels.items()}
+        store.ingest_feed(FEED)
+        assert store._levels == before
+        assert store._levels["year"]["2024-01-01"]["count"] == 4
+
+    def test_unchanged_feed_skips_the_write(self, store):
+        store.ingest_feed(FEED)
+        mtime = os.stat(store.path).st_mtime_ns
+        os.utime(store.path, ns=(mtime - 10**9, mtime - 10**9))
+        store.ingest_feed(FEED)
+        assert os.stat(store.path).st_mtime_ns == mtime - 10**9
+
+    def test_replaced_day_rebuilds_its_buckets(self, store):
+        store.ingest_feed(FEED)
+        store.ingest_feed(feed({"2024-03-04": [neo(), neo()]}))
+        assert store._levels["week"]["2024-03-04"]["count"] == 2
+        assert store._levels["month"]["2024-03-01"]["count"] == 4
+        assert store._levels["year"]["2024-01-01"]["count"] == 5
+        assert not any(
+            n.endswith(".tmp") for n in os.listdir(os.path.dirname(store.path))
+        )
+
+
+class TestRollupWorkers:
+    """Workers sharing one file never drop each other's days."""
+
+    def test_writers_merge_before_saving(self, store):
+        other = neo_rollups.RollupStore(store.path)  # a second worker
+        store.ingest_feed(feed({"2024-03-03": [neo()]}))
+        other.ingest_feed(feed({"2024-03-04": [neo(), neo()]}))
+        store.ingest_feed(feed({"2024-03-05": [neo()]}))
+
+        reloaded = neo_rollups.RollupStore(store.path)
+        assert sorted(reloaded._levels["day"]) == [
+            "2024-03-03",
+            "2024-03-04",
+            "2024-03-05",
+        ]
+        assert reloaded._levels["month"]["2024-03-01"]["count"] == 4
+        assert reloaded._levels == store._levels
+
+    def test_readers_pick_up_other_workers_saves(self, store):
+        other = neo_rollups.RollupStore(store.path)
+        other.ingest_feed(FEED)
+        assert store.has_day(datetime.date(2024, 3, 3))
+        rows = store.trend(datetime.date(2024, 1, 1), datetime.date(2025, 1, 1), "year")
+        assert [r["count"] for r in rows] == [4, 3]
+
+
+class TestRollupTrend:
+    """`trend` walks one row per bucket, including empty ones."""
+
+    def test_monthly_trend(self, store):
+        store.ingest_feed(FEED)
+        rows = store.trend(datetime.date(2024, 2, 15), datetime.date(2024, 4, 2))
+
+        assert [r["bucket"] for r in rows] == ["2024-02-01", "2024-03-01", "2024-04-01"]
+        feb, mar, apr = rows
+        assert feb["has_data"] is False and feb["count"] == 0
+        assert feb["end"] == "2024-02-29"
+        assert mar["count"] == 3
+        assert mar["hazardous_count"] == 1
+        assert mar["min_miss_distance_km"] == 5e5
+        assert mar["max_diameter_m"] == 300
+        assert mar["mean_velocity_km_s"] == round(40 / 3, 3)
+        assert apr["min_miss_distance_km"] == 2e5
+
+    def test_yearly_and_daily_trend(self, store):
+        store.ingest_feed(FEED)
+        years = store.trend(
+            datetime.date(2024, 6, 1), datetime.date(2025, 6, 1), "year"
+        )
+        assert [(r["bucket"], r["count"]) for r in years] == [
+            ("2024-01-01", 4),
+            ("2025-01-01", 3),
+        ]
+        days = store.trend(datetime.date(2024, 3, 3), datetime.date(2024, 3, 5), "day")
+        assert [r["count"] for r in days] == [2, 1, 0]
+
+    def test_trend_rejects_bad_input(self, store):
+        with pytest.raises(ValueError):
+            store.trend(datetime.date(2024, 3, 2), datetime.date(2024, 3, 1))
+        with pytest.raises(ValueError):
+            store.trend(datetime.date(2024, 3, 1), datetime.date(2024, 3, 2), "hour")
+
+    def test_trend_caps_span_per_level(self, store):
+        start = datetime.date(1, 1, 1)
+        end = datetime.date(9999, 12, 31)
+        for bucket in neo_rollups.BUCKETS:
+            with pytest.raises(ValueError, match="Span too long"):
+                store.trend(start, end, bucket)
+        limit = neo_rollups.MAX_TREND_ROWS["month"]
+        ok_end = datetime.date(2000 + limit // 12 - 1, 12, 31)
+        assert len(store.trend(datetime.date(2000, 1, 1), ok_end, "month")) == limit